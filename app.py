@@ -1,15 +1,47 @@
-from flask import Flask, request, jsonify
-from fitness_tracker.models.user_model import create_user, authenticate_user, change_password
+import math
+from functools import wraps
+
+import click
+import requests
+from flask import Flask, Response, g, request, jsonify
+from fitness_tracker.models.user_model import create_user, authenticate_user, change_password, get_authenticated_user_id
+from fitness_tracker.models.catalog_model import build_catalog_snapshot, sync_catalog
+from fitness_tracker.models.reference_model import sync_reference_tables
+from fitness_tracker.models.workout_store import MAX_SQLITE_INTEGER
 from fitness_tracker.models.workout_model import (
+    CATALOG_SNAPSHOT_PATH,
+    WGER_API_BASE_URL,
+    WGER_LANGUAGE,
     check_workout_in_api,
     add_workout_to_memory,
+    add_workouts_to_memory,
     get_workouts,
+    iter_workouts,
+    search_workouts,
     update_workout,
     delete_workout,
     get_deleted_workouts,
+    iter_deleted_workouts,
+    restore_workout,
+    compact_deleted_workouts,
+    get_lookup_stats,
+    reset_exercise_bloom_filters,
+    reset_catalog_snapshot,
 )
 
 app = Flask(__name__)
+
+# Largest list of workout IDs accepted by POST /workouts/batch
+WORKOUT_BATCH_MAX_SIZE = 100
+
+# Page sizes of GET /workouts when `limit` is omitted, and the largest accepted `limit`
+WORKOUT_PAGE_DEFAULT_SIZE = 100
+WORKOUT_PAGE_MAX_SIZE = 1000
+
+# Media type of streamed listings: one JSON workout per line, sent in chunks of about
+# NDJSON_CHUNK_SIZE characters so the server does not write to the socket once per workout
+NDJSON_MIMETYPE = "application/x-ndjson"
+NDJSON_CHUNK_SIZE = 64 * 1024
 import logging
 
 # Configure logging
@@ -22,6 +54,38 @@ logging.basicConfig(
 )
 
 
+def login_required(view):
+    """
+    Requires HTTP Basic credentials of a registered user.
+
+    The authenticated user's ID is stored in `g.user_id`, so the view only
+    reads and changes that user's account and workouts.
+
+    Args:
+        view (function): The route function to protect.
+
+    Returns:
+        function: The wrapped route, which returns an error message and status
+            code 401 when the credentials are missing or wrong.
+
+    Raises:
+        None
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        auth = request.authorization
+        user_id = None
+        if auth and auth.type == "basic" and auth.username and auth.password:
+            user_id = get_authenticated_user_id(auth.username, auth.password)
+        if user_id is None:
+            response = jsonify({"error": "Authentication required."})
+            response.headers["WWW-Authenticate"] = 'Basic realm="fitness-tracker"'
+            return response, 401
+        g.user_id = user_id
+        return view(*args, **kwargs)
+    return wrapper
+
+
 @app.route('/create-account', methods=['POST'])
 def create_account():
     """
@@ -80,27 +144,34 @@ def login():
         return jsonify({"error": "Invalid username or password."}), 401
 
 @app.route('/update-password', methods=['POST'])
+@login_required
 def update_password():
     """
-    Updates a user's password.
+    Updates the authenticated user's password.
 
     Args:
-        None (expects a JSON payload with 'username' and 'new_password' fields).
+        None (expects HTTP Basic credentials with the current password and a JSON
+        payload with a 'new_password' field; an optional 'username' field must
+        name the authenticated user).
 
     Returns:
         Response: JSON response with:
             - Success message and status code 200 if the password is updated successfully.
+            - Error message and status code 401 if the credentials are missing or wrong.
+            - Error message and status code 403 if 'username' names another user.
             - Error message and status code 500 if an error occurs during the update.
 
     Raises:
         Exception: If the password update process encounters an error.
     """
     data = request.json
-    username = data.get('username')
+    username = request.authorization.username
     new_password = data.get('new_password')
 
-    if not username or not new_password:
-        return jsonify({"error": "Username and new password are required."}), 400
+    if not new_password:
+        return jsonify({"error": "New password is required."}), 400
+    if data.get('username', username) != username:
+        return jsonify({"error": "Users can only change their own password."}), 403
 
     try:
         change_password(username, new_password)
@@ -128,11 +199,77 @@ def home():
     return "Welcome to the Fitness Tracker App!"
 
 
+def _page_limit():
+    """Returns the `limit` query parameter, WORKOUT_PAGE_DEFAULT_SIZE if absent, or None if invalid."""
+    limit = request.args.get("limit", str(WORKOUT_PAGE_DEFAULT_SIZE))
+    if not limit.isdecimal() or not 1 <= int(limit) <= WORKOUT_PAGE_MAX_SIZE:
+        return None
+    return int(limit)
+
+
+def _timestamp_arg(name):
+    """Returns a Unix-time query parameter as a float, or None if absent.
+
+    Raises:
+        ValueError: If the parameter is not a finite number.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return None
+    timestamp = float(value)
+    if not math.isfinite(timestamp):
+        raise ValueError
+    return timestamp
+
+
+def _id_filter_arg(name):
+    """Returns a comma-separated list of IDs from a query parameter, with "none" as None.
+
+    Raises:
+        ValueError: If an entry is neither a non-negative integer nor "none".
+    """
+    ids = []
+    for value in request.args.get(name, "").split(","):
+        value = value.strip().lower()
+        if not value:
+            continue
+        if value == "none":
+            ids.append(None)
+        elif value.isdecimal() and int(value) <= MAX_SQLITE_INTEGER:
+            ids.append(int(value))
+        else:
+            raise ValueError(f"{name} must be a comma-separated list of IDs or 'none'.")
+    return ids
+
+
+def _wants_ndjson():
+    """Returns True if the client's Accept header prefers NDJSON to JSON."""
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _ndjson_response(items):
+    """Streams items as newline-delimited JSON, serializing one at a time as the client reads."""
+    def chunks():
+        lines, size = [], 0
+        for item in items:
+            line = app.json.dumps(item, separators=(",", ":")) + "\n"
+            lines.append(line)
+            size += len(line)
+            if size >= NDJSON_CHUNK_SIZE:
+                yield "".join(lines)
+                lines, size = [], 0
+        if lines:
+            yield "".join(lines)
+
+    return Response(chunks(), mimetype=NDJSON_MIMETYPE)
+
+
 # Workout Management Routes
 @app.route('/workouts/<int:workout_id>', methods=['POST'])
+@login_required
 def add_workout(workout_id):
     """
-    Adds a workout to memory.
+    Adds a workout to the authenticated user's memory.
 
     Args:
         workout_id (int): The ID of the workout to add.
@@ -141,11 +278,16 @@ def add_workout(workout_id):
         Response: JSON response with:
             - The workout details and status code 201 if successful.
             - Error message and status code 400 if the addition fails.
+            - Error message and status code 503 if the Wger API is unavailable.
 
     Raises:
         None
     """ 
-    result = add_workout_to_memory(workout_id)
+    try:
+        result = add_workout_to_memory(g.user_id, workout_id)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Workout lookup failed: {e}")
+        return jsonify({"status": "error", "message": "Workout service unavailable."}), 503
     if result["status"] == "success":
         logging.info("Workout added successfully.")
         return jsonify(result), 201
@@ -154,28 +296,125 @@ def add_workout(workout_id):
         return jsonify(result), 400
 
 
+@app.route('/workouts/batch', methods=['POST'])
+@login_required
+def add_workouts_batch():
+    """
+    Adds several workouts to the authenticated user's memory in one request.
+
+    Args:
+        None (expects a JSON payload with a 'workout_ids' list of integers).
+
+    Returns:
+        Response: JSON response with:
+            - A result per workout ID and status code 201 if at least one workout was added.
+            - The per-ID results and status code 400 if none could be added.
+            - Error message and status code 400 if the payload is invalid.
+
+    Raises:
+        None
+    """
+    data = request.json
+    workout_ids = data.get("workout_ids") if isinstance(data, dict) else None
+    if not isinstance(workout_ids, list) or not workout_ids or not all(
+        isinstance(workout_id, int) and not isinstance(workout_id, bool) for workout_id in workout_ids
+    ):
+        return jsonify({"error": "workout_ids must be a non-empty list of integers."}), 400
+    if len(workout_ids) > WORKOUT_BATCH_MAX_SIZE:
+        return jsonify({"error": f"At most {WORKOUT_BATCH_MAX_SIZE} workouts can be added at once."}), 400
+
+    result = add_workouts_to_memory(g.user_id, workout_ids)
+    if result["added"]:
+        logging.info(f"Batch added {result['added']} workouts.")
+        return jsonify(result), 201
+    else:
+        logging.error("Failed to add any workouts in batch.")
+        return jsonify(result), 400
+
+
 @app.route('/workouts', methods=['GET'])
+@login_required
 def list_workouts():
     """
-    Retrieves all workouts stored in memory.
+    Retrieves a page of the workouts the authenticated user has stored, ordered by ID.
 
     Args:
-        None
+        None (accepts optional query parameters: `limit`, the page size, up to
+        WORKOUT_PAGE_MAX_SIZE; `after`, the `next_cursor` of the previous page;
+        `muscle` and `equipment`, comma-separated IDs every returned workout
+        must have, where "none" matches an empty list; and `expand`, e.g.
+        "muscles,equipment", to inline muscle and equipment names).
+        With `Accept: application/x-ndjson`, every workout after `after` is
+        streamed instead, one per line, in constant memory; `limit` is ignored.
 
     Returns:
-        Response: JSON response with a list of all stored workouts and status code 200.
+        Response: JSON response with:
+            - The page of stored workouts, the next page's cursor and status code 200,
+              or an NDJSON stream of all of them.
+            - Error message and status code 400 if `limit`, `after`, `muscle` or
+              `equipment` is invalid or `expand` names an unknown field.
 
     Raises:
         None
     """
     logging.info("Listing workouts:")
-    return jsonify(get_workouts()), 200
+    expand = [field.strip() for field in request.args.get("expand", "").split(",") if field.strip()]
+    try:
+        muscles, equipment = _id_filter_arg("muscle"), _id_filter_arg("equipment")
+        if _wants_ndjson():
+            workouts = iter_workouts(
+                g.user_id, expand, after=request.args.get("after"), muscles=muscles, equipment=equipment,
+            )
+            return _ndjson_response(workouts), 200
+        limit = _page_limit()
+        if limit is None:
+            return jsonify({"status": "error", "message": f"limit must be between 1 and {WORKOUT_PAGE_MAX_SIZE}."}), 400
+        workouts = get_workouts(
+            g.user_id,
+            expand,
+            limit=limit,
+            after=request.args.get("after"),
+            muscles=muscles,
+            equipment=equipment,
+        )
+        return jsonify(workouts), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+
+@app.route('/workouts/search', methods=['GET'])
+@login_required
+def search_workouts_route():
+    """
+    Searches the names and descriptions of the authenticated user's workouts.
+
+    Args:
+        None (accepts query parameters: `q`, the words to search for, and an
+        optional `limit`, as for GET /workouts).
+
+    Returns:
+        Response: JSON response with:
+            - The ranked matches, each with a snippet, and status code 200.
+            - Error message and status code 400 if `q` has no words or `limit` is invalid.
+
+    Raises:
+        None
+    """
+    logging.info("Searching workouts:")
+    limit = _page_limit()
+    if limit is None:
+        return jsonify({"status": "error", "message": f"limit must be between 1 and {WORKOUT_PAGE_MAX_SIZE}."}), 400
+    try:
+        return jsonify(search_workouts(g.user_id, request.args.get("q", ""), limit=limit)), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
 
 @app.route('/workouts/<int:workout_id>', methods=['PUT'])
+@login_required
 def update_workout_route(workout_id):
     """
-    Updates a workout's details.
+    Updates the details of one of the authenticated user's workouts.
 
     Args:
         workout_id (int): The ID of the workout to update.
@@ -194,7 +433,7 @@ def update_workout_route(workout_id):
     if not new_name or not new_description:
         return jsonify({"error": "Name and description are required."}), 400
 
-    result = update_workout(workout_id, new_name, new_description)
+    result = update_workout(g.user_id, workout_id, new_name, new_description)
     if result["status"] == "success":
         logging.info("Workout updated successfully.")
         return jsonify(result), 200
@@ -204,9 +443,10 @@ def update_workout_route(workout_id):
 
 
 @app.route('/workouts/<int:workout_id>', methods=['DELETE'])
+@login_required
 def delete_workout_route(workout_id):
     """
-    Deletes a workout from memory.
+    Deletes one of the authenticated user's workouts from memory.
 
     Args:
         workout_id (int): The ID of the workout to delete.
@@ -219,7 +459,7 @@ def delete_workout_route(workout_id):
     Raises:
         None
     """
-    result = delete_workout(workout_id)
+    result = delete_workout(g.user_id, workout_id)
     if result["status"] == "success":
         logging.info("Workout deleted successfully.")
         return jsonify(result), 200
@@ -228,22 +468,74 @@ def delete_workout_route(workout_id):
         return jsonify(result), 404
 
 
+@app.route('/workouts/<int:workout_id>/restore', methods=['POST'])
+@login_required
+def restore_workout_route(workout_id):
+    """
+    Restores one of the authenticated user's deleted workouts without a Wger lookup.
+
+    Args:
+        workout_id (int): The ID of the workout to restore.
+
+    Returns:
+        Response: JSON response with:
+            - The restored workout and status code 200 if successful.
+            - Error message and status code 400 if the workout is already stored.
+            - Error message and status code 404 if the workout is not in the deleted workouts.
+
+    Raises:
+        None
+    """
+    try:
+        result = restore_workout(g.user_id, workout_id)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if result["status"] == "success":
+        logging.info("Workout restored successfully.")
+        return jsonify(result), 200
+    else:
+        logging.error("Failed to restore workout.")
+        return jsonify(result), 404
+
+
 @app.route('/workouts/deleted', methods=['GET'])
+@login_required
 def list_deleted_workouts():
     """
-    Retrieves all workouts that have been deleted and logged.
+    Retrieves a page of the workouts the authenticated user has deleted, oldest deletion first.
 
     Args:
-        None
+        None (accepts optional query parameters: `limit` and `after`, as for
+        GET /workouts; `since` and `until`, Unix times bounding the deletion time).
+        With `Accept: application/x-ndjson`, every deleted workout after
+        `after` is streamed instead, one per line; `limit` is ignored.
 
     Returns:
-        Response: JSON response with a list of deleted workouts and status code 200.
+        Response: JSON response with:
+            - The page of deleted workouts, the next page's cursor and status code 200,
+              or an NDJSON stream of all of them.
+            - Error message and status code 400 if a query parameter is invalid.
 
     Raises:
         None
     """
     logging.info("List of deleted workouts:")
-    return jsonify(get_deleted_workouts()), 200
+    ndjson = _wants_ndjson()
+    limit = _page_limit()
+    if limit is None and not ndjson:
+        return jsonify({"status": "error", "message": f"limit must be between 1 and {WORKOUT_PAGE_MAX_SIZE}."}), 400
+    try:
+        since, until = _timestamp_arg("since"), _timestamp_arg("until")
+    except ValueError:
+        return jsonify({"status": "error", "message": "since and until must be Unix timestamps."}), 400
+    try:
+        if ndjson:
+            workouts = iter_deleted_workouts(g.user_id, after=request.args.get("after"), since=since, until=until)
+            return _ndjson_response(workouts), 200
+        result = get_deleted_workouts(g.user_id, limit=limit, after=request.args.get("after"), since=since, until=until)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(result), 200
 
 
 @app.route('/health', methods=['GET'])
@@ -253,5 +545,96 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+@app.route('/stats', methods=['GET'])
+def lookup_stats():
+    """
+    Reports cache and request-coalescing counters for exercise lookups.
+
+    Args:
+        None
+
+    Returns:
+        Response: JSON response with the lookup counters and status code 200.
+
+    Raises:
+        None
+    """
+    return jsonify(get_lookup_stats()), 200
+
+
+@app.cli.command("sync-catalog")
+@click.option("--incremental", is_flag=True, help="Only fetch exercises updated since the last sync.")
+def sync_catalog_command(incremental):
+    """
+    Mirrors the wger exercise listing into the local catalog table and
+    refreshes the muscle and equipment reference tables.
+
+    Args:
+        incremental (bool): Whether to run an incremental re-sync.
+
+    Returns:
+        None
+
+    Raises:
+        requests.exceptions.RequestException: If wger cannot be reached.
+    """
+    summary = sync_catalog(WGER_API_BASE_URL, WGER_LANGUAGE, incremental=incremental)
+    reset_exercise_bloom_filters()
+    reference = sync_reference_tables(WGER_API_BASE_URL)
+    click.echo(
+        f"{summary['mode'].capitalize()} sync complete: {summary['fetched']} exercises written, "
+        f"{summary['deleted']} removed, {reference['muscles']} muscles and "
+        f"{reference['equipment']} equipment types loaded."
+    )
+
+
+@app.cli.command("compact-deleted-workouts")
+def compact_deleted_workouts_command():
+    """
+    Removes deleted workouts past the retention limits right away.
+
+    Compaction also runs in the background after deletes; this command is
+    for cron jobs or after lowering DELETED_WORKOUTS_MAX_COUNT or
+    DELETED_WORKOUTS_MAX_AGE.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If the SQLite store cannot be compacted.
+    """
+    removed = compact_deleted_workouts()
+    click.echo(f"Compaction complete: {removed} deleted workouts removed.")
+
+
+@app.cli.command("build-catalog-snapshot")
+@click.option("--output", default=CATALOG_SNAPSHOT_PATH or "catalog.snapshot", show_default=True,
+              help="Path of the snapshot file; defaults to CATALOG_SNAPSHOT_PATH.")
+def build_catalog_snapshot_command(output):
+    """
+    Writes the mirrored exercise catalog to a memory-mapped snapshot file.
+
+    Run `sync-catalog` first. Point CATALOG_SNAPSHOT_PATH at the output so
+    workers serve lookups from it; the file is replaced atomically, and workers
+    pick up a rebuilt snapshot when they restart.
+
+    Args:
+        output (str): Path of the snapshot file.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If the catalog cannot be read.
+        OSError: If the snapshot cannot be written.
+    """
+    count = build_catalog_snapshot(output, WGER_LANGUAGE)
+    reset_catalog_snapshot()
+    click.echo(f"Catalog snapshot written to {output}: {count} exercises.")
+
+
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,66 @@
+"""
+Wall-time benchmark for adding many workouts: serial adds versus one batch.
+
+Starts a local wger stand-in that delays every response, then adds the same
+set of exercise IDs once with sequential `add_workout_to_memory` calls and once
+with a single `add_workouts_to_memory` call.
+
+Usage:
+    python -m benchmarks.bench_batch_add [--count 50] [--latency-ms 50]
+"""
+import argparse
+import time
+
+from benchmarks.wger_stub import WgerStubServer
+from fitness_tracker.models import workout_model
+from fitness_tracker.models.workout_store import create_workout_store
+from fitness_tracker.utils import wger_client
+
+# The user the benchmark stores workouts for
+BENCH_USER_ID = 1
+
+
+def reset():
+    workout_model.workout_store.clear()
+    workout_model.exercise_cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    stub = WgerStubServer(latency=f"fixed:{args.latency_ms}", catalog_size=args.count).start()
+    workout_model.WGER_API_BASE_URL = stub.exercise_url
+    workout_model.WGER_DISK_CACHE_ENABLED = False
+    # Keep workout storage out of the measurement
+    workout_model.workout_store = create_workout_store("memory")
+    # The stand-in has no fair-use limit to respect
+    wger_client.limiter.rate = 0
+    workout_ids = list(range(1, args.count + 1))
+
+    try:
+        reset()
+        start = time.perf_counter()
+        for workout_id in workout_ids:
+            workout_model.add_workout_to_memory(BENCH_USER_ID, workout_id)
+        serial = time.perf_counter() - start
+
+        reset()
+        start = time.perf_counter()
+        result = workout_model.add_workouts_to_memory(BENCH_USER_ID, workout_ids)
+        batch = time.perf_counter() - start
+        assert result["added"] == args.count
+    finally:
+        reset()
+        wger_client.close_session()
+        stub.stop()
+
+    print(f"upstream latency {args.latency_ms:.0f}ms, {args.count} workouts")
+    print(f"serial  {serial * 1000:.1f}ms")
+    print(f"batch   {batch * 1000:.1f}ms (concurrency {workout_model.WORKOUT_BATCH_CONCURRENCY})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Cold-start and lookup benchmark for the memory-mapped catalog snapshot.
+
+Fills a throwaway SQLite catalog with synthetic exercises, exports it with
+`build_catalog_snapshot`, then compares what a fresh worker pays before its
+first lookup (loading the mirror from SQLite versus opening the snapshot) and
+the per-lookup cost of each.
+
+Usage:
+    python -m benchmarks.bench_catalog_snapshot [--size 20000] [--lookups 20000]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from fitness_tracker.models import catalog_model
+from fitness_tracker.utils import sql_utils
+from fitness_tracker.utils.catalog_snapshot import CatalogSnapshot
+
+LANGUAGE = 2
+
+
+def fill_catalog(size):
+    rows = [
+        (
+            exercise_id,
+            LANGUAGE,
+            f"Exercise {exercise_id}",
+            f"Synthesized exercise {exercise_id}.\n- Step one\n- Step two",
+            json.dumps([exercise_id % 15 + 1]),
+            json.dumps([exercise_id % 10 + 1]),
+            "2024-01-01T00:00:00Z",
+            time.time(),
+        )
+        for exercise_id in range(1, size + 1)
+    ]
+    with sql_utils.get_db_connection() as conn:
+        conn.executemany("INSERT INTO exercise_catalog VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+
+
+def load_from_sqlite():
+    """What a worker does to warm an in-memory copy of the mirror at boot."""
+    with sql_utils.get_db_connection() as conn:
+        rows = conn.execute("""
+            SELECT id, name, description, muscles, equipment FROM exercise_catalog WHERE language = ?
+        """, (LANGUAGE,)).fetchall()
+    return {
+        row[0]: {
+            "id": row[0],
+            "name": row[1],
+            "description": row[2],
+            "muscles": json.loads(row[3]),
+            "equipment": json.loads(row[4]),
+        }
+        for row in rows
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sql_utils.DB_PATH = os.path.join(directory, "bench.db")
+        snapshot_path = os.path.join(directory, "catalog.snapshot")
+        catalog_model.initialize_catalog()
+        fill_catalog(args.size)
+        catalog_model.build_catalog_snapshot(snapshot_path, LANGUAGE)
+        ids = [random.randint(1, args.size) for _ in range(args.lookups)]
+
+        _, sqlite_load = timed(load_from_sqlite)
+        snapshot, snapshot_open = timed(CatalogSnapshot, snapshot_path)
+
+        _, sqlite_lookups = timed(lambda: [catalog_model.get_catalog_exercise(i, LANGUAGE) for i in ids[:2000]])
+        _, snapshot_lookups = timed(lambda: [snapshot.get(i) for i in ids])
+        snapshot.close()
+
+        print(f"{args.size} exercises, snapshot {os.path.getsize(snapshot_path) / 1024:.0f} KiB")
+        print(f"cold start  sqlite load {sqlite_load * 1000:9.2f}ms   snapshot open {snapshot_open * 1000:7.3f}ms")
+        print(f"lookup      sqlite query {sqlite_lookups / 2000 * 1e6:8.1f}us   snapshot get  {snapshot_lookups / len(ids) * 1e6:7.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Throughput benchmark for wger description cleaning.
+
+Compares the original `.replace("<p>", "").replace("</p>", "")` chain, a
+chained-replace cleaner extended to every tag and entity wger uses, and
+`clean_description` over a corpus built from the wger fixtures.
+
+Usage:
+    python -m benchmarks.bench_description_cleaner [--size 20000] [--repeat 5]
+"""
+import argparse
+import html
+import json
+import os
+import re
+import time
+
+from fitness_tracker.utils.html_utils import clean_description
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "wger_exercises.json")
+_OTHER_TAGS_RE = re.compile(r"<[^>]+>")
+
+
+def legacy_chain(description):
+    """The cleaner used before clean_description: paragraph tags only."""
+    return description.replace("<p>", "").replace("</p>", "").strip()
+
+
+def complete_chain(description):
+    """A chained-replace cleaner that also handles lists, breaks and entities."""
+    text = description.replace("<p>", "").replace("</p>", "\n")
+    text = text.replace("<ul>", "\n").replace("</ul>", "\n").replace("<ol>", "\n").replace("</ol>", "\n")
+    text = text.replace("<li>", "\n- ").replace("</li>", "\n")
+    text = text.replace("<br>", "\n").replace("<br />", "\n").replace("<br/>", "\n")
+    text = _OTHER_TAGS_RE.sub("", text)
+    text = html.unescape(text).replace("\xa0", " ")
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+
+def load_corpus(size):
+    with open(FIXTURES) as f:
+        descriptions = [exercise["description"] for exercise in json.load(f)]
+    return [descriptions[i % len(descriptions)] for i in range(size)]
+
+
+def measure(cleaner, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for description in corpus:
+            cleaner(description)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.size)
+    for label, cleaner in [
+        ("legacy <p> chain (incomplete)", legacy_chain),
+        ("complete replace chain", complete_chain),
+        ("clean_description", clean_description),
+    ]:
+        print(f"{label:<30} {measure(cleaner, corpus, args.repeat):>12,.0f} descriptions/sec")
+
+
+if __name__ == "__main__":
+    main()
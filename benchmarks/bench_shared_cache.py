@@ -0,0 +1,82 @@
+"""
+Hit-rate benchmark for the exercise cache backends under 8 worker processes.
+
+Forks worker processes the way a pre-forking server such as gunicorn does,
+and has each one look up exercises drawn from the same skewed distribution
+through `check_workout_in_api` against a local wger stand-in. It runs once
+with the per-process "memory" backend and once with the "shared" backend,
+then reports the combined hit rate and the number of requests wger received.
+
+Usage:
+    python -m benchmarks.bench_shared_cache [--workers 8] [--lookups 500] [--exercises 400]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.wger_stub import WgerStubServer
+from fitness_tracker.models import catalog_model, workout_model
+from fitness_tracker.utils import sql_utils, wger_client
+from fitness_tracker.utils.cache import create_cache
+
+
+def worker(index, args, results):
+    rng = random.Random(index)
+    for _ in range(args.lookups):
+        # Popular exercises are looked up far more often than the long tail
+        workout_model.check_workout_in_api(min(int(rng.paretovariate(1.2)), args.exercises))
+    results.put(workout_model.exercise_cache.stats())
+
+
+def run(backend, args, directory):
+    stub = WgerStubServer(catalog_size=args.exercises).start()
+    workout_model.WGER_API_BASE_URL = stub.exercise_url
+    workout_model.exercise_cache = create_cache(
+        backend, path=os.path.join(directory, f"{backend}.cache"), max_entries=1024, ttl=3600,
+    )
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    start = time.perf_counter()
+    workers = [context.Process(target=worker, args=(index, args, results)) for index in range(args.workers)]
+    for process in workers:
+        process.start()
+    stats = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    elapsed = time.perf_counter() - start
+    stub.stop()
+
+    if backend == "shared":
+        # Every worker reports the same shared counters
+        hits, misses = stats[0]["hits"], stats[0]["misses"]
+    else:
+        hits, misses = sum(s["hits"] for s in stats), sum(s["misses"] for s in stats)
+    upstream = sum(stub.stats().values())
+    print(f"{backend:7} hit rate {hits / (hits + misses):6.1%}   wger requests {upstream:5}   wall {elapsed * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--exercises", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A throwaway database keeps the catalog mirror and disk cache out of the measurement
+        sql_utils.DB_PATH = os.path.join(directory, "bench.db")
+        catalog_model.initialize_catalog()
+        workout_model.WGER_DISK_CACHE_ENABLED = False
+        # The stand-in has no fair-use limit to respect
+        wger_client.limiter.rate = 0
+
+        print(f"{args.workers} workers x {args.lookups} lookups over {args.exercises} exercises")
+        run("memory", args, directory)
+        run("shared", args, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Latency benchmark for adding workouts against a local wger stand-in server.
+
+Runs 1,000 sequential `add_workout_to_memory` calls against
+`benchmarks.wger_stub` twice: once with a bare
+`requests.get` per call (a new connection every time) and once with the shared
+pooled session from `fitness_tracker.utils.wger_client`. Reports p50/p99 latency
+for each mode.
+
+Usage:
+    python -m benchmarks.bench_wger_client [--count 1000] [--latency fixed:0]
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+from benchmarks.wger_stub import WgerStubServer
+from fitness_tracker.models import workout_model
+from fitness_tracker.models.workout_store import create_workout_store
+from fitness_tracker.utils import wger_client
+
+# The user the benchmark stores workouts for
+BENCH_USER_ID = 1
+
+
+def bare_get(url, headers=None, timeout=None, deadline=None, priority=None):
+    """The pre-pooling behaviour: a fresh connection for every request, without deadline or rate limit."""
+    return requests.get(url, headers=headers, timeout=timeout)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(count):
+    latencies = []
+    workout_model.workout_store.clear()
+    workout_model.exercise_cache.clear()
+    for workout_id in range(1, count + 1):
+        start = time.perf_counter()
+        workout_model.add_workout_to_memory(BENCH_USER_ID, workout_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    workout_model.workout_store.clear()
+    return latencies
+
+
+def report(label, latencies):
+    print(
+        f"{label:<8} p50={percentile(latencies, 50):.3f}ms "
+        f"p99={percentile(latencies, 99):.3f}ms "
+        f"mean={statistics.mean(latencies):.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--latency", default="fixed:0", help="Stand-in latency spec, see benchmarks.wger_stub")
+    args = parser.parse_args()
+
+    stub = WgerStubServer(latency=args.latency, catalog_size=args.count).start()
+    workout_model.WGER_API_BASE_URL = stub.exercise_url
+    # Measure the network path only
+    workout_model.WGER_DISK_CACHE_ENABLED = False
+    # Keep workout storage out of the measurement
+    workout_model.workout_store = create_workout_store("memory")
+    # The stand-in has no fair-use limit to respect
+    wger_client.limiter.rate = 0
+
+    pooled_get = workout_model.wger_get
+    try:
+        workout_model.wger_get = bare_get
+        report("before", run(args.count))
+        workout_model.wger_get = pooled_get
+        report("after", run(args.count))
+    finally:
+        workout_model.wger_get = pooled_get
+        wger_client.close_session()
+        stub.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Export benchmark for listing every stored workout of a user.
+
+Stores `--count` workouts for one user on a throwaway SQLite database and
+exports them through the Flask app three ways: as one JSON document built
+with `jsonify` (what a listing without pages costs), by following
+GET /workouts pages of WORKOUT_PAGE_MAX_SIZE, and as a single
+`Accept: application/x-ndjson` stream. Reports the total time, the time to
+the first byte of the body and the peak memory traced while exporting. Runs
+with a larger `--count` show that the stream's peak memory does not grow
+with the collection while the document's does.
+
+Usage:
+    python -m benchmarks.bench_workout_export [--count 20000]
+"""
+import argparse
+import base64
+import os
+import tempfile
+import time
+import tracemalloc
+
+from flask import jsonify
+
+from fitness_tracker.utils import sql_utils
+
+USERNAME = "bench"
+PASSWORD = "bench-password"
+
+
+def make_workout(workout_id):
+    return {
+        "id": workout_id,
+        "name": f"Exercise {workout_id}",
+        "description": f"Synthesized exercise {workout_id}.\n- Step one\n- Step two",
+        "muscles": [workout_id % 15 + 1],
+        "equipment": [workout_id % 10 + 1],
+    }
+
+
+def measure(export):
+    """Runs an export generator; returns (seconds, seconds to its first chunk, peak bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    for _ in export():
+        if first is None:
+            first = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, first, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sql_utils.DB_PATH = os.path.join(directory, "bench.db")
+        sql_utils.initialize_database()
+        # Imported here so the workout store opens the throwaway database
+        from app import WORKOUT_PAGE_MAX_SIZE, app
+        from fitness_tracker.models.user_model import create_user, get_authenticated_user_id
+        from fitness_tracker.models.workout_model import get_workouts, workout_store
+
+        create_user(USERNAME, PASSWORD)
+        user_id = get_authenticated_user_id(USERNAME, PASSWORD)
+        workout_store.add_many(user_id, [make_workout(workout_id) for workout_id in range(1, args.count + 1)])
+        client = app.test_client()
+        token = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+        auth = {"Authorization": f"Basic {token}"}
+
+        def document():
+            with app.test_request_context():
+                yield jsonify(get_workouts(user_id)).get_data()
+
+        def pages():
+            cursor = None
+            while True:
+                query = {"limit": WORKOUT_PAGE_MAX_SIZE, **({"after": cursor} if cursor else {})}
+                page = client.get("/workouts", query_string=query, headers=auth).get_json()
+                yield page
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return
+
+        def stream():
+            response = client.get("/workouts", headers={**auth, "Accept": "application/x-ndjson"}, buffered=False)
+            yield from response.response
+            response.close()
+
+        print(f"exporting {args.count} workouts of one user")
+        print(f"{'mode':<16}{'total':>12}{'first byte':>14}{'peak memory':>14}")
+        for name, export in (("json document", document), ("json pages", pages), ("ndjson stream", stream)):
+            elapsed, first, peak = measure(export)
+            print(f"{name:<16}{elapsed * 1e3:10.1f}ms{first * 1e3:12.1f}ms{peak / 2 ** 20:11.1f}MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Memory benchmark for the layouts of stored workouts.
+
+Builds `--count` stored workouts from decoded wger JSON, once as the plain
+dicts the memory store used to keep and once as slotted `Workout` records,
+and uses tracemalloc to report the bytes allocated per workout. Name and
+description strings are shared with the decoded input, so the figures are the
+per-record overhead that the layout controls.
+
+Usage:
+    python -m benchmarks.bench_workout_memory [--count 200000]
+"""
+import argparse
+import json
+import tracemalloc
+
+from fitness_tracker.models.workout import Workout
+
+
+def make_payloads(count):
+    """Decodes workouts from JSON, as they arrive from wger or the caches."""
+    return json.loads(json.dumps([
+        {
+            "id": workout_id,
+            "name": f"Exercise {workout_id}",
+            "description": f"Synthesized exercise {workout_id}.",
+            "muscles": [workout_id % 15 + 1, (workout_id + 7) % 15 + 1],
+            "equipment": [workout_id % 10 + 1] if workout_id % 3 else [],
+        }
+        for workout_id in range(1, count + 1)
+    ]))
+
+
+def measure(build, payloads):
+    tracemalloc.start()
+    records = [build(payload) for payload in payloads]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) == len(payloads)
+    return allocated / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.count)
+    layouts = {
+        "dict": lambda payload: dict(payload, muscles=list(payload["muscles"]), equipment=list(payload["equipment"])),
+        "Workout": Workout.from_dict,
+    }
+    print(f"{args.count} workouts; bytes allocated per workout, excluding name and description")
+    for label, build in layouts.items():
+        print(f"{label:<10}{measure(build, payloads):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
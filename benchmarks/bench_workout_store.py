@@ -0,0 +1,127 @@
+"""
+Per-operation benchmark for the workout store backends.
+
+Times add, get, list, a keyset page of list, a page filtered by muscle and
+equipment, a full-text search, update, delete, list_deleted and restore for
+one user against the in-process "memory" store and the SQLite
+store (on a throwaway database), and reports the mean cost of each operation.
+Raising `--count` shows that a page, a delete and a restore cost the same
+however many workouts the user has, and that a filtered page only costs in
+proportion to the matching workouts. `--other-users` first fills the store with
+20 workouts for each of that many other users, to check that one user's
+operations, searches included, do not slow down as the tables grow.
+
+Usage:
+    python -m benchmarks.bench_workout_store [--count 2000] [--other-users 50000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from fitness_tracker.models.workout_store import create_workout_store
+from fitness_tracker.utils import sql_utils
+
+BENCH_USER_ID = 0
+WORKOUTS_PER_OTHER_USER = 20
+PAGE_SIZE = 50
+
+
+def make_workout(workout_id):
+    return {
+        "id": workout_id,
+        "name": f"Exercise {workout_id}",
+        "description": f"Synthesized exercise {workout_id}.\n- Step one\n- Step two",
+        "muscles": [workout_id % 15 + 1],
+        "equipment": [workout_id % 10 + 1],
+    }
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def fill_other_users(backend, store, users):
+    """Stores WORKOUTS_PER_OTHER_USER workouts for users 1..users."""
+    workouts = [make_workout(workout_id) for workout_id in range(1, WORKOUTS_PER_OTHER_USER + 1)]
+    if backend == "memory":
+        for user_id in range(1, users + 1):
+            store.add_many(user_id, workouts)
+        return
+    # Bulk-load with one statement; going through add_many would dominate the run
+    with sql_utils.get_db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO workouts (user_id, workout_id, name, description, muscles, equipment, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (
+                (user_id, w["id"], w["name"], w["description"], json.dumps(w["muscles"]), json.dumps(w["equipment"]))
+                for user_id in range(1, users + 1)
+                for w in workouts
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO workout_tags (user_id, field, tag_id, workout_id) VALUES (?, ?, ?, ?)",
+            (
+                (user_id, field, w[field][0], w["id"])
+                for user_id in range(1, users + 1)
+                for w in workouts
+                for field in ("muscles", "equipment")
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO workouts_fts (rowid, name, description) VALUES (?, ?, ?)",
+            ((user_id << 32 | w["id"], w["name"], w["description"]) for user_id in range(1, users + 1) for w in workouts),
+        )
+
+
+def run(backend, count, other_users):
+    store = create_workout_store(backend)
+    store.clear()
+    fill_other_users(backend, store, other_users)
+    ids = list(range(1, count + 1))
+    results = {
+        "add": timed(lambda workout: store.add(BENCH_USER_ID, workout), [make_workout(workout_id) for workout_id in ids]),
+        "get": timed(lambda workout_id: store.get(BENCH_USER_ID, workout_id), ids),
+        "list": timed(lambda _: store.list(BENCH_USER_ID), range(10)),
+        "list_page": timed(lambda after: store.list(BENCH_USER_ID, limit=PAGE_SIZE, after=after), ids[::max(1, count // 100)]),
+        "list_filtered": timed(
+            lambda muscle: store.list(BENCH_USER_ID, limit=PAGE_SIZE, muscles=[muscle], equipment=[(muscle - 1) % 5 + 1]),
+            range(1, 16),
+        ),
+        "search": timed(
+            lambda workout_id: store.search(BENCH_USER_ID, ["exercise", str(workout_id)], limit=PAGE_SIZE),
+            ids[::max(1, count // 100)],
+        ),
+        "update": timed(lambda workout_id: store.update(BENCH_USER_ID, workout_id, "Renamed", "New description"), ids),
+        "delete": timed(lambda workout_id: store.delete(BENCH_USER_ID, workout_id), ids),
+        "list_deleted": timed(lambda _: store.list_deleted(BENCH_USER_ID), range(10)),
+        "restore": timed(lambda workout_id: store.restore(BENCH_USER_ID, workout_id), ids),
+    }
+    store.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--other-users", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sql_utils.DB_PATH = os.path.join(directory, "bench.db")
+        results = {backend: run(backend, args.count, args.other_users) for backend in ("memory", "sqlite")}
+
+    other_rows = args.other_users * WORKOUTS_PER_OTHER_USER
+    print(f"{args.count} workouts for one user, {other_rows} for {args.other_users} other users")
+    print(f"mean time per call (list calls return every workout of the user, list_page {PAGE_SIZE})")
+    print(f"{'operation':<14}{'memory':>12}{'sqlite':>12}")
+    for operation in results["memory"]:
+        print(f"{operation:<14}" + "".join(f"{results[backend][operation] * 1e6:10.1f}us" for backend in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Multi-threaded stress benchmark for the sharded in-memory workout store.
+
+Runs a mix of get, list, update, delete, restore and add calls for random
+users from 1, 2, 4 and 8 threads at once, the way a threaded server would,
+against a store with a single shard (one global lock) and with `--shards`
+shards. Reports throughput for each combination and checks afterwards that
+no workout was lost or duplicated.
+
+Under a CPython build with the GIL, threads cannot run store operations in
+parallel, so throughput stays roughly flat with either layout and the sharded
+store's gain is that it avoids lock convoys. On a free-threaded build the
+sharded store scales with thread count while the single lock does not.
+
+Usage:
+    python -m benchmarks.bench_workout_store_threads [--ops 20000] [--users 1000] [--shards 16]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from fitness_tracker.models.workout_store import create_workout_store
+
+THREAD_COUNTS = (1, 2, 4, 8)
+WORKOUTS_PER_USER = 20
+
+
+def make_workout(workout_id):
+    return {
+        "id": workout_id,
+        "name": f"Exercise {workout_id}",
+        "description": "",
+        "muscles": [workout_id % 15 + 1],
+        "equipment": [workout_id % 10 + 1],
+    }
+
+
+def worker(store, index, ops, users, barrier):
+    rng = random.Random(index)
+    barrier.wait()
+    for _ in range(ops):
+        user_id = rng.randrange(users)
+        workout_id = rng.randrange(1, WORKOUTS_PER_USER + 1)
+        operation = rng.random()
+        if operation < 0.4:
+            store.get(user_id, workout_id)
+        elif operation < 0.6:
+            store.list(user_id, limit=10)
+        elif operation < 0.8:
+            store.update(user_id, workout_id, f"Thread {index}", "")
+        elif operation < 0.9:
+            store.delete(user_id, workout_id)
+        elif store.restore(user_id, workout_id) is None:
+            store.add(user_id, make_workout(workout_id))
+
+
+def run(shards, threads, ops, users):
+    store = create_workout_store("memory", shards=shards)
+    for user_id in range(users):
+        store.add_many(user_id, [make_workout(workout_id) for workout_id in range(1, WORKOUTS_PER_USER + 1)])
+    barrier = threading.Barrier(threads + 1)
+    workers = [
+        threading.Thread(target=worker, args=(store, index, ops // threads, users, barrier))
+        for index in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Deletes turn a stored workout into a tombstone and restores turn it back,
+    # so every workout ID must be either stored or tombstoned exactly once
+    stored = sum(len(store.list(user_id)) for user_id in range(users))
+    tombstoned = sum(len(store.list_deleted(user_id)) for user_id in range(users))
+    assert stored + tombstoned == users * WORKOUTS_PER_USER, "workouts were lost"
+    return (ops // threads) * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=20000, help="Operations per run, split across threads.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{args.ops} mixed operations over {args.users} users; GIL {'enabled' if gil else 'disabled'}")
+    print(f"{'threads':<10}{'1 shard':>14}{f'{args.shards} shards':>14}")
+    for threads in THREAD_COUNTS:
+        single = run(1, threads, args.ops, args.users)
+        sharded = run(args.shards, threads, args.ops, args.users)
+        print(f"{threads:<10}{single:>10.0f}/s  {sharded:>10.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+A local stand-in for the wger API, for benchmarks and load tests.
+
+Serves `/api/v2/exercise/<id>/`, the paginated `/api/v2/exercise/` listing and
+the `/api/v2/muscle/` and `/api/v2/equipment/` reference listings from the JSON
+fixtures in `benchmarks/fixtures`, plus synthesized exercises
+for every other ID up to `--catalog-size`. Responses can be slowed down with a
+configurable latency distribution, fail with 503 at a given error rate, and
+return 404 for configurable ID ranges. Exercise responses carry an ETag and
+honour If-None-Match with 304 Not Modified.
+
+Usage:
+    python -m benchmarks.wger_stub --port 8001 --latency lognormal:20:0.5 --error-rate 0.01 --missing 5000-5999
+    WGER_API_BASE_URL=http://127.0.0.1:8001/api/v2/exercise/ python app.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+EXERCISE_PATH = "/api/v2/exercise/"
+REFERENCE_PATHS = {"/api/v2/muscle/": "wger_muscles.json", "/api/v2/equipment/": "wger_equipment.json"}
+
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution spec into a sampler returning seconds.
+
+    Supported specs (all values in milliseconds):
+        fixed:<ms>
+        uniform:<low>:<high>
+        normal:<mean>:<stddev>
+        exponential:<mean>
+        lognormal:<median>:<sigma>
+
+    Args:
+        spec (str): The distribution spec, e.g. "lognormal:20:0.5".
+
+    Returns:
+        callable: A function taking a random.Random and returning a delay in seconds.
+
+    Raises:
+        ValueError: If the spec is not recognised.
+    """
+    name, *params = spec.split(":")
+    values = [float(value) for value in params]
+    if name == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if name == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if name == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if name == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) / 1000 if values[0] else 0.0
+    if name == "lognormal" and len(values) == 2:
+        mu = math.log(values[0]) if values[0] > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000 if values[0] else 0.0
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def parse_ranges(spec):
+    """
+    Parses comma-separated ID ranges such as "1000-1999,5000".
+
+    Args:
+        spec (str): The ranges to parse; may be empty.
+
+    Returns:
+        list: A list of (low, high) inclusive tuples.
+
+    Raises:
+        ValueError: If a range is malformed.
+    """
+    ranges = []
+    for part in filter(None, (spec or "").split(",")):
+        low, _, high = part.partition("-")
+        ranges.append((int(low), int(high or low)))
+    return ranges
+
+
+def load_fixture(name):
+    path = os.path.join(FIXTURES_DIR, name)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+class WgerStubServer:
+    """
+    A threaded HTTP server that mimics the wger exercise endpoints.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free port.
+        latency (str): Latency distribution spec, see `parse_latency`.
+        error_rate (float): Probability of answering 503 instead of the real response.
+        missing (str): ID ranges that always answer 404, e.g. "1000-1999".
+        catalog_size (int): Highest ID served; IDs without a fixture are synthesized.
+        seed (int): Seed for latency and error sampling, for repeatable runs.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0", error_rate=0.0,
+                 missing="", catalog_size=1000, seed=0):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.missing = parse_ranges(missing)
+        self.catalog_size = catalog_size
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._counts = Counter()
+        self._counts_lock = threading.Lock()
+        self.exercises = {exercise["id"]: exercise for exercise in load_fixture("wger_exercises.json")}
+        self._listings = {}
+        self.reference = {path: load_fixture(name) for path, name in REFERENCE_PATHS.items()}
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def exercise_url(self):
+        """The value to use for WGER_API_BASE_URL."""
+        return self.base_url + EXERCISE_PATH
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self):
+        """Returns the number of responses sent, keyed by status code."""
+        with self._counts_lock:
+            return dict(self._counts)
+
+    def record(self, status):
+        with self._counts_lock:
+            self._counts[status] += 1
+
+    def delay_and_fail(self):
+        """Sleeps for a sampled latency and returns True if the request should fail."""
+        with self._rng_lock:
+            delay = self.sample_latency(self._rng)
+            fail = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def is_missing(self, exercise_id):
+        if any(low <= exercise_id <= high for low, high in self.missing):
+            return True
+        return exercise_id not in self.exercises and not 1 <= exercise_id <= self.catalog_size
+
+    def get_exercise(self, exercise_id):
+        if self.is_missing(exercise_id):
+            return None
+        exercise = self.exercises.get(exercise_id)
+        if exercise is None:
+            exercise = {
+                "id": exercise_id,
+                "name": f"Exercise {exercise_id}",
+                "description": f"<p>Synthesized exercise {exercise_id}.</p><ul><li>Step one</li><li>Step two</li></ul>",
+                "muscles": [exercise_id % 15 + 1],
+                "equipment": [exercise_id % 10 + 1] if exercise_id % 3 else [],
+                "language": 2,
+                "last_update": "2024-01-01T00:00:00Z",
+            }
+        return exercise
+
+    def list_exercises(self, ordering):
+        if ordering not in self._listings:
+            ids = sorted(set(self.exercises) | set(range(1, self.catalog_size + 1)))
+            exercises = [exercise for exercise in map(self.get_exercise, ids) if exercise is not None]
+            if ordering:
+                field = ordering.lstrip("-")
+                exercises.sort(key=lambda exercise: exercise.get(field) or "", reverse=ordering.startswith("-"))
+            self._listings[ordering] = exercises
+        return self._listings[ordering]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlsplit(self.path)
+        if not url.path.startswith(EXERCISE_PATH) and url.path not in stub.reference:
+            return self._send_json(404, {"detail": "Not found."})
+        if stub.delay_and_fail():
+            return self._send_json(503, {"detail": "Service unavailable."})
+        if url.path in stub.reference:
+            return self._send_listing(url.path, stub.reference[url.path], parse_qs(url.query))
+
+        tail = url.path[len(EXERCISE_PATH):].strip("/")
+        if not tail:
+            query = parse_qs(url.query)
+            return self._send_listing(EXERCISE_PATH, stub.list_exercises(query.get("ordering", [""])[0]), query)
+        if not tail.isdigit():
+            return self._send_json(404, {"detail": "Not found."})
+        exercise = stub.get_exercise(int(tail))
+        if exercise is None:
+            return self._send_json(404, {"detail": "Not found."})
+        self._send_json(200, exercise, conditional=True)
+
+    def _send_listing(self, path, entries, query):
+        limit = int(query.get("limit", ["20"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        page = entries[offset:offset + limit]
+        next_url = None
+        if offset + limit < len(entries):
+            params = {key: values[0] for key, values in query.items()}
+            params["offset"] = offset + limit
+            next_url = f"http://{self.headers.get('Host')}{path}?{urlencode(params)}"
+        self._send_json(200, {"count": len(entries), "next": next_url, "previous": None, "results": page})
+
+    def _send_json(self, status, payload, conditional=False):
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if conditional and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.server.stub.record(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if conditional:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. fixed:20, uniform:10:50, lognormal:20:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--missing", default="", help="ID ranges that return 404, e.g. 1000-1999,5000")
+    parser.add_argument("--catalog-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = WgerStubServer(args.host, args.port, args.latency, args.error_rate,
+                          args.missing, args.catalog_size, args.seed)
+    print(f"wger stand-in listening; set WGER_API_BASE_URL={stub.exercise_url}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import json
+import time
+import logging
+
+from fitness_tracker.utils.catalog_snapshot import write_snapshot
+from fitness_tracker.utils.sql_utils import get_db_connection, execute_sql_script
+from fitness_tracker.utils.wger_client import PRIORITY_BACKGROUND, clean_exercise, wger_get
+
+
+# Number of exercises requested per listing page during a sync
+CATALOG_PAGE_SIZE = 100
+
+
+def initialize_catalog():
+    """
+    Creates the exercise catalog tables if they do not exist yet.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is an error executing the SQL script.
+    """
+    execute_sql_script("sql/create_catalog_table.sql")
+
+
+initialize_catalog()
+
+
+def sync_catalog(base_url: str, language: int, incremental: bool = False, page_size: int = CATALOG_PAGE_SIZE) -> dict:
+    """
+    Mirror the wger exercise listing into the local catalog table.
+
+    A full sync pages through the whole `/exercise/` listing, upserts every
+    exercise and then removes catalog rows that wger no longer lists. An
+    incremental sync asks wger for the most recently updated exercises first
+    (`ordering=-last_update`) and stops at the first page that contains nothing
+    newer than the previous sync; it never removes rows. Without a previous
+    sync, an incremental request falls back to a full sync.
+
+    Args:
+        base_url (str): The wger exercise endpoint, e.g. "https://wger.de/api/v2/exercise/".
+        language (int): The wger language ID to mirror.
+        incremental (bool): Whether to only fetch exercises updated since the last sync.
+        page_size (int): Number of exercises requested per page.
+
+    Returns:
+        dict: A summary of the sync with the following keys:
+            - mode (str): Either "full" or "incremental".
+            - fetched (int): Number of exercises written to the catalog.
+            - deleted (int): Number of stale catalog rows removed.
+            - high_water (str): The newest `last_update` value seen so far.
+
+    Raises:
+        requests.exceptions.RequestException: If a listing page cannot be fetched.
+        sqlite3.Error: If there is a database error.
+    """
+    high_water = get_catalog_status(language)["high_water"] if incremental else None
+    if incremental and high_water is None:
+        logging.info("No previous catalog sync found, running a full sync.")
+        incremental = False
+    mode = "incremental" if incremental else "full"
+    logging.info(f"Starting {mode} catalog sync for language {language}.")
+
+    url = f"{base_url}?language={language}&limit={page_size}&offset=0"
+    if incremental:
+        url += "&ordering=-last_update"
+
+    sync_started = time.time()
+    new_high_water = high_water
+    fetched = 0
+    deleted = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        while url:
+            response = wger_get(url, priority=PRIORITY_BACKGROUND)
+            response.raise_for_status()
+            page = response.json()
+            rows = []
+            for exercise in page["results"]:
+                last_update = exercise.get("last_update")
+                if incremental and last_update and last_update <= high_water:
+                    continue
+                try:
+                    workout = clean_exercise(exercise)
+                except KeyError:
+                    logging.warning(f"Skipping incomplete catalog entry {exercise.get('id')}.")
+                    continue
+                rows.append((
+                    workout["id"],
+                    language,
+                    workout["name"],
+                    workout["description"],
+                    json.dumps(workout["muscles"]),
+                    json.dumps(workout["equipment"]),
+                    last_update,
+                    sync_started,
+                ))
+                if last_update and (new_high_water is None or last_update > new_high_water):
+                    new_high_water = last_update
+            cursor.executemany("""
+                INSERT OR REPLACE INTO exercise_catalog
+                    (id, language, name, description, muscles, equipment, last_update, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+            fetched += len(rows)
+            if incremental and not rows:
+                break
+            url = page.get("next")
+
+        if not incremental:
+            cursor.execute("""
+                DELETE FROM exercise_catalog WHERE language = ? AND synced_at < ?
+            """, (language, sync_started))
+            deleted = cursor.rowcount
+        cursor.execute("""
+            INSERT OR REPLACE INTO catalog_sync_state (language, high_water, synced_at)
+            VALUES (?, ?, ?)
+        """, (language, new_high_water, sync_started))
+        conn.commit()
+
+    logging.info(f"Catalog sync finished: {fetched} exercises written, {deleted} removed.")
+    return {"mode": mode, "fetched": fetched, "deleted": deleted, "high_water": new_high_water}
+
+
+def get_catalog_exercise(workout_id: int, language: int):
+    """
+    Look up a mirrored exercise without touching the network.
+
+    Args:
+        workout_id (int): The ID of the exercise.
+        language (int): The wger language ID.
+
+    Returns:
+        dict: The cleaned workout if it is in the catalog, otherwise None.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, name, description, muscles, equipment FROM exercise_catalog
+            WHERE id = ? AND language = ?
+        """, (workout_id, language))
+        row = cursor.fetchone()
+    if not row:
+        return None
+    return {
+        "id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "muscles": json.loads(row[3]),
+        "equipment": json.loads(row[4]),
+    }
+
+
+def get_catalog_ids(language: int) -> set:
+    """
+    Retrieve the IDs of every mirrored exercise for a language.
+
+    Args:
+        language (int): The wger language ID.
+
+    Returns:
+        set: The mirrored exercise IDs.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM exercise_catalog WHERE language = ?", (language,))
+        return {row[0] for row in cursor.fetchall()}
+
+
+def get_catalog_status(language: int) -> dict:
+    """
+    Report the state of the catalog mirror for a language.
+
+    Args:
+        language (int): The wger language ID.
+
+    Returns:
+        dict: A dictionary containing:
+            - count (int): Number of mirrored exercises.
+            - synced_at (float): Unix time of the last sync, or None if never synced.
+            - high_water (str): The newest `last_update` seen, or None.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM exercise_catalog WHERE language = ?", (language,))
+        count = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT high_water, synced_at FROM catalog_sync_state WHERE language = ?
+        """, (language,))
+        row = cursor.fetchone()
+    high_water, synced_at = row if row else (None, None)
+    return {"count": count, "synced_at": synced_at, "high_water": high_water}
+
+
+def build_catalog_snapshot(path: str, language: int) -> int:
+    """
+    Write the mirrored catalog for a language to a memory-mappable snapshot file.
+
+    Args:
+        path (str): Destination path of the snapshot.
+        language (int): The wger language ID to export.
+
+    Returns:
+        int: The number of exercises written.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+        OSError: If the snapshot cannot be written.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, name, description, muscles, equipment FROM exercise_catalog WHERE language = ?
+        """, (language,))
+        rows = cursor.fetchall()
+    exercises = (
+        {
+            "id": row[0],
+            "name": row[1],
+            "description": row[2],
+            "muscles": json.loads(row[3]),
+            "equipment": json.loads(row[4]),
+        }
+        for row in rows
+    )
+    count = write_snapshot(path, exercises, language)
+    logging.info(f"Wrote catalog snapshot with {count} exercises to {path}.")
+    return count
+
+
+def clear_catalog() -> None:
+    """
+    Remove every mirrored exercise and the sync state.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM exercise_catalog")
+        cursor.execute("DELETE FROM catalog_sync_state")
+        conn.commit()
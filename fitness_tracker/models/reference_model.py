@@ -0,0 +1,158 @@
+import time
+import logging
+from urllib.parse import urljoin
+
+import requests
+
+from fitness_tracker.utils.single_flight import SingleFlight
+from fitness_tracker.utils.sql_utils import get_db_connection, execute_sql_script
+from fitness_tracker.utils.wger_client import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, wger_get
+
+
+# Workout fields that can be expanded, and the wger resource listing their names
+REFERENCE_RESOURCES = {"muscles": "muscle", "equipment": "equipment"}
+
+# In-memory lookup tables, keyed by field and then by ID; loaded once and shared
+_reference_tables = None
+_reference_flight = SingleFlight()
+
+
+def initialize_reference_tables():
+    """
+    Creates the muscle and equipment reference table if it does not exist yet.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is an error executing the SQL script.
+    """
+    execute_sql_script("sql/create_reference_tables.sql")
+
+
+initialize_reference_tables()
+
+
+def _fetch_names(url: str, priority: int) -> dict:
+    """Pages through a wger listing and returns its entries' display names by ID."""
+    names = {}
+    url += "?limit=100"
+    while url:
+        response = wger_get(url, priority=priority)
+        response.raise_for_status()
+        page = response.json()
+        for entry in page["results"]:
+            # Muscles carry a Latin `name` and a common `name_en`; prefer the latter
+            names[entry["id"]] = entry.get("name_en") or entry["name"]
+        url = page.get("next")
+    return names
+
+
+def sync_reference_tables(base_url: str, priority: int = PRIORITY_BACKGROUND) -> dict:
+    """
+    Download the wger muscle and equipment listings into the local database.
+
+    The in-memory lookup tables are rebuilt from the new rows on their next use.
+
+    Args:
+        base_url (str): The wger exercise endpoint, e.g. "https://wger.de/api/v2/exercise/".
+            The muscle and equipment endpoints are resolved next to it.
+        priority (int): The wger client's rate limiter lane for the requests.
+
+    Returns:
+        dict: The number of entries stored per expandable field.
+
+    Raises:
+        requests.exceptions.RequestException: If a listing cannot be fetched.
+        sqlite3.Error: If there is a database error.
+    """
+    global _reference_tables
+    fetched = {
+        field: _fetch_names(urljoin(base_url, f"../{resource}/"), priority)
+        for field, resource in REFERENCE_RESOURCES.items()
+    }
+    synced_at = time.time()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for field, names in fetched.items():
+            cursor.execute("DELETE FROM exercise_reference WHERE kind = ?", (field,))
+            cursor.executemany("""
+                INSERT INTO exercise_reference (kind, id, name, synced_at) VALUES (?, ?, ?, ?)
+            """, [(field, entry_id, name, synced_at) for entry_id, name in names.items()])
+        conn.commit()
+    _reference_tables = None
+    logging.info(f"Reference tables synced: {len(fetched['muscles'])} muscles, {len(fetched['equipment'])} equipment.")
+    return {field: len(names) for field, names in fetched.items()}
+
+
+def _load_reference_tables() -> dict:
+    """Builds the lookup tables from the database, precomputing each inlined entry."""
+    tables = {field: {} for field in REFERENCE_RESOURCES}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT kind, id, name FROM exercise_reference")
+        for kind, entry_id, name in cursor.fetchall():
+            if kind in tables:
+                tables[kind][entry_id] = {"id": entry_id, "name": name}
+    return tables
+
+
+def _build_reference_tables(base_url: str, fetch: bool) -> dict:
+    """Loads the tables, downloading them first if the database has none."""
+    global _reference_tables
+    tables = _load_reference_tables()
+    if not all(tables.values()) and fetch:
+        try:
+            sync_reference_tables(base_url, PRIORITY_INTERACTIVE)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Could not load wger reference tables: {e}")
+            return tables
+        tables = _load_reference_tables()
+    if all(tables.values()):
+        _reference_tables = tables
+    return tables
+
+
+def get_reference_tables(base_url: str, fetch: bool = True) -> dict:
+    """
+    Return the muscle and equipment lookup tables, loading them on first use.
+
+    The tables are read from the local database once and then served from
+    memory. If the database holds no reference data yet and `fetch` is set,
+    they are downloaded from wger first; concurrent first calls share one
+    download. When that download fails, empty tables are returned and the
+    download is retried on the next call.
+
+    Args:
+        base_url (str): The wger exercise endpoint the reference listings sit next to.
+        fetch (bool): Whether missing reference data may be downloaded from wger.
+
+    Returns:
+        dict: For each expandable field, a dict mapping IDs to {"id", "name"} entries.
+            The entries are shared and must not be modified.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    tables = _reference_tables
+    if tables is not None:
+        return tables
+    return _reference_flight.do("reference_tables", lambda: _build_reference_tables(base_url, fetch))
+
+
+def clear_reference_tables() -> None:
+    """
+    Remove the stored reference data and drop the in-memory lookup tables.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    global _reference_tables
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM exercise_reference")
+        conn.commit()
+    _reference_tables = None
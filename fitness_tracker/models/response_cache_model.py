@@ -0,0 +1,152 @@
+import json
+import time
+import logging
+
+from fitness_tracker.utils.sql_utils import get_db_connection, execute_sql_script
+
+
+def initialize_response_cache():
+    """
+    Creates the wger response cache table if it does not exist yet.
+
+    Unlike the users table, the cache table is never dropped, so cached
+    exercises survive application restarts.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is an error executing the SQL script.
+    """
+    execute_sql_script("sql/create_response_cache_table.sql")
+
+
+initialize_response_cache()
+
+
+def get_cached_response(workout_id: int, language: int):
+    """
+    Retrieve a cached wger response for an exercise.
+
+    Args:
+        workout_id (int): The ID of the cached workout.
+        language (int): The wger language ID the workout was fetched in.
+
+    Returns:
+        dict: A dictionary with the following keys if an entry exists:
+            - workout (dict): The cleaned workout payload.
+            - etag (str): The ETag returned by wger, or None.
+            - last_modified (str): The Last-Modified header returned by wger, or None.
+            - fetched_at (float): Unix time the entry was last confirmed with wger.
+        None: If no entry is cached.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT payload, etag, last_modified, fetched_at FROM exercise_response_cache
+            WHERE workout_id = ? AND language = ?
+        """, (workout_id, language))
+        row = cursor.fetchone()
+    if not row:
+        return None
+    payload, etag, last_modified, fetched_at = row
+    return {
+        "workout": json.loads(payload),
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": fetched_at,
+    }
+
+
+def save_cached_response(workout_id: int, language: int, workout: dict, etag=None, last_modified=None) -> None:
+    """
+    Store or replace the cached wger response for an exercise.
+
+    Args:
+        workout_id (int): The ID of the workout.
+        language (int): The wger language ID the workout was fetched in.
+        workout (dict): The cleaned workout payload.
+        etag (str, optional): The ETag returned by wger.
+        last_modified (str, optional): The Last-Modified header returned by wger.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO exercise_response_cache
+                (workout_id, language, payload, etag, last_modified, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (workout_id, language, json.dumps(workout), etag, last_modified, time.time()))
+        conn.commit()
+    logging.info(f"Cached wger response for workout {workout_id} on disk.")
+
+
+def touch_cached_response(workout_id: int, language: int) -> None:
+    """
+    Mark a cached response as freshly revalidated.
+
+    Called after wger answers a conditional request with 304 Not Modified.
+
+    Args:
+        workout_id (int): The ID of the workout.
+        language (int): The wger language ID.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE exercise_response_cache SET fetched_at = ?
+            WHERE workout_id = ? AND language = ?
+        """, (time.time(), workout_id, language))
+        conn.commit()
+
+
+def delete_cached_response(workout_id: int, language: int) -> None:
+    """
+    Remove a cached response, e.g. after wger reports the exercise is gone.
+
+    Args:
+        workout_id (int): The ID of the workout.
+        language (int): The wger language ID.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM exercise_response_cache WHERE workout_id = ? AND language = ?
+        """, (workout_id, language))
+        conn.commit()
+
+
+def clear_response_cache() -> None:
+    """
+    Remove every cached wger response.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM exercise_response_cache")
+        conn.commit()
@@ -3,6 +3,7 @@ from fitness_tracker.utils.sql_utils import get_db_connection
 import hashlib
 import os
 import logging
+from typing import Optional
 
 from fitness_tracker.utils.sql_utils import initialize_database
 
@@ -78,6 +79,26 @@ def authenticate_user(username: str, password: str) -> bool:
     Returns:
         bool: True if authentication is successful, False otherwise.
 
+    Raises:
+        None
+    """
+    return get_authenticated_user_id(username, password) is not None
+
+
+def get_authenticated_user_id(username: str, password: str) -> Optional[int]:
+    """
+    Authenticate a user and return their ID.
+
+    Works like `authenticate_user`, but returns the user's ID so routes can
+    scope their data to the authenticated user.
+
+    Args:
+        username (str): The username of the user.
+        password (str): The plain text password provided by the user.
+
+    Returns:
+        int: The user's ID if authentication is successful, None otherwise.
+
     Raises:
         None
     """
@@ -85,21 +106,21 @@ def authenticate_user(username: str, password: str) -> bool:
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT salt, hashed_password FROM users WHERE username = ?
+            SELECT id, salt, hashed_password FROM users WHERE username = ?
         """, (username,))
         result = cursor.fetchone()
 
         if not result:
             logging.warning(f"Authentication failed: User '{username}' not found.")
-            return False  
+            return None
 
-        salt, hashed_password = result
+        user_id, salt, hashed_password = result
         if hash_password(password, salt) == hashed_password:
             logging.info(f"Authentication successful for user: {username}")
-            return True
+            return user_id
         else:
             logging.warning(f"Authentication failed for user: {username}")
-            return False
+            return None
 
 
 def change_password(username: str, new_password: str) -> None:
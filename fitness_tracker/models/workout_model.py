@@ -1,25 +1,381 @@
-import requests
+import base64
+import binascii
+import json
+import os
+import time
 import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
 
-# In-memory storage for workouts
-stored_workouts = {}
-deleted_workouts = []
+from fitness_tracker.models.catalog_model import get_catalog_exercise, get_catalog_ids
+from fitness_tracker.models.reference_model import REFERENCE_RESOURCES, get_reference_tables
+from fitness_tracker.models.workout_store import (
+    MAX_SQLITE_INTEGER,
+    create_workout_store,
+    is_valid_workout_id,
+    search_terms,
+)
+from fitness_tracker.models.response_cache_model import (
+    get_cached_response,
+    save_cached_response,
+    touch_cached_response,
+    delete_cached_response,
+)
+from fitness_tracker.utils.bloom import BloomFilter
+from fitness_tracker.utils.cache import create_cache
+from fitness_tracker.utils.catalog_snapshot import CatalogSnapshot
+from fitness_tracker.utils.single_flight import SingleFlight
+from fitness_tracker.utils.wger_client import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    WGER_POOL_SIZE,
+    clean_exercise,
+    get_client_stats,
+    wger_get,
+)
+
+
+# Stored and deleted workouts: "sqlite" is shared by every worker process and survives
+# restarts, "memory" keeps them per process
+WORKOUT_STORE = os.getenv("WORKOUT_STORE", "sqlite")
+
+# Deletion log retention per user, by count and by age in seconds (0 disables a limit). Expired
+# entries are hidden from reads at once and compacted in the background after deletes, at most
+# once every DELETED_WORKOUTS_COMPACT_INTERVAL seconds per process
+DELETED_WORKOUTS_MAX_COUNT = int(os.getenv("DELETED_WORKOUTS_MAX_COUNT", "1000"))
+DELETED_WORKOUTS_MAX_AGE = float(os.getenv("DELETED_WORKOUTS_MAX_AGE", str(30 * 86400)))
+DELETED_WORKOUTS_COMPACT_INTERVAL = float(os.getenv("DELETED_WORKOUTS_COMPACT_INTERVAL", "300"))
+
+# Independently locked shards of the memory store, so threads serving different users rarely contend
+WORKOUT_STORE_SHARDS = int(os.getenv("WORKOUT_STORE_SHARDS", "16"))
+
+# Workouts read from the store per query while streaming a listing, so an export of any size
+# holds at most this many in memory
+WORKOUT_STREAM_BATCH_SIZE = int(os.getenv("WORKOUT_STREAM_BATCH_SIZE", "500"))
+workout_store = create_workout_store(
+    WORKOUT_STORE, DELETED_WORKOUTS_MAX_COUNT, DELETED_WORKOUTS_MAX_AGE, shards=WORKOUT_STORE_SHARDS,
+)
+_compaction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deleted-compaction")
+_compaction_lock = threading.Lock()
+_compaction_pending = False
+_next_compaction = 0.0
+
+# Wger API URL; point it at benchmarks/wger_stub.py for repeatable perf runs
+WGER_API_BASE_URL = os.getenv("WGER_API_BASE_URL", "https://wger.de/api/v2/exercise/")
+WGER_LANGUAGE = 2
+
+# Cache of cleaned exercises keyed by (workout_id, language)
+EXERCISE_CACHE_MAX_ENTRIES = int(os.getenv("EXERCISE_CACHE_MAX_ENTRIES", "1024"))
+EXERCISE_CACHE_TTL = float(os.getenv("EXERCISE_CACHE_TTL", "3600"))
+
+# Stale-while-revalidate: serve expired entries for up to MAX_STALE seconds while refreshing them
+EXERCISE_CACHE_SWR_ENABLED = os.getenv("EXERCISE_CACHE_SWR", "0") == "1"
+EXERCISE_CACHE_MAX_STALE = float(os.getenv("EXERCISE_CACHE_MAX_STALE", "86400"))
+
+# "memory" keeps the caches per process; "shared" maps them from files every worker process shares
+EXERCISE_CACHE_BACKEND = os.getenv("EXERCISE_CACHE_BACKEND", "memory")
+EXERCISE_CACHE_SHARED_DIR = os.getenv(
+    "EXERCISE_CACHE_SHARED_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+)
+exercise_cache = create_cache(
+    EXERCISE_CACHE_BACKEND,
+    path=os.path.join(EXERCISE_CACHE_SHARED_DIR, "fitness_tracker_exercises.cache"),
+    max_entries=EXERCISE_CACHE_MAX_ENTRIES,
+    ttl=EXERCISE_CACHE_TTL,
+    max_stale=EXERCISE_CACHE_MAX_STALE if EXERCISE_CACHE_SWR_ENABLED else 0,
+)
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="exercise-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Exercises wger reported as missing (404), so repeated probes skip the round trip
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "4096"))
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "600"))
+missing_exercise_cache = create_cache(
+    EXERCISE_CACHE_BACKEND,
+    path=os.path.join(EXERCISE_CACHE_SHARED_DIR, "fitness_tracker_missing_exercises.cache"),
+    max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+    ttl=NEGATIVE_CACHE_TTL,
+    slot_size=128,
+)
+
+# Optional Bloom filters of valid IDs per language, built from the catalog mirror
+WGER_BLOOM_FILTER_ENABLED = os.getenv("WGER_BLOOM_FILTER", "0") == "1"
+_bloom_filters = {}
+_bloom_lock = threading.Lock()
+
+# Coalesces concurrent lookups of the same exercise into one upstream fetch
+exercise_flight = SingleFlight()
+
+# Persistent response cache; entries older than the TTL are revalidated with wger
+WGER_DISK_CACHE_ENABLED = os.getenv("WGER_DISK_CACHE", "1") == "1"
+WGER_DISK_CACHE_TTL = float(os.getenv("WGER_DISK_CACHE_TTL", "86400"))
+
+# Maximum concurrent wger lookups for a batch add; more than the pool size just queues
+WORKOUT_BATCH_CONCURRENCY = int(os.getenv("WORKOUT_BATCH_CONCURRENCY", str(WGER_POOL_SIZE)))
+
+# When set, lookups are served from the catalog mirror and caches only
+WGER_OFFLINE = os.getenv("WGER_OFFLINE", "0") == "1"
+
+# Memory-mapped catalog snapshot built with `flask build-catalog-snapshot`; empty disables it
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+_catalog_snapshot = None
+_catalog_snapshot_checked = False
+_catalog_snapshot_lock = threading.Lock()
+
+
+def _copy_workout(workout):
+    """Returns a copy of a cleaned workout so callers cannot mutate cached data."""
+    return {**workout, "muscles": list(workout["muscles"]), "equipment": list(workout["equipment"])}
+
+
+def fetch_workout_from_api(workout_id, language=WGER_LANGUAGE, cached=None, priority=PRIORITY_INTERACTIVE):
+    """
+    Fetch and clean a single exercise from the Wger API.
 
-# Wger API URL
-WGER_API_BASE_URL = "https://wger.de/api/v2/exercise/"
+    When a disk cache entry is given, the request is made conditional on its
+    ETag / Last-Modified validators, and a 304 Not Modified reply returns the
+    cached workout without downloading it again. Successful responses are
+    written back to the disk cache together with their validators, and a 404
+    is remembered in `missing_exercise_cache`.
 
+    Args:
+        workout_id (int): The ID of the workout to fetch.
+        language (int): The wger language ID to request.
+        cached (dict, optional): An entry returned by `get_cached_response`.
+        priority (int): The wger client's rate limiter lane for the request.
 
-def check_workout_in_api(workout_id):
+    Returns:
+        dict: The cleaned workout if it exists, otherwise None.
+
+    Raises:
+        requests.exceptions.RequestException: If there is an error with the API request.
+    """
+    logging.info(f"Fetching workout {workout_id} from wger API.")
+    url = f"{WGER_API_BASE_URL}{workout_id}/?language={language}"
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+    response = wger_get(url, headers=headers or None, priority=priority)
+    if response.status_code == 304 and cached:
+        logging.info(f"Workout {workout_id} not modified since last fetch.")
+        touch_cached_response(workout_id, language)
+        return cached["workout"]
+    if response.status_code == 200:
+        logging.info(f"Successfully fetched workout {workout_id}.")
+        # Extract relevant fields and clean up the JSON response
+        cleaned_workout = clean_exercise(response.json())
+        if WGER_DISK_CACHE_ENABLED:
+            save_cached_response(
+                workout_id,
+                language,
+                cleaned_workout,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return cleaned_workout
+    else:
+        logging.error(f"Failed to fetch workout {workout_id}. Status code: {response.status_code}")
+        if response.status_code == 404:
+            missing_exercise_cache.set((workout_id, language), True)
+            if cached:
+                delete_cached_response(workout_id, language)
+        return None
+
+
+def get_exercise_bloom_filter(language=WGER_LANGUAGE):
+    """
+    Return the Bloom filter of valid exercise IDs for a language.
+
+    The filter is built from the catalog mirror on first use. If the mirror is
+    empty, no filter is built and None is returned, so no ID is rejected.
+
+    Args:
+        language (int): The wger language ID.
+
+    Returns:
+        BloomFilter: The filter of mirrored IDs, or None if the catalog is empty.
+
+    Raises:
+        sqlite3.Error: If the catalog cannot be read.
+    """
+    if language not in _bloom_filters:
+        with _bloom_lock:
+            if language not in _bloom_filters:
+                ids = get_catalog_ids(language)
+                _bloom_filters[language] = BloomFilter.from_items(ids) if ids else None
+                logging.info(f"Built exercise Bloom filter with {len(ids)} IDs for language {language}.")
+    return _bloom_filters[language]
+
+
+def reset_exercise_bloom_filters():
+    """
+    Drop the built Bloom filters so they are rebuilt from the catalog on next use.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    with _bloom_lock:
+        _bloom_filters.clear()
+
+
+def get_catalog_snapshot():
+    """
+    Return the memory-mapped catalog snapshot, opening it on first use.
+
+    A missing or unreadable snapshot is logged once and then ignored, so
+    lookups fall back to the SQLite catalog mirror.
+
+    Args:
+        None
+
+    Returns:
+        CatalogSnapshot: The open snapshot, or None if none is configured or usable.
+
+    Raises:
+        None
+    """
+    global _catalog_snapshot, _catalog_snapshot_checked
+    if not _catalog_snapshot_checked:
+        with _catalog_snapshot_lock:
+            if not _catalog_snapshot_checked:
+                if CATALOG_SNAPSHOT_PATH:
+                    try:
+                        _catalog_snapshot = CatalogSnapshot(CATALOG_SNAPSHOT_PATH)
+                        logging.info(f"Opened catalog snapshot with {len(_catalog_snapshot)} exercises.")
+                    except (OSError, ValueError) as e:
+                        logging.warning(f"Catalog snapshot {CATALOG_SNAPSHOT_PATH} not used: {e}")
+                _catalog_snapshot_checked = True
+    return _catalog_snapshot
+
+
+def reset_catalog_snapshot():
+    """
+    Close the catalog snapshot so a rebuilt file is opened on next use.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _catalog_snapshot, _catalog_snapshot_checked
+    with _catalog_snapshot_lock:
+        # Lookups may still hold the old mapping; it is unmapped once they drop it
+        _catalog_snapshot = None
+        _catalog_snapshot_checked = False
+
+
+def _is_known_missing(workout_id, language):
+    """Returns True if the exercise is known not to exist, without any network call."""
+    if missing_exercise_cache.get((workout_id, language)):
+        return True
+    if WGER_BLOOM_FILTER_ENABLED:
+        bloom = get_exercise_bloom_filter(language)
+        if bloom is not None and workout_id not in bloom:
+            return True
+    return False
+
+
+def _load_workout(workout_id, language, priority=PRIORITY_INTERACTIVE):
+    """
+    Resolves a workout that missed the in-memory cache.
+
+    The memory-mapped catalog snapshot and then the local catalog mirror are checked first. Fresh disk cache entries are
+    returned directly; stale ones are revalidated with a conditional request.
+    In offline mode nothing is requested from wger and stale entries are used as-is.
+    """
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None and snapshot.language == language:
+        workout = snapshot.get(workout_id)
+        if workout is not None:
+            logging.info(f"Workout {workout_id} served from catalog snapshot.")
+            return workout
+    workout = get_catalog_exercise(workout_id, language)
+    if workout is not None:
+        logging.info(f"Workout {workout_id} served from catalog mirror.")
+        return workout
+    cached = get_cached_response(workout_id, language) if WGER_DISK_CACHE_ENABLED else None
+    if cached and (WGER_OFFLINE or time.time() - cached["fetched_at"] < WGER_DISK_CACHE_TTL):
+        logging.info(f"Workout {workout_id} served from disk cache.")
+        return cached["workout"]
+    if WGER_OFFLINE:
+        logging.warning(f"Workout {workout_id} is not available offline.")
+        return None
+    return fetch_workout_from_api(workout_id, language, cached, priority)
+
+
+def _load_and_cache(workout_id, language, priority=PRIORITY_INTERACTIVE):
+    """
+    Loads a workout and stores it in `exercise_cache`.
+
+    Runs inside `exercise_flight`, so the cache is filled before the flight ends
+    and late arrivals hit the cache instead of refetching.
+    """
+    workout = _load_workout(workout_id, language, priority)
+    if workout is not None:
+        exercise_cache.set((workout_id, language), workout)
+    return workout
+
+
+def _refresh_workout(workout_id, language):
+    """Reloads a stale cache entry in the background, dropping it if the workout is gone."""
+    key = (workout_id, language)
+    try:
+        if exercise_flight.do(key, lambda: _load_and_cache(workout_id, language, PRIORITY_BACKGROUND)) is None:
+            exercise_cache.delete(key)
+    except Exception as e:
+        logging.warning(f"Background refresh of workout {workout_id} failed: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(workout_id, language):
+    """Queues a background refresh of a stale entry unless one is already pending."""
+    key = (workout_id, language)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    logging.info(f"Refreshing stale workout {workout_id} in the background.")
+    _refresh_executor.submit(_refresh_workout, workout_id, language)
+
+
+def check_workout_in_api(workout_id, language=WGER_LANGUAGE):
     """
     Check if an exercise exists in the Wger API by its ID.
 
-    Sends a request to the Wger API to fetch workout details. If the workout exists,
-    it returns a cleaned dictionary containing relevant details. If the workout
-    does not exist, returns None.
+    Looks the exercise up in `exercise_cache` first; cache hits never touch the
+    network. With EXERCISE_CACHE_SWR enabled, entries that expired less than
+    EXERCISE_CACHE_MAX_STALE seconds ago are returned immediately and refreshed
+    on a background thread. IDs that wger recently reported as missing, or that are absent from
+    the catalog's Bloom filter (WGER_BLOOM_FILTER), are rejected without a
+    request. Concurrent misses for the same exercise share a single lookup
+    through `exercise_flight`. On a miss, the catalog snapshot (CATALOG_SNAPSHOT_PATH), the
+    local catalog mirror and then the on-disk response
+    cache are consulted, and only missing or stale entries are requested from
+    the Wger API (stale ones with a conditional request). With WGER_OFFLINE set,
+    the Wger API is never called. If the workout does not exist, returns None.
 
     Args:
         workout_id (int): The ID of the workout to check.
+        language (int): The wger language ID to request. Defaults to English.
 
     Returns:
         dict: A dictionary with the following keys if the workout exists:
@@ -33,34 +389,56 @@ def check_workout_in_api(workout_id):
     Raises:
         requests.exceptions.RequestException: If there is an error with the API request.
     """
-    logging.info(f"Fetching workout {workout_id} from wger API.")
-    url = f"{WGER_API_BASE_URL}{workout_id}/?language=2"
-    response = requests.get(url)
-    if response.status_code == 200:
-        logging.info(f"Successfully fetched workout {workout_id}.")
-        # Extract relevant fields and clean up the JSON response
-        workout = response.json()
-        cleaned_workout = {
-            "id": workout["id"],
-            "name": workout["name"],
-            "description": workout.get("description", "").replace("<p>", "").replace("</p>", "").strip(),
-            "muscles": workout["muscles"],
-            "equipment": workout["equipment"],
-        }
-        return cleaned_workout
-    else:
-        logging.error(f"Failed to fetch workout {workout_id}. Status code: {response.status_code}")
+    key = (workout_id, language)
+    workout, fresh = exercise_cache.lookup(key)
+    if workout is not None:
+        logging.info(f"Workout {workout_id} served from cache.")
+        if not fresh:
+            _schedule_refresh(workout_id, language)
+        return _copy_workout(workout)
+    if _is_known_missing(workout_id, language):
+        logging.info(f"Workout {workout_id} is known not to exist.")
         return None
+    workout = exercise_flight.do(key, lambda: _load_and_cache(workout_id, language))
+    if workout is None:
+        return None
+    return _copy_workout(workout)
+
+
+def get_lookup_stats():
+    """
+    Retrieve counters for the exercise lookup path.
+
+    Args:
+        None
 
+    Returns:
+        dict: A dictionary containing:
+            - exercise_cache (dict): Size, hit, miss and eviction counts of `exercise_cache`.
+            - missing_exercise_cache (dict): The same counters for the negative cache.
+            - single_flight (dict): Executed and coalesced lookups of `exercise_flight`.
+            - wger_client (dict): Circuit breaker state, hedging counters and rate limiter wait times.
 
-def add_workout_to_memory(workout_id):
+    Raises:
+        None
     """
-    Add a workout to memory after verifying it exists.
+    return {
+        "exercise_cache": exercise_cache.stats(),
+        "missing_exercise_cache": missing_exercise_cache.stats(),
+        "single_flight": exercise_flight.stats(),
+        "wger_client": get_client_stats(),
+    }
+
+
+def add_workout_to_memory(user_id, workout_id):
+    """
+    Add a workout to a user's memory after verifying it exists.
 
     Checks if a workout exists in the Wger API by its ID. If the workout is valid
-    and not already stored, it is added to the `stored_workouts` dictionary.
+    and the user has not stored it yet, it is added to `workout_store`.
 
     Args:
+        user_id (int): The ID of the user storing the workout.
         workout_id (int): The ID of the workout to add.
 
     Returns:
@@ -72,13 +450,19 @@ def add_workout_to_memory(workout_id):
     Raises:
         ValueError: If workout is already in memory.
     """
-    logging.info(f"Attempting to add workout {workout_id} to memory.")
-    if workout_id in stored_workouts:
+    logging.info(f"Attempting to add workout {workout_id} to memory for user {user_id}.")
+    if not is_valid_workout_id(workout_id):
+        logging.error(f"Workout {workout_id} is out of range.")
+        return {"status": "error", "message": "Workout not found in API."}
+    if workout_store.has(user_id, workout_id):
         logging.warning(f"Workout {workout_id} already exists in memory.")
         raise ValueError("Workout already exists in memory.")
     workout = check_workout_in_api(workout_id)
     if workout:
-        stored_workouts[workout_id] = workout
+        if not workout_store.add(user_id, workout):
+            # Another request stored it while the lookup ran
+            logging.warning(f"Workout {workout_id} already exists in memory.")
+            raise ValueError("Workout already exists in memory.")
         logging.info(f"Workout {workout_id} added to memory successfully.")
         return {"status": "success", "message": "Workout added to memory.", "workout": workout}
     else:
@@ -86,32 +470,265 @@ def add_workout_to_memory(workout_id):
         return {"status": "error", "message": "Workout not found in API."}
 
 
-def get_workouts():
+def add_workouts_to_memory(user_id, workout_ids):
     """
-    Retrieve all stored workouts.
+    Add several workouts to a user's memory at once.
 
-    Fetches all workouts currently stored in the `stored_workouts` dictionary.
+    Workouts that are not stored yet are looked up concurrently on a bounded
+    thread pool (WORKOUT_BATCH_CONCURRENCY workers), so the wall time of a batch
+    is close to a single wger round trip. All workouts that were found are then
+    inserted into `workout_store` in one step.
 
     Args:
-        None
+        user_id (int): The ID of the user storing the workouts.
+        workout_ids (list): The IDs of the workouts to add. Duplicates are ignored.
 
     Returns:
         dict: A dictionary containing:
-            - stored_workouts (list): A list of all stored workout details.
+            - added (int): Number of workouts that were added.
+            - results (list): One entry per unique ID, in request order, with
+              workout_id, status ("success" or "error"), message and, on success,
+              the workout details.
+
+    Raises:
+        None
+    """
+    unique_ids = list(dict.fromkeys(workout_ids))
+    logging.info(f"Attempting to add {len(unique_ids)} workouts to memory for user {user_id}.")
+    results = {}
+    to_fetch = []
+    for workout_id in unique_ids:
+        if not is_valid_workout_id(workout_id):
+            results[workout_id] = {"workout_id": workout_id, "status": "error", "message": "Workout not found in API."}
+        elif workout_store.has(user_id, workout_id):
+            results[workout_id] = {"workout_id": workout_id, "status": "error", "message": "Workout already exists in memory."}
+        else:
+            to_fetch.append(workout_id)
+
+    def lookup(workout_id):
+        try:
+            return check_workout_in_api(workout_id)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to look up workout {workout_id}: {e}")
+            return e
+
+    found = {}
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(WORKOUT_BATCH_CONCURRENCY, len(to_fetch))) as executor:
+            for workout_id, workout in zip(to_fetch, executor.map(lookup, to_fetch)):
+                if isinstance(workout, Exception):
+                    results[workout_id] = {"workout_id": workout_id, "status": "error", "message": "Workout lookup failed."}
+                elif workout is None:
+                    results[workout_id] = {"workout_id": workout_id, "status": "error", "message": "Workout not found in API."}
+                else:
+                    found[workout_id] = workout
+
+    # Another request may have stored one of these while the lookups ran
+    added = workout_store.add_many(user_id, list(found.values()))
+    for workout_id in found:
+        if workout_id in added:
+            results[workout_id] = {"workout_id": workout_id, "status": "success", "message": "Workout added to memory.", "workout": found[workout_id]}
+        else:
+            results[workout_id] = {"workout_id": workout_id, "status": "error", "message": "Workout already exists in memory."}
+
+    logging.info(f"Added {len(added)} of {len(unique_ids)} workouts to memory.")
+    return {"added": len(added), "results": [results[workout_id] for workout_id in unique_ids]}
+
+
+def encode_workout_cursor(workout_id):
+    """
+    Encode the position after a workout as an opaque page cursor.
+
+    Args:
+        workout_id (int): The ID of the last workout on the page, or the
+            deletion log sequence number of the last deleted workout.
+
+    Returns:
+        str: A URL-safe cursor for `get_workouts` or `get_deleted_workouts`.
 
     Raises:
         None
     """
-    return {"stored_workouts": list(stored_workouts.values())}
+    payload = json.dumps({"after": workout_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_workout_cursor(cursor):
+    """
+    Decode a page cursor made by `encode_workout_cursor`.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        int: The ID or sequence number the next page starts after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        workout_id = payload["after"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(workout_id, int) or isinstance(workout_id, bool) or not 0 <= workout_id <= MAX_SQLITE_INTEGER:
+        raise ValueError("Invalid cursor.")
+    return workout_id
+
+
+def get_workouts(user_id, expand=(), limit=None, after=None, muscles=(), equipment=()):
+    """
+    Retrieve a page of a user's stored workouts.
+
+    Fetches the workouts the user has stored in `workout_store`, ordered by ID.
+    Pages are keyset-paginated: `after` is the `next_cursor` of the previous
+    page, and the store seeks straight to it, so a page costs the same however
+    many workouts the user has stored. `muscles` and `equipment` keep only
+    workouts that have every listed ID; the store looks them up in its
+    inverted index, so a filtered page costs in proportion to the matches
+    rather than to everything the user has stored. Fields named in `expand` have their ID lists replaced by {"id", "name"}
+    entries from the muscle and equipment lookup tables, which are loaded once
+    and then served from memory. IDs missing from the tables get a None name.
+
+    Args:
+        user_id (int): The ID of the user.
+        expand (iterable): Fields to expand; any of "muscles" and "equipment".
+        limit (int, optional): Maximum number of workouts on the page. None returns all.
+        after (str, optional): Cursor of the page to return; None starts at the first workout.
+        muscles (iterable): Muscle IDs every returned workout must train; None
+            matches workouts without muscles.
+        equipment (iterable): Equipment IDs every returned workout must use;
+            None matches workouts that need no equipment.
+
+    Returns:
+        dict: A dictionary containing:
+            - stored_workouts (list): The workouts on the page.
+            - next_cursor (str): Cursor of the next page, or None if this is the last one.
+
+    Raises:
+        ValueError: If a field in `expand` cannot be expanded or the cursor is invalid.
+    """
+    expand = _expand_fields(expand)
+    after_id = None if after is None else decode_workout_cursor(after)
+    workouts = workout_store.list(
+        user_id,
+        limit=None if limit is None else limit + 1,
+        after=after_id,
+        muscles=muscles,
+        equipment=equipment,
+    )
+    next_cursor = None
+    if limit is not None and len(workouts) > limit:
+        workouts = workouts[:limit]
+        next_cursor = encode_workout_cursor(workouts[-1]["id"])
+    return {"stored_workouts": _expand_workouts(workouts, expand), "next_cursor": next_cursor}
+
+
+def iter_workouts(user_id, expand=(), after=None, muscles=(), equipment=()):
+    """
+    Stream all of a user's stored workouts, ordered by ID.
+
+    Takes the same arguments as `get_workouts`, without a page size: the
+    returned iterator reads the store WORKOUT_STREAM_BATCH_SIZE workouts at a
+    time, following the keyset cursor, so serializing a collection of any
+    size one workout at a time runs in constant memory. The arguments are
+    checked before the iterator is returned.
+
+    Args:
+        user_id (int): The ID of the user.
+        expand (iterable): Fields to expand; any of "muscles" and "equipment".
+        after (str, optional): A `next_cursor` to start after; None starts at the first workout.
+        muscles (iterable): Muscle IDs every workout must train; None matches workouts without muscles.
+        equipment (iterable): Equipment IDs every workout must use; None
+            matches workouts that need no equipment.
+
+    Returns:
+        iterator: The stored workouts.
+
+    Raises:
+        ValueError: If a field in `expand` cannot be expanded or the cursor is invalid.
+    """
+    expand = _expand_fields(expand)
+    after_id = None if after is None else decode_workout_cursor(after)
+    logging.info(f"Streaming workouts for user {user_id}.")
+
+    def stream(after_id):
+        while True:
+            workouts = workout_store.list(
+                user_id, limit=WORKOUT_STREAM_BATCH_SIZE, after=after_id, muscles=muscles, equipment=equipment,
+            )
+            yield from _expand_workouts(workouts, expand)
+            if len(workouts) < WORKOUT_STREAM_BATCH_SIZE:
+                return
+            after_id = workouts[-1]["id"]
+
+    return stream(after_id)
+
+
+def _expand_fields(expand):
+    """Returns the fields to expand as a set.
+
+    Raises:
+        ValueError: If a field cannot be expanded.
+    """
+    expand = set(expand)
+    unknown = expand - set(REFERENCE_RESOURCES)
+    if unknown:
+        raise ValueError(f"Cannot expand: {', '.join(sorted(unknown))}.")
+    return expand
+
+
+def _expand_workouts(workouts, expand):
+    """Returns the workouts with the ID lists of the `expand` fields replaced by {"id", "name"} entries."""
+    if not expand:
+        return workouts
+    tables = get_reference_tables(WGER_API_BASE_URL, fetch=not WGER_OFFLINE)
+    expanded = []
+    for workout in workouts:
+        workout = dict(workout)
+        for field in expand:
+            table = tables[field]
+            workout[field] = [table.get(entry_id) or {"id": entry_id, "name": None} for entry_id in workout[field]]
+        expanded.append(workout)
+    return expanded
+
+
+def search_workouts(user_id, query, limit=None):
+    """
+    Search a user's stored workouts by name and description.
+
+    Splits the query into words and returns the workouts containing all of
+    them, best match first. The SQLite store answers from its FTS5 index, so
+    a search costs the same however many workouts other users have stored.
+
+    Args:
+        user_id (int): The ID of the user.
+        query (str): The words to search for; punctuation, case and accents are ignored.
+        limit (int, optional): Maximum number of results. None returns all.
+
+    Returns:
+        dict: A dictionary containing:
+            - results (list): The matching workouts, each with a `snippet` of
+              its text around the matches, with matching words in brackets.
+
+    Raises:
+        ValueError: If the query contains no words.
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise ValueError("Search query must contain at least one word.")
+    logging.info(f"Searching workouts of user {user_id} for {terms}.")
+    return {"results": workout_store.search(user_id, terms, limit=limit)}
 
 
-def update_workout(workout_id, new_name, new_description):
+def update_workout(user_id, workout_id, new_name, new_description):
     """
     Update workout details.
 
-    Updates the name and description of a stored workout identified by its ID.
+    Updates the name and description of one of the user's stored workouts.
 
     Args:
+        user_id (int): The ID of the user.
         workout_id (int): The ID of the workout to update.
         new_name (str): The updated name for the workout.
         new_description (str): The updated description for the workout.
@@ -124,10 +741,8 @@ def update_workout(workout_id, new_name, new_description):
     Raises:
         None
     """
-    logging.info(f"Updating workout {workout_id}.")
-    if workout_id in stored_workouts:
-        stored_workouts[workout_id]["name"] = new_name
-        stored_workouts[workout_id]["description"] = new_description.strip()
+    logging.info(f"Updating workout {workout_id} for user {user_id}.")
+    if is_valid_workout_id(workout_id) and workout_store.update(user_id, workout_id, new_name, new_description.strip()):
         logging.info(f"Workout {workout_id} updated successfully.")
         return {"status": "success", "message": "Workout updated."}
     else:
@@ -135,14 +750,15 @@ def update_workout(workout_id, new_name, new_description):
         return {"status": "error", "message": "Workout not found."}
 
 
-def delete_workout(workout_id):
+def delete_workout(user_id, workout_id):
     """
-    Delete a workout and log it in deleted_workouts.
+    Delete a workout and log it as deleted.
 
-    Removes the specified workout from `stored_workouts` and appends it to
-    the `deleted_workouts` list.
+    Removes the specified workout from the user's workouts in `workout_store`
+    and appends it to their deletion log.
 
     Args:
+        user_id (int): The ID of the user.
         workout_id (int): The ID of the workout to delete.
 
     Returns:
@@ -153,32 +769,168 @@ def delete_workout(workout_id):
     Raises:
         None
     """
-    logging.info(f"Attempting to delete workout {workout_id}.")
-    if workout_id in stored_workouts:
-        deleted_workouts.append(stored_workouts[workout_id])
-        del stored_workouts[workout_id]
+    logging.info(f"Attempting to delete workout {workout_id} for user {user_id}.")
+    if is_valid_workout_id(workout_id) and workout_store.delete(user_id, workout_id):
         logging.info(f"Workout {workout_id} deleted and logged.")
+        _schedule_compaction()
         return {"status": "success", "message": "Workout deleted and logged."}
     else:
         logging.error(f"Workout {workout_id} not found in memory.")
         return {"status": "error", "message": "Workout not found."}
 
 
-def get_deleted_workouts():
+def restore_workout(user_id, workout_id):
     """
-    Retrieve all deleted workouts.
+    Restore a deleted workout.
 
-    Fetches all workouts that have been removed from `stored_workouts` and logged in `deleted_workouts`.
+    Moves the workout's tombstone from the user's deletion log back into
+    `workout_store` without contacting the Wger API. The tombstone is found
+    through the store's workout ID index, so the cost does not depend on the
+    size of the deletion log.
 
     Args:
-        None
+        user_id (int): The ID of the user.
+        workout_id (int): The ID of the workout to restore.
+
+    Returns:
+        dict: A dictionary with the operation's status and details:
+            - status (str): Either "success" or "error".
+            - message (str): Description of the operation outcome.
+            - workout (dict, optional): The restored workout if the operation succeeds.
+
+    Raises:
+        ValueError: If the workout is already stored.
+    """
+    logging.info(f"Attempting to restore workout {workout_id} for user {user_id}.")
+    if not is_valid_workout_id(workout_id):
+        logging.error(f"Workout {workout_id} is out of range.")
+        return {"status": "error", "message": "Workout not found in deleted workouts."}
+    if workout_store.has(user_id, workout_id):
+        logging.warning(f"Workout {workout_id} already exists in memory.")
+        raise ValueError("Workout already exists in memory.")
+    workout = workout_store.restore(user_id, workout_id)
+    if workout is None:
+        if workout_store.has(user_id, workout_id):
+            # Another request stored or restored it in the meantime
+            logging.warning(f"Workout {workout_id} already exists in memory.")
+            raise ValueError("Workout already exists in memory.")
+        logging.error(f"Workout {workout_id} not found in deleted workouts.")
+        return {"status": "error", "message": "Workout not found in deleted workouts."}
+    logging.info(f"Workout {workout_id} restored.")
+    return {"status": "success", "message": "Workout restored.", "workout": workout}
+
+
+def get_deleted_workouts(user_id, limit=None, after=None, since=None, until=None):
+    """
+    Retrieve a page of deleted workouts.
+
+    Fetches the workouts the user has removed from `workout_store`, oldest
+    deletion first. Only deletions within the retention limits
+    (DELETED_WORKOUTS_MAX_COUNT and DELETED_WORKOUTS_MAX_AGE) are kept. Pages
+    are keyset-paginated like `get_workouts`.
+
+    Args:
+        user_id (int): The ID of the user.
+        limit (int, optional): Maximum number of workouts on the page. None returns all.
+        after (str, optional): Cursor of the page to return; None starts at the oldest deletion.
+        since (float, optional): Only return workouts deleted at or after this Unix time.
+        until (float, optional): Only return workouts deleted before this Unix time.
 
     Returns:
         dict: A dictionary containing:
-            - deleted_workouts (list): A list of all deleted workout details.
+            - deleted_workouts (list): The deleted workouts on the page, each with its deleted_at time.
+            - next_cursor (str): Cursor of the next page, or None if this is the last one.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    logging.info(f"Fetching deleted workouts for user {user_id}.")
+    after_seq = None if after is None else decode_workout_cursor(after)
+    entries = workout_store.list_deleted(
+        user_id, limit=None if limit is None else limit + 1, after=after_seq, since=since, until=until,
+    )
+    next_cursor = None
+    if limit is not None and len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_workout_cursor(entries[-1][0])
+    return {"deleted_workouts": [workout for _, workout in entries], "next_cursor": next_cursor}
+
+
+def iter_deleted_workouts(user_id, after=None, since=None, until=None):
+    """
+    Stream all of a user's deleted workouts, oldest deletion first.
+
+    Takes the same arguments as `get_deleted_workouts`, without a page size,
+    and reads the deletion log in batches like `iter_workouts`. The cursor is
+    checked before the iterator is returned.
+
+    Args:
+        user_id (int): The ID of the user.
+        after (str, optional): A `next_cursor` to start after; None starts at the oldest deletion.
+        since (float, optional): Only return workouts deleted at or after this Unix time.
+        until (float, optional): Only return workouts deleted before this Unix time.
+
+    Returns:
+        iterator: The deleted workouts, each with its deleted_at time.
 
     Raises:
+        ValueError: If the cursor is invalid.
+    """
+    after_seq = None if after is None else decode_workout_cursor(after)
+    logging.info(f"Streaming deleted workouts for user {user_id}.")
+
+    def stream(after_seq):
+        while True:
+            entries = workout_store.list_deleted(
+                user_id, limit=WORKOUT_STREAM_BATCH_SIZE, after=after_seq, since=since, until=until,
+            )
+            for _, workout in entries:
+                yield workout
+            if len(entries) < WORKOUT_STREAM_BATCH_SIZE:
+                return
+            after_seq = entries[-1][0]
+
+    return stream(after_seq)
+
+
+def compact_deleted_workouts():
+    """
+    Remove deleted workouts past the retention limits from `workout_store`.
+
+    Args:
         None
+
+    Returns:
+        int: The number of deleted workouts removed.
+
+    Raises:
+        sqlite3.Error: If the SQLite store cannot be compacted.
     """
-    logging.info("Fetching all deleted workouts.")
-    return {"deleted_workouts": deleted_workouts}
+    removed = workout_store.compact()
+    if removed:
+        logging.info(f"Compacted {removed} deleted workouts.")
+    return removed
+
+
+def _compact_in_background():
+    """Runs a compaction on the compaction thread, logging instead of raising failures."""
+    global _compaction_pending
+    try:
+        compact_deleted_workouts()
+    except Exception as e:
+        logging.warning(f"Background compaction of deleted workouts failed: {e}")
+    finally:
+        with _compaction_lock:
+            _compaction_pending = False
+
+
+def _schedule_compaction():
+    """Queues a background compaction unless one is pending or ran within the interval."""
+    global _compaction_pending, _next_compaction
+    now = time.monotonic()
+    with _compaction_lock:
+        if _compaction_pending or now < _next_compaction:
+            return
+        _compaction_pending = True
+        _next_compaction = now + DELETED_WORKOUTS_COMPACT_INTERVAL
+    _compaction_executor.submit(_compact_in_background)
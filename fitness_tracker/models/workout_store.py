@@ -0,0 +1,1050 @@
+import json
+import re
+import time
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from itertools import count, islice
+
+from fitness_tracker.models.workout import Workout, unpack_ids
+from fitness_tracker.utils.sql_utils import get_db_connection, execute_sql_script
+
+
+def _row_to_workout(row):
+    """Builds a workout dict from (workout_id, name, description, muscles, equipment)."""
+    return {
+        "id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "muscles": json.loads(row[3]),
+        "equipment": json.loads(row[4]),
+    }
+
+
+def _row_to_deleted(row):
+    """Builds a (seq, workout) pair from (seq, workout_id, name, description, muscles, equipment, deleted_at)."""
+    return row[0], dict(_row_to_workout(row[1:6]), deleted_at=row[6])
+
+
+# Largest workout ID the stores accept: the SQLite store keeps it in the low 32 bits of a
+# full-text rowid. Muscle and equipment IDs and cursors only need to fit SQLite's integers.
+MAX_WORKOUT_ID = 2 ** 32 - 1
+MAX_SQLITE_INTEGER = 2 ** 63 - 1
+
+
+def is_valid_workout_id(workout_id):
+    """Returns True if a workout ID is within the range the stores accept."""
+    return 0 <= workout_id <= MAX_WORKOUT_ID
+
+
+# Tag ID standing for an empty muscle or equipment list, so "needs no equipment" is indexed too
+NO_TAG = -1
+
+
+def _tag_keys(muscles, equipment):
+    """Returns the (field, tag_id) index keys of a workout's muscle and equipment IDs."""
+    keys = set()
+    for field, ids in (("muscles", muscles), ("equipment", equipment)):
+        keys.update((field, tag_id) for tag_id in ids)
+        if not ids:
+            keys.add((field, NO_TAG))
+    return keys
+
+
+def _filter_keys(muscles, equipment):
+    """Returns the index keys a filtered workout must have; a None ID matches an empty list."""
+    return [
+        (field, NO_TAG if tag_id is None else tag_id)
+        for field, ids in (("muscles", muscles), ("equipment", equipment))
+        for tag_id in dict.fromkeys(ids)
+    ]
+
+
+def _contains(ids, workout_id):
+    """Returns whether the sorted list ids holds workout_id."""
+    i = bisect_left(ids, workout_id)
+    return i < len(ids) and ids[i] == workout_id
+
+
+# Words as SQLite's unicode61 tokenizer splits them: runs of letters and digits
+_WORD = re.compile(r"[^\W_]+")
+
+# Snippets are this many words long, with matching words in brackets
+SNIPPET_WORDS = 12
+
+
+def _fold(word):
+    """Lowercases a word and strips its diacritics, as the unicode61 tokenizer does."""
+    if word.isascii():
+        return word.lower()
+    return "".join(char for char in unicodedata.normalize("NFD", word) if not unicodedata.combining(char)).lower()
+
+
+def _folded_words(text):
+    """Returns the words of text, each folded by `_fold`."""
+    if text.isascii():
+        return _WORD.findall(text.lower())
+    return [_fold(word) for word in _WORD.findall(text)]
+
+
+def search_terms(query):
+    """Splits a search query into the lowercase, unaccented words a workout must contain."""
+    return list(dict.fromkeys(_folded_words(query)))
+
+
+def _snippet(text, terms):
+    """Returns SNIPPET_WORDS words of text around its first search term, or None if it has none."""
+    words = list(_WORD.finditer(text))
+    hits = [index for index, word in enumerate(words) if _fold(word.group()) in terms]
+    if not hits:
+        return None
+    start = max(0, min(hits[0] - 2, len(words) - SNIPPET_WORDS))
+    end = min(len(words), start + SNIPPET_WORDS)
+    parts = ["…" if start else ""]
+    position = words[start].start()
+    for word in words[start:end]:
+        parts.append(text[position:word.start()])
+        parts.append(f"[{word.group()}]" if _fold(word.group()) in terms else word.group())
+        position = word.end()
+    parts.append("…" if end < len(words) else text[position:])
+    return "".join(parts)
+
+
+def _rank(workouts, terms, limit):
+    """
+    Orders search matches best first and adds their snippets.
+
+    A match scores one point per occurrence of a term in its description and
+    ten per occurrence in its name; ties go to the lower workout ID.
+    """
+    def score(workout):
+        return (
+            10 * sum(word in terms for word in _folded_words(workout["name"]))
+            + sum(word in terms for word in _folded_words(workout["description"]))
+        )
+
+    ranked = sorted(workouts, key=lambda workout: (-score(workout), workout["id"]))[:limit]
+    return [
+        dict(workout, snippet=_snippet(workout["description"], terms) or _snippet(workout["name"], terms))
+        for workout in ranked
+    ]
+
+
+def _age_cutoff(max_age, now=None):
+    """Returns the deletion time before which tombstones have expired, or None without an age limit."""
+    if not max_age:
+        return None
+    return (time.time() if now is None else now) - max_age
+
+
+class _MemoryShard:
+    """The workouts and deletion logs of the users hashed to one shard, behind one lock."""
+
+    __slots__ = ("lock", "workouts", "ids", "tags", "deleted", "tombstones")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.workouts = {}
+        self.ids = {}
+        self.tags = {}
+        self.deleted = {}
+        self.tombstones = {}
+
+
+class InMemoryWorkoutStore:
+    """
+    Keeps stored and deleted workouts in process memory, grouped by user.
+
+    Users are spread over `shards` shards by ID, each with its own lock, so
+    threads serving different users rarely wait for each other while every
+    read-modify-write of one user's workouts is atomic. Workouts are held as
+    compact `Workout` records and serialized to dicts when read; note that
+    their muscle and equipment IDs come back sorted and deduplicated.
+
+    Each user's workout IDs are also kept in a sorted list, so a page of
+    `list` is a binary search plus a slice. An inverted index maps each of a
+    user's muscle and equipment IDs to the sorted IDs of their workouts that
+    have it, so a filtered `list` bisects each posting list to the cursor,
+    walks the one with the fewest IDs left, checks the others by binary search
+    and stops at the page size. Each user's deletion log is a deque in deletion order, and a
+    per-user index maps each workout ID to its latest log entry, so `restore`
+    finds a tombstone without scanning the log. Entries the index no longer
+    points to (restored, or superseded by a later deletion of the same
+    workout) are dead: reads skip them, they do not count towards
+    `deleted_max_count`, and they are dropped when they reach the head of the
+    log or by `compact`. A delete that leaves more than `deleted_max_count`
+    live tombstones drops the oldest; `compact` drops those older than
+    `deleted_max_age`.
+
+    Every worker process has its own copy and nothing survives a restart, so
+    this backend is meant for tests and single-process development.
+
+    Args:
+        deleted_max_count (int): Deleted workouts kept per user; 0 keeps all.
+        deleted_max_age (float): Seconds a deleted workout is kept; 0 keeps them forever.
+        shards (int): Number of independently locked shards.
+    """
+
+    def __init__(self, deleted_max_count=0, deleted_max_age=0, shards=16):
+        self.deleted_max_count = deleted_max_count
+        self.deleted_max_age = deleted_max_age
+        self._shards = [_MemoryShard() for _ in range(max(1, shards))]
+        self._seq = count(1)
+
+    def _shard(self, user_id):
+        return self._shards[hash(user_id) % len(self._shards)]
+
+    @classmethod
+    def _add(cls, shard, user_id, workout):
+        workouts = shard.workouts.setdefault(user_id, {})
+        if workout["id"] in workouts:
+            return False
+        cls._store(shard, user_id, Workout.from_dict(workout))
+        return True
+
+    @staticmethod
+    def _store(shard, user_id, workout):
+        """Stores a record and adds it to the sorted IDs and the tag index."""
+        shard.workouts.setdefault(user_id, {})[workout.id] = workout
+        insort(shard.ids.setdefault(user_id, []), workout.id)
+        index = shard.tags.setdefault(user_id, {})
+        for key in _tag_keys(unpack_ids(workout.muscles), unpack_ids(workout.equipment)):
+            insort(index.setdefault(key, []), workout.id)
+
+    @staticmethod
+    def _unstore(shard, user_id, workout):
+        """Removes a record from the sorted IDs and the tag index; it is already popped from workouts."""
+        ids = shard.ids[user_id]
+        del ids[bisect_right(ids, workout.id) - 1]
+        index = shard.tags[user_id]
+        for key in _tag_keys(unpack_ids(workout.muscles), unpack_ids(workout.equipment)):
+            tagged = index[key]
+            del tagged[bisect_left(tagged, workout.id)]
+            if not tagged:
+                del index[key]
+
+    def add(self, user_id, workout):
+        """
+        Stores a workout for a user unless they already stored one with the same ID.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout (dict): The cleaned workout to store.
+
+        Returns:
+            bool: True if the workout was added.
+
+        Raises:
+            None
+        """
+        shard = self._shard(user_id)
+        with shard.lock:
+            return self._add(shard, user_id, workout)
+
+    def add_many(self, user_id, workouts):
+        """
+        Stores several workouts for a user, skipping IDs they already stored.
+
+        Args:
+            user_id (int): The ID of the user.
+            workouts (list): The cleaned workouts to store.
+
+        Returns:
+            set: The IDs of the workouts that were added.
+
+        Raises:
+            None
+        """
+        shard = self._shard(user_id)
+        with shard.lock:
+            return {workout["id"] for workout in workouts if self._add(shard, user_id, workout)}
+
+    def get(self, user_id, workout_id):
+        """
+        Looks up one of a user's stored workouts.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            dict: The workout, or None if the user has not stored it.
+
+        Raises:
+            None
+        """
+        shard = self._shard(user_id)
+        with shard.lock:
+            workout = shard.workouts.get(user_id, {}).get(workout_id)
+        return None if workout is None else workout.to_dict()
+
+    def has(self, user_id, workout_id):
+        """
+        Checks whether a user has stored a workout.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            bool: True if the workout is stored for the user.
+
+        Raises:
+            None
+        """
+        shard = self._shard(user_id)
+        with shard.lock:
+            return workout_id in shard.workouts.get(user_id, {})
+
+    def list(self, user_id, limit=None, after=None, muscles=(), equipment=()):
+        """
+        Returns a user's stored workouts, ordered by ID.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int, optional): Maximum number of workouts to return. None returns all.
+            after (int, optional): Only return workouts with a higher ID.
+            muscles (iterable): Only return workouts that train all of these
+                muscle IDs; None matches workouts without muscles.
+            equipment (iterable): Only return workouts that use all of these
+                equipment IDs; None matches workouts that need no equipment.
+
+        Returns:
+            list: The stored workouts.
+
+        Raises:
+            None
+        """
+        keys = _filter_keys(muscles, equipment)
+        shard = self._shard(user_id)
+        with shard.lock:
+            workouts = shard.workouts.get(user_id, {})
+            if keys:
+                index = shard.tags.get(user_id, {})
+                tagged = [index.get(key, []) for key in keys]
+                starts = [0 if after is None else bisect_right(ids, after) for ids in tagged]
+                driver = min(range(len(keys)), key=lambda i: len(tagged[i]) - starts[i])
+                ids, others = tagged[driver], tagged[:driver] + tagged[driver + 1:]
+                matches = (
+                    workout_id for workout_id in map(ids.__getitem__, range(starts[driver], len(ids)))
+                    if all(_contains(other, workout_id) for other in others)
+                )
+                page = [workouts[workout_id] for workout_id in islice(matches, limit)]
+            else:
+                ids = shard.ids.get(user_id, [])
+                start = 0 if after is None else bisect_right(ids, after)
+                end = len(ids) if limit is None else start + limit
+                page = [workouts[workout_id] for workout_id in ids[start:end]]
+        return [workout.to_dict() for workout in page]
+
+    def search(self, user_id, terms, limit=None):
+        """
+        Finds a user's stored workouts whose name or description contains every search term.
+
+        Scans the user's workouts, so it costs in proportion to how many they
+        have stored. Matches are ranked by how often the terms occur, with a
+        match in the name counting ten times.
+
+        Args:
+            user_id (int): The ID of the user.
+            terms (list): Folded words from `search_terms`.
+            limit (int, optional): Maximum number of workouts to return. None returns all.
+
+        Returns:
+            list: The best matches first, each a workout with a snippet of the
+                description, or failing that the name, with matching words in brackets.
+
+        Raises:
+            None
+        """
+        terms = set(terms)
+        shard = self._shard(user_id)
+        with shard.lock:
+            workouts = list(shard.workouts.get(user_id, {}).values())
+        matches = [
+            workout.to_dict() for workout in workouts
+            if terms <= set(_folded_words(f"{workout.name} {workout.description}"))
+        ]
+        return _rank(matches, terms, limit)
+
+    def update(self, user_id, workout_id, name, description):
+        """
+        Changes the name and description of one of a user's stored workouts.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+            name (str): The new name.
+            description (str): The new description.
+
+        Returns:
+            bool: True if the workout was found and updated.
+
+        Raises:
+            None
+        """
+        shard = self._shard(user_id)
+        with shard.lock:
+            workouts = shard.workouts.get(user_id, {})
+            workout = workouts.get(workout_id)
+            if workout is None:
+                return False
+            workouts[workout_id] = workout.replace(name, description)
+            return True
+
+    def delete(self, user_id, workout_id):
+        """
+        Removes one of a user's stored workouts and appends it to their deletion log.
+
+        An earlier tombstone of the same workout is replaced, and the oldest
+        tombstones beyond `deleted_max_count` are dropped; restored and
+        replaced entries do not count towards the limit.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            bool: True if the workout was found and deleted.
+
+        Raises:
+            None
+        """
+        shard = self._shard(user_id)
+        with shard.lock:
+            workout = shard.workouts.get(user_id, {}).pop(workout_id, None)
+            if workout is None:
+                return False
+            self._unstore(shard, user_id, workout)
+            log = shard.deleted.setdefault(user_id, deque())
+            tombstones = shard.tombstones.setdefault(user_id, {})
+            entry = (next(self._seq), workout, time.time())
+            log.append(entry)
+            tombstones[workout_id] = entry
+            # Pop dead entries off the head of the log, and live ones while there are too many
+            while log:
+                oldest = log[0]
+                live = tombstones.get(oldest[1].id) is oldest
+                if live and not (self.deleted_max_count and len(tombstones) > self.deleted_max_count):
+                    break
+                log.popleft()
+                if live:
+                    del tombstones[oldest[1].id]
+            return True
+
+    def restore(self, user_id, workout_id):
+        """
+        Moves a workout from a user's deletion log back into their stored workouts.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            dict: The restored workout, or None if it has no tombstone, its
+                tombstone is past `deleted_max_age`, or it is already stored again.
+
+        Raises:
+            None
+        """
+        cutoff = _age_cutoff(self.deleted_max_age)
+        shard = self._shard(user_id)
+        with shard.lock:
+            tombstones = shard.tombstones.get(user_id, {})
+            entry = tombstones.get(workout_id)
+            if entry is None or workout_id in shard.workouts.get(user_id, {}):
+                return None
+            if cutoff is not None and entry[2] < cutoff:
+                return None
+            del tombstones[workout_id]
+            self._store(shard, user_id, entry[1])
+        return entry[1].to_dict()
+
+    def list_deleted(self, user_id, limit=None, after=None, since=None, until=None):
+        """
+        Returns a user's deleted workouts, oldest deletion first.
+
+        Workouts older than `deleted_max_age` are left out even before `compact` drops them.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int, optional): Maximum number of workouts to return. None returns all.
+            after (int, optional): Only return entries with a higher sequence number.
+            since (float, optional): Only return workouts deleted at or after this Unix time.
+            until (float, optional): Only return workouts deleted before this Unix time.
+
+        Returns:
+            list: (seq, workout) pairs, where seq orders the log and workout
+                carries its deleted_at time.
+
+        Raises:
+            None
+        """
+        cutoff = _age_cutoff(self.deleted_max_age)
+        if cutoff is not None:
+            since = cutoff if since is None else max(since, cutoff)
+        shard = self._shard(user_id)
+        with shard.lock:
+            log = shard.deleted.get(user_id, ())
+            tombstones = shard.tombstones.get(user_id, {})
+            # Entries are (seq, workout, deleted_at); the 1-tuple sorts before every entry with that
+            # seq without comparing workouts, and bisect's key= argument needs Python 3.10
+            start = 0 if after is None else bisect_left(log, (after + 1,))
+            entries = list(islice((
+                entry for entry in islice(log, start, None)
+                if tombstones.get(entry[1].id) is entry
+                and (since is None or entry[2] >= since)
+                and (until is None or entry[2] < until)
+            ), limit))
+        return [(seq, dict(workout.to_dict(), deleted_at=deleted_at)) for seq, workout, deleted_at in entries]
+
+    def compact(self):
+        """
+        Drops deleted workouts that are past the retention limits, and log
+        entries that were restored or superseded.
+
+        Shards are compacted one at a time, so only users of the shard being
+        compacted wait.
+
+        Returns:
+            int: The number of deleted workouts dropped.
+
+        Raises:
+            None
+        """
+        cutoff = _age_cutoff(self.deleted_max_age)
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                for user_id, log in list(shard.deleted.items()):
+                    tombstones = shard.tombstones[user_id]
+                    kept = deque()
+                    for entry in log:
+                        if tombstones.get(entry[1].id) is not entry:
+                            continue
+                        if cutoff is not None and entry[2] < cutoff:
+                            del tombstones[entry[1].id]
+                            removed += 1
+                        else:
+                            kept.append(entry)
+                    if kept:
+                        shard.deleted[user_id] = kept
+                    else:
+                        del shard.deleted[user_id]
+                        del shard.tombstones[user_id]
+        return removed
+
+    def clear(self):
+        """
+        Removes every stored and deleted workout of every user.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        for shard in self._shards:
+            with shard.lock:
+                shard.workouts.clear()
+                shard.ids.clear()
+                shard.tags.clear()
+                shard.deleted.clear()
+                shard.tombstones.clear()
+
+    def __len__(self):
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += sum(len(workouts) for workouts in shard.workouts.values())
+        return total
+
+
+def _fts_rowid(user_id, workout_id):
+    """Returns the workouts_fts rowid of a user's workout."""
+    return user_id << 32 | workout_id
+
+
+class SqliteWorkoutStore:
+    """
+    Keeps stored workouts and a tombstone table of deleted ones in SQLite, keyed by user.
+
+    Every worker process sees the same workouts, and they survive restarts.
+    Stored workouts are clustered on their (user_id, workout_id) primary key,
+    and the deletion log is indexed on (user_id, seq), so reading or changing
+    one user's workouts is an index seek whatever the number of users.
+    Each operation is a single statement or transaction, so concurrent workers
+    cannot store the same workout twice or delete it twice. The database is
+    switched to WAL mode so readers do not block the writer.
+
+    Each delete trims the user's log to its newest `deleted_max_count` entries
+    in the same transaction, a seek on (user_id, seq), so `compact` only has
+    to expire tombstones past `deleted_max_age`, which reads hide at once.
+    Tombstones are also indexed on (user_id, workout_id), so `restore` is an
+    index seek rather than a scan of the log.
+
+    The workout_tags table is an inverted index of stored workouts by muscle
+    and equipment ID, kept in step with the workouts table in the same
+    transactions, and triggers keep the length of each posting list in
+    workout_tag_counts. A filtered `list` looks up those lengths, range-scans
+    the shortest posting list from the cursor on, checks the other filters by
+    primary key, and stops at the page size.
+
+    Names and descriptions are also indexed in the workouts_fts FTS5 table,
+    under the rowid user_id << 32 | workout_id. `search` restricts the match
+    to the user's rowid range, so it only ranks that user's matches however
+    many other users' workouts are indexed. Matches are ranked in Python
+    rather than with FTS5's bm25(), whose document frequencies are counted
+    across every user's rows and would make a search of a common word cost in
+    proportion to the whole table.
+
+    Args:
+        deleted_max_count (int): Deleted workouts kept per user; 0 keeps all.
+        deleted_max_age (float): Seconds a deleted workout is kept; 0 keeps them forever.
+    """
+
+    def __init__(self, deleted_max_count=0, deleted_max_age=0):
+        self.deleted_max_count = deleted_max_count
+        self.deleted_max_age = deleted_max_age
+        execute_sql_script("sql/create_workout_tables.sql")
+        with get_db_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    @staticmethod
+    def _tag_rows(user_id, workout):
+        return [
+            (user_id, field, tag_id, workout["id"])
+            for field, tag_id in _tag_keys(workout["muscles"], workout["equipment"])
+        ]
+
+    def _insert(self, cursor, user_id, workout, created_at):
+        cursor.execute("""
+            INSERT OR IGNORE INTO workouts (user_id, workout_id, name, description, muscles, equipment, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            user_id,
+            workout["id"],
+            workout["name"],
+            workout["description"],
+            json.dumps(workout["muscles"]),
+            json.dumps(workout["equipment"]),
+            created_at,
+        ))
+        if cursor.rowcount != 1:
+            return False
+        cursor.executemany("""
+            INSERT OR IGNORE INTO workout_tags (user_id, field, tag_id, workout_id) VALUES (?, ?, ?, ?)
+        """, self._tag_rows(user_id, workout))
+        cursor.execute("""
+            INSERT INTO workouts_fts (rowid, name, description) VALUES (?, ?, ?)
+        """, (_fts_rowid(user_id, workout["id"]), workout["name"], workout["description"]))
+        return True
+
+    def add(self, user_id, workout):
+        """
+        Stores a workout for a user unless they already stored one with the same ID.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout (dict): The cleaned workout to store.
+
+        Returns:
+            bool: True if the workout was added.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        with get_db_connection() as conn:
+            return self._insert(conn.cursor(), user_id, workout, time.time())
+
+    def add_many(self, user_id, workouts):
+        """
+        Stores several workouts for a user in one transaction, skipping IDs they already stored.
+
+        Args:
+            user_id (int): The ID of the user.
+            workouts (list): The cleaned workouts to store.
+
+        Returns:
+            set: The IDs of the workouts that were added.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        created_at = time.time()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            return {workout["id"] for workout in workouts if self._insert(cursor, user_id, workout, created_at)}
+
+    def get(self, user_id, workout_id):
+        """
+        Looks up one of a user's stored workouts.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            dict: The workout, or None if the user has not stored it.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        with get_db_connection() as conn:
+            row = conn.execute("""
+                SELECT workout_id, name, description, muscles, equipment FROM workouts
+                WHERE user_id = ? AND workout_id = ?
+            """, (user_id, workout_id)).fetchone()
+        return _row_to_workout(row) if row else None
+
+    def has(self, user_id, workout_id):
+        """
+        Checks whether a user has stored a workout.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            bool: True if the workout is stored for the user.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        with get_db_connection() as conn:
+            return conn.execute("""
+                SELECT 1 FROM workouts WHERE user_id = ? AND workout_id = ?
+            """, (user_id, workout_id)).fetchone() is not None
+
+    def list(self, user_id, limit=None, after=None, muscles=(), equipment=()):
+        """
+        Returns a user's stored workouts, ordered by ID.
+
+        A page is a range scan of the (user_id, workout_id) key starting after
+        `after`, so its cost does not depend on how many workouts are stored.
+        Filtered pages scan the workout_tags postings of the filter with the
+        fewest workouts instead.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int, optional): Maximum number of workouts to return. None returns all.
+            after (int, optional): Only return workouts with a higher ID.
+            muscles (iterable): Only return workouts that train all of these
+                muscle IDs; None matches workouts without muscles.
+            equipment (iterable): Only return workouts that use all of these
+                equipment IDs; None matches workouts that need no equipment.
+
+        Returns:
+            list: The stored workouts.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        keys = _filter_keys(muscles, equipment)
+        after = -1 if after is None else after
+        limit = -1 if limit is None else limit
+        if not keys:
+            with get_db_connection() as conn:
+                rows = conn.execute("""
+                    SELECT workout_id, name, description, muscles, equipment FROM workouts
+                    WHERE user_id = ? AND workout_id > ? ORDER BY workout_id LIMIT ?
+                """, (user_id, after, limit)).fetchall()
+            return [_row_to_workout(row) for row in rows]
+        with get_db_connection() as conn:
+            sizes = {}
+            for key in keys:
+                row = conn.execute("""
+                    SELECT size FROM workout_tag_counts WHERE user_id = ? AND field = ? AND tag_id = ?
+                """, (user_id, *key)).fetchone()
+                if row is None:
+                    return []
+                sizes[key] = row[0]
+            driver = min(keys, key=sizes.__getitem__)
+            query = """
+                SELECT w.workout_id, w.name, w.description, w.muscles, w.equipment
+                FROM workout_tags t JOIN workouts w ON w.user_id = t.user_id AND w.workout_id = t.workout_id
+                WHERE t.user_id = ? AND t.field = ? AND t.tag_id = ? AND t.workout_id > ?
+            """
+            params = [user_id, *driver, after]
+            for field, tag_id in keys:
+                if (field, tag_id) == driver:
+                    continue
+                query += """
+                    AND EXISTS (
+                        SELECT 1 FROM workout_tags WHERE user_id = t.user_id AND field = ? AND tag_id = ?
+                        AND workout_id = t.workout_id
+                    )
+                """
+                params += [field, tag_id]
+            query += " ORDER BY t.workout_id LIMIT ?"
+            params.append(limit)
+            rows = conn.execute(query, params).fetchall()
+        return [_row_to_workout(row) for row in rows]
+
+    def search(self, user_id, terms, limit=None):
+        """
+        Finds a user's stored workouts whose name or description contains every search term.
+
+        Runs an FTS5 match over the user's rowid range of workouts_fts, then
+        ranks the matches like the memory store: by how often the terms occur,
+        with a match in the name counting ten times.
+
+        Args:
+            user_id (int): The ID of the user.
+            terms (list): Folded words from `search_terms`.
+            limit (int, optional): Maximum number of workouts to return. None returns all.
+
+        Returns:
+            list: The best matches first, each a workout with a snippet of the
+                description, or failing that the name, with matching words in brackets.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        # Quoting each word keeps FTS5 operators and syntax in the query literal
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        with get_db_connection() as conn:
+            rows = conn.execute("""
+                SELECT w.workout_id, w.name, w.description, w.muscles, w.equipment
+                FROM workouts_fts f JOIN workouts w ON w.user_id = ? AND w.workout_id = f.rowid - ?
+                WHERE workouts_fts MATCH ? AND f.rowid BETWEEN ? AND ?
+            """, (
+                user_id,
+                _fts_rowid(user_id, 0),
+                match,
+                _fts_rowid(user_id, 0),
+                _fts_rowid(user_id, 0xFFFFFFFF),
+            )).fetchall()
+        return _rank([_row_to_workout(row) for row in rows], set(terms), limit)
+
+    def update(self, user_id, workout_id, name, description):
+        """
+        Changes the name and description of one of a user's stored workouts.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+            name (str): The new name.
+            description (str): The new description.
+
+        Returns:
+            bool: True if the workout was found and updated.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        with get_db_connection() as conn:
+            cursor = conn.execute("""
+                UPDATE workouts SET name = ?, description = ? WHERE user_id = ? AND workout_id = ?
+            """, (name, description, user_id, workout_id))
+            if cursor.rowcount != 1:
+                return False
+            cursor.execute("""
+                UPDATE workouts_fts SET name = ?, description = ? WHERE rowid = ?
+            """, (name, description, _fts_rowid(user_id, workout_id)))
+            return True
+
+    def delete(self, user_id, workout_id):
+        """
+        Moves one of a user's stored workouts into the deletion log in one transaction.
+
+        An earlier tombstone of the same workout is replaced, and the user's
+        oldest entries beyond `deleted_max_count` are dropped.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Returns:
+            bool: True if the workout was found and deleted.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM workouts WHERE user_id = ? AND workout_id = ?
+                RETURNING workout_id, name, description, muscles, equipment
+            """, (user_id, workout_id))
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            cursor.executemany("""
+                DELETE FROM workout_tags WHERE user_id = ? AND field = ? AND tag_id = ? AND workout_id = ?
+            """, self._tag_rows(user_id, _row_to_workout(row)))
+            cursor.execute("DELETE FROM workouts_fts WHERE rowid = ?", (_fts_rowid(user_id, workout_id),))
+            cursor.execute("DELETE FROM deleted_workouts WHERE user_id = ? AND workout_id = ?", (user_id, workout_id))
+            cursor.execute("""
+                INSERT INTO deleted_workouts (user_id, workout_id, name, description, muscles, equipment, deleted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, *row, time.time()))
+            if self.deleted_max_count:
+                cursor.execute("""
+                    DELETE FROM deleted_workouts WHERE user_id = ? AND seq <= (
+                        SELECT seq FROM deleted_workouts WHERE user_id = ? ORDER BY seq DESC LIMIT 1 OFFSET ?
+                    )
+                """, (user_id, user_id, self.deleted_max_count))
+        return True
+
+    def restore(self, user_id, workout_id):
+        """
+        Moves a workout from a user's deletion log back into their stored workouts in one transaction.
+
+        Args:
+            user_id (int): The ID of the user.
+            workout_id (int): The ID of the workout.
+
+        Like `list_deleted`, skips tombstones past the retention limits that
+        `compact` has yet to remove.
+
+        Returns:
+            dict: The restored workout, or None if it has no tombstone within the
+                retention limits or is already stored again.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        retained, retained_params = self._retained(user_id)
+        query = f"""
+            SELECT workout_id, name, description, muscles, equipment FROM deleted_workouts
+            WHERE user_id = ? AND workout_id = ?{retained} ORDER BY seq DESC LIMIT 1
+        """
+        params = [user_id, workout_id, *retained_params]
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            row = cursor.execute(query, params).fetchone()
+            if row is None:
+                return None
+            workout = _row_to_workout(row)
+            if not self._insert(cursor, user_id, workout, time.time()):
+                return None
+            cursor.execute("DELETE FROM deleted_workouts WHERE user_id = ? AND workout_id = ?", (user_id, workout_id))
+        return workout
+
+    def _retained(self, user_id):
+        """
+        Returns an SQL condition, and its parameters, that keeps only a user's
+        tombstones within `deleted_max_age` and their newest `deleted_max_count`.
+        """
+        condition, params = "", []
+        cutoff = _age_cutoff(self.deleted_max_age)
+        if cutoff is not None:
+            condition += " AND deleted_at >= ?"
+            params.append(cutoff)
+        if self.deleted_max_count:
+            condition += """
+                AND seq >= COALESCE((
+                    SELECT seq FROM deleted_workouts WHERE user_id = ? ORDER BY seq DESC LIMIT 1 OFFSET ?
+                ), 0)
+            """
+            params += [user_id, self.deleted_max_count - 1]
+        return condition, params
+
+    def list_deleted(self, user_id, limit=None, after=None, since=None, until=None):
+        """
+        Returns a user's deleted workouts, oldest deletion first.
+
+        Reads seek the (user_id, seq) index, and workouts past the retention
+        limits are left out even before `compact` removes them.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int, optional): Maximum number of workouts to return. None returns all.
+            after (int, optional): Only return entries with a higher sequence number.
+            since (float, optional): Only return workouts deleted at or after this Unix time.
+            until (float, optional): Only return workouts deleted before this Unix time.
+
+        Returns:
+            list: (seq, workout) pairs, where seq orders the log and workout
+                carries its deleted_at time.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        retained, retained_params = self._retained(user_id)
+        query = f"""
+            SELECT seq, workout_id, name, description, muscles, equipment, deleted_at FROM deleted_workouts
+            WHERE user_id = ? AND seq > ?{retained}
+        """
+        params = [user_id, 0 if after is None else after, *retained_params]
+        if since is not None:
+            query += " AND deleted_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND deleted_at < ?"
+            params.append(until)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        with get_db_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [_row_to_deleted(row) for row in rows]
+
+    def compact(self):
+        """
+        Removes tombstones older than `deleted_max_age`.
+
+        `delete` already trims each user's log to `deleted_max_count`, so this
+        is one range delete on the deleted_at index. Entries left over the
+        count after the limit is lowered stay hidden from reads until the
+        user's next delete trims them.
+
+        Returns:
+            int: The number of deleted workouts removed.
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        cutoff = _age_cutoff(self.deleted_max_age)
+        if cutoff is None:
+            return 0
+        with get_db_connection() as conn:
+            return conn.execute("DELETE FROM deleted_workouts WHERE deleted_at < ?", (cutoff,)).rowcount
+
+    def clear(self):
+        """
+        Removes every stored and deleted workout of every user.
+
+        Returns:
+            None
+
+        Raises:
+            sqlite3.Error: If there is a database error.
+        """
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM workouts")
+            conn.execute("DELETE FROM workout_tags")
+            conn.execute("DELETE FROM workouts_fts")
+            conn.execute("DELETE FROM deleted_workouts")
+
+    def __len__(self):
+        with get_db_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM workouts").fetchone()[0]
+
+
+def create_workout_store(backend="sqlite", deleted_max_count=0, deleted_max_age=0, shards=16):
+    """
+    Creates the workout store for a backend.
+
+    Args:
+        backend (str): "sqlite" to share workouts between worker processes and
+            keep them across restarts, or "memory" for a per-process store.
+        deleted_max_count (int): Deleted workouts kept per user; 0 keeps all.
+        deleted_max_age (float): Seconds a deleted workout is kept; 0 keeps them forever.
+        shards (int): Number of independently locked shards of the memory store.
+
+    Returns:
+        SqliteWorkoutStore or InMemoryWorkoutStore: The new store.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        sqlite3.Error: If the SQLite tables cannot be created.
+    """
+    logging.info(f"Using the {backend} workout store.")
+    if backend == "sqlite":
+        return SqliteWorkoutStore(deleted_max_count, deleted_max_age)
+    if backend == "memory":
+        return InMemoryWorkoutStore(deleted_max_count, deleted_max_age, shards)
+    raise ValueError(f"Unknown workout store: {backend}")
@@ -0,0 +1,69 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter for fast set-membership tests.
+
+    Membership tests never produce false negatives: if `item in bloom` is False,
+    the item was definitely never added. A True answer may be a false positive,
+    with a probability close to `error_rate` once `capacity` items are added.
+
+    Args:
+        capacity (int): Expected number of items.
+        error_rate (float): Target false-positive probability.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        """
+        Adds an item to the filter.
+
+        Args:
+            item (object): The item to add; it is hashed through its string form.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @classmethod
+    def from_items(cls, items, error_rate=0.01):
+        """
+        Builds a filter sized for and containing the given items.
+
+        Args:
+            items (collection): The items to add.
+            error_rate (float): Target false-positive probability.
+
+        Returns:
+            BloomFilter: The populated filter.
+
+        Raises:
+            None
+        """
+        bloom = cls(len(items), error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
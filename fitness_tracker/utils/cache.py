@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+
+from fitness_tracker.utils.shared_cache import SharedMemoryCache
+
+
+class TTLCache:
+    """
+    A bounded, thread-safe in-memory cache with per-entry TTL and LRU eviction.
+
+    Entries expire `ttl` seconds after they are stored. When the cache is full,
+    the least recently used entry is evicted to make room for a new one.
+    Hit, miss and eviction counts are tracked for monitoring.
+
+    With `max_stale` set, expired entries are kept for that many extra seconds
+    so `lookup` can serve them as stale while the caller refreshes them.
+
+    Args:
+        max_entries (int): Maximum number of entries held at once.
+        ttl (float): Lifetime of an entry in seconds.
+        max_stale (float): Seconds past expiry an entry may still be served by `lookup`.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, max_stale=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Returns the cached value for a key, or None on a miss.
+
+        A hit marks the entry as most recently used. Expired entries count as
+        misses, even if they are still within the stale window.
+
+        Args:
+            key (hashable): The cache key.
+
+        Returns:
+            object: The cached value, or None if absent or expired.
+
+        Raises:
+            None
+        """
+        value, _ = self.lookup(key, allow_stale=False)
+        return value
+
+    def lookup(self, key, allow_stale=True):
+        """
+        Returns the cached value for a key together with its freshness.
+
+        Args:
+            key (hashable): The cache key.
+            allow_stale (bool): Whether to return entries that expired less than
+                `max_stale` seconds ago.
+
+        Returns:
+            tuple: (value, fresh), where value is None on a miss and fresh is
+                False for stale entries.
+
+        Raises:
+            None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            value, expires_at = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value, True
+            if expires_at + self.max_stale <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None, False
+            if not allow_stale:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            return value, False
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value, evicting the least recently used entry if full.
+
+        Args:
+            key (hashable): The cache key.
+            value (object): The value to store.
+            ttl (float, optional): Overrides the cache's default TTL for this entry.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (value, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Removes a key from the cache if present.
+
+        Args:
+            key (hashable): The cache key.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Returns the cache's size and counters.
+
+        Returns:
+            dict: A dictionary with size, max_entries, hits, stale_hits, misses and evictions.
+
+        Raises:
+            None
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def create_cache(backend="memory", path=None, max_entries=1024, ttl=3600, max_stale=0, **shared_options):
+    """
+    Creates a cache with the given backend; both backends share one interface.
+
+    Args:
+        backend (str): "memory" for a per-process `TTLCache`, or "shared" for a
+            `SharedMemoryCache` visible to every process using the same file.
+        path (str, optional): The shared backend's file.
+        max_entries (int): Maximum number of entries held at once.
+        ttl (float): Lifetime of an entry in seconds.
+        max_stale (float): Seconds past expiry an entry may still be served by `lookup`.
+        **shared_options: Extra `SharedMemoryCache` options such as slot_size.
+
+    Returns:
+        TTLCache or SharedMemoryCache: The new cache.
+
+    Raises:
+        ValueError: If the backend is unknown or the shared backend has no path.
+    """
+    if backend == "memory":
+        return TTLCache(max_entries=max_entries, ttl=ttl, max_stale=max_stale)
+    if backend == "shared":
+        if not path:
+            raise ValueError("The shared cache backend needs a file path.")
+        return SharedMemoryCache(path, max_entries=max_entries, ttl=ttl, max_stale=max_stale, **shared_options)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,210 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+
+# File layout, all integers little-endian:
+#   header  magic, version, flags, language, count, built_at, index offset, heap offset
+#   index   one fixed-width entry per exercise, sorted by ID: the ID followed by an
+#           (offset, length) pair into the heap for name, description, muscles and equipment
+#   heap    UTF-8 strings and uint16 ID arrays, referenced by the index
+SNAPSHOT_MAGIC = b"WGCS"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIIdQQ")
+_ENTRY = struct.Struct("<9I")
+_ID = struct.Struct("<I")
+
+
+def _pack_ids(ids):
+    """Packs a list of muscle or equipment IDs as little-endian uint16s."""
+    packed = array("H", ids)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_ids(data):
+    unpacked = array("H")
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+def write_snapshot(path, exercises, language):
+    """
+    Writes cleaned exercises to a catalog snapshot file.
+
+    The file is written next to its destination and then renamed over it, so
+    processes that still have the previous snapshot mapped keep reading it
+    unchanged.
+
+    Args:
+        path (str): Destination path of the snapshot.
+        exercises (iterable): Cleaned workouts with id, name, description,
+            muscles and equipment.
+        language (int): The wger language ID of the exercises.
+
+    Returns:
+        int: The number of exercises written.
+
+    Raises:
+        ValueError: If two exercises share an ID.
+        OSError: If the file cannot be written.
+    """
+    exercises = sorted(exercises, key=lambda exercise: exercise["id"])
+    heap = bytearray()
+    index = bytearray()
+    previous_id = None
+    for exercise in exercises:
+        if exercise["id"] == previous_id:
+            raise ValueError(f"Duplicate exercise ID {previous_id} in snapshot.")
+        previous_id = exercise["id"]
+        fields = []
+        for data in (
+            exercise["name"].encode(),
+            exercise["description"].encode(),
+            _pack_ids(exercise["muscles"]),
+            _pack_ids(exercise["equipment"]),
+        ):
+            fields += (len(heap), len(data))
+            heap += data
+        index += _ENTRY.pack(exercise["id"], *fields)
+
+    index_offset = _HEADER.size
+    heap_offset = index_offset + len(index)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, language, len(exercises), time.time(), index_offset, heap_offset,
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(index)
+        f.write(heap)
+    os.replace(tmp_path, path)
+    return len(exercises)
+
+
+class CatalogSnapshot:
+    """
+    A read-only, memory-mapped view of a catalog snapshot file.
+
+    Opening a snapshot only maps the file and reads its header, so it takes the
+    same time whatever the catalog's size. Lookups binary-search the fixed-width
+    index and decode a single entry. Every process mapping the same file shares
+    its pages through the OS page cache.
+
+    Args:
+        path (str): Path of a file written by `write_snapshot`.
+
+    Raises:
+        ValueError: If the file is not a snapshot of a supported version.
+        OSError: If the file cannot be opened.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} is not a catalog snapshot.")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, language, count, built_at, index_offset, heap_offset = _HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a catalog snapshot.")
+        if version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported catalog snapshot version {version}.")
+        if heap_offset != index_offset + count * _ENTRY.size or heap_offset > len(self._mmap):
+            self.close()
+            raise ValueError(f"Catalog snapshot {path} is truncated.")
+        self.path = path
+        self.language = language
+        self.built_at = built_at
+        self._count = count
+        self._index_offset = index_offset
+        self._heap_offset = heap_offset
+
+    def _find(self, exercise_id):
+        """Returns the index position of an exercise ID, or -1 if absent."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            (middle_id,) = _ID.unpack_from(self._mmap, self._index_offset + middle * _ENTRY.size)
+            if middle_id < exercise_id:
+                low = middle + 1
+            elif middle_id > exercise_id:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def _field(self, offset, length):
+        start = self._heap_offset + offset
+        return self._mmap[start:start + length]
+
+    def get(self, exercise_id):
+        """
+        Looks up one exercise.
+
+        Args:
+            exercise_id (int): The ID of the exercise.
+
+        Returns:
+            dict: The cleaned workout, or None if it is not in the snapshot.
+
+        Raises:
+            None
+        """
+        position = self._find(exercise_id)
+        if position < 0:
+            return None
+        entry = _ENTRY.unpack_from(self._mmap, self._index_offset + position * _ENTRY.size)
+        return {
+            "id": entry[0],
+            "name": self._field(entry[1], entry[2]).decode(),
+            "description": self._field(entry[3], entry[4]).decode(),
+            "muscles": _unpack_ids(self._field(entry[5], entry[6])),
+            "equipment": _unpack_ids(self._field(entry[7], entry[8])),
+        }
+
+    def ids(self):
+        """
+        Returns every exercise ID in the snapshot, in ascending order.
+
+        Returns:
+            list: The exercise IDs.
+
+        Raises:
+            None
+        """
+        return [
+            _ID.unpack_from(self._mmap, self._index_offset + position * _ENTRY.size)[0]
+            for position in range(self._count)
+        ]
+
+    def close(self):
+        """
+        Unmaps the file.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        self._mmap.close()
+
+    def __contains__(self, exercise_id):
+        return self._find(exercise_id) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
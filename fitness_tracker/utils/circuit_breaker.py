@@ -0,0 +1,131 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker for calls to an unreliable upstream.
+
+    The breaker starts closed and lets every call through. After
+    `failure_threshold` consecutive failures it opens and rejects calls
+    immediately. Once `reset_timeout` seconds have passed it becomes half-open
+    and lets a single trial call through: a success closes the breaker again,
+    a failure re-opens it.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the breaker.
+        reset_timeout (float): Seconds to stay open before allowing a trial call.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def allow_request(self):
+        """
+        Decides whether a call may be attempted now.
+
+        Returns:
+            bool: True if the call may proceed, False if it should fail fast.
+
+        Raises:
+            None
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """
+        Records a successful call and closes the breaker.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Records a failed call, opening the breaker if the threshold is reached.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Gives back a call allowed by `allow_request` that was never attempted,
+        so a half-open breaker can admit another trial.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self):
+        """
+        Closes the breaker and clears its counters.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.rejected = 0
+            self.opened = 0
+            self._opened_at = 0.0
+            self._trial_in_flight = False
+
+    def stats(self):
+        """
+        Returns the breaker's state and counters.
+
+        Returns:
+            dict: A dictionary with state, consecutive failures, times opened and rejected calls.
+
+        Raises:
+            None
+        """
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "opened": self.opened, "rejected": self.rejected}
@@ -0,0 +1,108 @@
+import re
+import html
+
+
+# Tags that start a new line in the plain-text output
+BLOCK_TAGS = {
+    "p", "div", "br", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "table", "tr", "blockquote", "pre", "hr",
+}
+
+# The tags wger descriptions use most, swapped out with str.replace before the regex pass
+_COMMON_TAGS = (
+    ("<p>", "\n"), ("</p>", "\n"), ("<li>", "\n- "), ("</li>", "\n"), ("<ul>", "\n"), ("</ul>", "\n"),
+)
+
+# Comments, start/end tags and character references. Attribute values may be quoted and
+# contain '>', and every attribute must be name=value, so plain text such as "a<b and c>d"
+# is not taken for a tag.
+_MARKUP_PATTERN = (
+    r"""<(?:!--.*?--|/?[a-zA-Z][a-zA-Z0-9]*(?:{space}+[^\s"'<>/=]+{space}*={space}*"""
+    r"""(?:"[^"]*"|'[^']*'|[^\s"'<>=`]+))*{space}*/?)>|&#?\w+;"""
+)
+_MARKUP_RE = re.compile(_MARKUP_PATTERN.format(space=r"\s"), re.DOTALL | re.ASCII)
+# The same markup with no line break between attributes, so that it cannot match across
+# the line breaks _COMMON_TAGS put in
+_LINE_MARKUP_RE = re.compile(_MARKUP_PATTERN.format(space=r"[^\S\n]"), re.DOTALL | re.ASCII)
+_ENTITY_RE = re.compile(r"&#?\w+;", re.ASCII)
+_TAG_NAME_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)")
+_MAX_REPLACEMENTS = 1024
+
+
+def _markup_replacement(token):
+    """Returns the plain-text replacement for a single tag, comment or entity."""
+    if token.startswith("&"):
+        return html.unescape(token).replace("\xa0", " ")
+    if token.startswith("<!--"):
+        return ""
+    closing, name = _TAG_NAME_RE.match(token).groups()
+    name = name.lower()
+    if name == "li":
+        return "\n" if closing else "\n- "
+    return "\n" if name in BLOCK_TAGS else ""
+
+
+class _ReplacementCache(dict):
+    """Memoizes token replacements; wger descriptions only use a handful of distinct tags."""
+
+    def __missing__(self, token):
+        replacement = _markup_replacement(token)
+        if len(self) < _MAX_REPLACEMENTS:
+            self[token] = replacement
+        return replacement
+
+
+_replacements = _ReplacementCache()
+
+
+def _replace_markup(match):
+    return _replacements[match[0]]
+
+
+def _collapse_whitespace(text):
+    """Strips every line, drops blank ones and collapses runs of whitespace to single spaces."""
+    text = "\n".join(filter(None, map(str.strip, text.split("\n"))))
+    # Every whitespace character but the space is unprintable, so this skips the
+    # per-word split when lines already carry single spaces only
+    if "  " not in text and text.replace("\n", " ").isprintable():
+        return text
+    return "\n".join(filter(None, map(" ".join, map(str.split, text.split("\n")))))
+
+
+def clean_description(description):
+    """
+    Converts a wger HTML description into normalized plain text.
+
+    Block-level tags (paragraphs, line breaks, lists, headings) become line
+    breaks, list items are prefixed with "- ", inline tags and comments are
+    dropped and entities such as `&amp;` or `&nbsp;` are decoded. Whitespace is
+    then collapsed so lines carry single spaces and no blank lines remain.
+
+    The most common tags are swapped out with `str.replace`; the remaining
+    markup and entities are handled by one regex pass with memoized
+    replacements, which is skipped when no markup is left.
+
+    Args:
+        description (str): The HTML description returned by wger. May be None.
+
+    Returns:
+        str: The plain-text description.
+
+    Raises:
+        None
+    """
+    if not description:
+        return ""
+    text = description
+    if "<" in text:
+        for tag, replacement in _COMMON_TAGS:
+            text = text.replace(tag, replacement)
+        if "<" in text:
+            text = _LINE_MARKUP_RE.sub(_replace_markup, text)
+            if "<" in text:
+                # A stray '<' or a tag spanning lines: redo the original in one regex pass
+                text = _MARKUP_RE.sub(_replace_markup, description)
+            return _collapse_whitespace(text)
+    if "&" in text:
+        text = _ENTITY_RE.sub(_replace_markup, text)
+    return _collapse_whitespace(text)
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    A thread-safe token-bucket rate limiter with priority lanes.
+
+    Tokens are added at `rate` per second up to `burst`, and every request
+    takes one. Callers queue in a lane; a lane only receives tokens while no
+    caller in a higher-priority lane (a lower index) is waiting, so background
+    traffic yields to interactive traffic. Wait times are recorded per lane.
+    A `rate` of 0 or less disables limiting.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (int): Maximum tokens held at once.
+        lanes (tuple): Lane names, highest priority first.
+    """
+
+    def __init__(self, rate, burst, lanes=("interactive", "background")):
+        self.rate = rate
+        self.burst = burst
+        self.lanes = tuple(lanes)
+        self._cond = threading.Condition()
+        self.reset()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _record(self, priority, waited):
+        lane = self._stats[priority]
+        lane["acquired"] += 1
+        lane["wait_total"] += waited
+        lane["wait_max"] = max(lane["wait_max"], waited)
+        lane["waits"].append(waited)
+
+    def acquire(self, priority=0, timeout=None):
+        """
+        Takes a token, blocking until one is available in this lane.
+
+        Args:
+            priority (int): Index of the lane to queue in; 0 is served first.
+            timeout (float, optional): Maximum seconds to wait. None waits forever.
+
+        Returns:
+            bool: True if a token was taken, False if the timeout ran out first.
+
+        Raises:
+            IndexError: If the priority does not name a lane.
+        """
+        start = time.monotonic()
+        with self._cond:
+            if self.rate <= 0:
+                self._record(priority, 0.0)
+                return True
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    blocked = any(self._waiting[:priority])
+                    if not blocked and self._tokens >= 1:
+                        self._tokens -= 1
+                        self._record(priority, now - start)
+                        return True
+                    # Higher lanes notify when they are done; otherwise sleep until the next token
+                    wait = None if blocked else (1 - self._tokens) / self.rate
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        if remaining <= 0:
+                            self._stats[priority]["rejected"] += 1
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def try_acquire(self, priority=0):
+        """
+        Takes a token only if one is available right now.
+
+        Args:
+            priority (int): Index of the lane to take the token for.
+
+        Returns:
+            bool: True if a token was taken.
+
+        Raises:
+            IndexError: If the priority does not name a lane.
+        """
+        return self.acquire(priority, timeout=0)
+
+    def reset(self):
+        """
+        Refills the bucket and clears the wait-time counters.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._cond:
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+            self._waiting = [0] * len(self.lanes)
+            self._stats = [
+                {"acquired": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0, "waits": deque(maxlen=200)}
+                for _ in self.lanes
+            ]
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Returns the bucket's configuration and per-lane wait-time metrics.
+
+        Returns:
+            dict: A dictionary with rate, burst, tokens and, under lanes, each
+                lane's acquired, rejected and waiting counts plus its mean,
+                p95 (over the last 200 requests) and max wait in milliseconds.
+
+        Raises:
+            None
+        """
+        with self._cond:
+            self._refill(time.monotonic())
+            lanes = {}
+            for name, lane, waiting in zip(self.lanes, self._stats, self._waiting):
+                waits = sorted(lane["waits"])
+                lanes[name] = {
+                    "acquired": lane["acquired"],
+                    "rejected": lane["rejected"],
+                    "waiting": waiting,
+                    "wait_mean_ms": round(lane["wait_total"] / lane["acquired"] * 1000, 3) if lane["acquired"] else 0.0,
+                    "wait_p95_ms": round(waits[max(int(len(waits) * 0.95) - 1, 0)] * 1000, 3) if waits else 0.0,
+                    "wait_max_ms": round(lane["wait_max"] * 1000, 3),
+                }
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 3) if self.rate > 0 else None,
+                "lanes": lanes,
+            }
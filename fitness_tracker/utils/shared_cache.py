@@ -0,0 +1,302 @@
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+
+# File layout, all integers little-endian:
+#   header  magic, version, slot count, slot size, ways, then the shared hit, stale hit,
+#           miss and eviction counters
+#   slots   fixed-size slots grouped into buckets of `ways`; each holds the key hash,
+#           expiry and last-use times, key and value lengths, then the JSON key and value
+_MAGIC = b"WGSC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIII")
+_COUNTERS = struct.Struct("<QQQQ")
+_COUNTERS_OFFSET = _HEADER.size
+_SLOTS_OFFSET = _HEADER.size + _COUNTERS.size
+_SLOT = struct.Struct("<QddHI")
+
+_reopen_lock = threading.Lock()
+
+
+def _encode_key(key):
+    encoded = json.dumps(key, separators=(",", ":")).encode()
+    return encoded, int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+class SharedMemoryCache:
+    """
+    A TTL cache stored in a memory-mapped file shared by every process using it.
+
+    Has the same interface as `TTLCache`, so worker processes of a pre-forking
+    server can share one cache: an entry stored by one worker is a hit for all
+    of them, and the hit, miss and eviction counters are shared too. Entries
+    live in fixed-size slots grouped into buckets; when a bucket is full, its
+    least recently used entry is evicted. Keys and values must be
+    JSON-serializable, and values that do not fit in a slot are not cached.
+
+    Operations take an exclusive lock on the file, so they are safe across
+    processes and threads. Each process maps the file itself, including after
+    a fork.
+
+    Args:
+        path (str): The backing file, ideally on a tmpfs such as /dev/shm.
+        max_entries (int): Maximum number of entries held at once.
+        ttl (float): Lifetime of an entry in seconds.
+        max_stale (float): Seconds past expiry an entry may still be served by `lookup`.
+        slot_size (int): Bytes per entry, including the key.
+        ways (int): Slots per bucket.
+    """
+
+    def __init__(self, path, max_entries=1024, ttl=3600, max_stale=0, slot_size=4096, ways=8):
+        self.path = path
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.slot_size = slot_size
+        self.ways = ways
+        self.buckets = max(1, -(-max_entries // ways))
+        self.max_entries = self.buckets * ways
+        self._size = _SLOTS_OFFSET + self.max_entries * slot_size
+        self._pid = None
+        self._thread_lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        """Maps the backing file in this process, initializing it if needed."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, _HEADER.size, 0)
+            expected = _HEADER.pack(_MAGIC, _VERSION, 0, self.max_entries, self.slot_size, self.ways)
+            if header != expected:
+                if header:
+                    logging.warning(f"Reinitializing shared cache {self.path} with a new layout.")
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, expected, 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._mmap = mmap.mmap(fd, self._size)
+        self._thread_lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _locked(self):
+        """Returns a context manager holding the in-process and cross-process locks."""
+        if self._pid != os.getpid():
+            # A forked child shares the parent's open file, which would share its flock
+            with _reopen_lock:
+                if self._pid != os.getpid():
+                    self._mmap.close()
+                    os.close(self._fd)
+                    self._open()
+        return _FileLock(self._thread_lock, self._fd)
+
+    def _count(self, index, amount=1):
+        offset = _COUNTERS_OFFSET + index * 8
+        (value,) = struct.unpack_from("<Q", self._mmap, offset)
+        struct.pack_into("<Q", self._mmap, offset, value + amount)
+
+    def _bucket(self, key_hash):
+        """Returns the offsets of the slots in a key's bucket."""
+        first = _SLOTS_OFFSET + (key_hash % self.buckets) * self.ways * self.slot_size
+        return range(first, first + self.ways * self.slot_size, self.slot_size)
+
+    def _find(self, encoded_key, key_hash):
+        """Returns the offset and header of the slot holding a key, or (None, None)."""
+        for offset in self._bucket(key_hash):
+            slot = _SLOT.unpack_from(self._mmap, offset)
+            if slot[3] and slot[0] == key_hash:
+                start = offset + _SLOT.size
+                if self._mmap[start:start + slot[3]] == encoded_key:
+                    return offset, slot
+        return None, None
+
+    def _clear_slot(self, offset):
+        _SLOT.pack_into(self._mmap, offset, 0, 0.0, 0.0, 0, 0)
+
+    def get(self, key):
+        """
+        Returns the cached value for a key, or None on a miss.
+
+        Expired entries count as misses, even if they are still within the stale window.
+
+        Args:
+            key (hashable): The cache key; must be JSON-serializable.
+
+        Returns:
+            object: The cached value, or None if absent or expired.
+
+        Raises:
+            None
+        """
+        value, _ = self.lookup(key, allow_stale=False)
+        return value
+
+    def lookup(self, key, allow_stale=True):
+        """
+        Returns the cached value for a key together with its freshness.
+
+        Args:
+            key (hashable): The cache key; must be JSON-serializable.
+            allow_stale (bool): Whether to return entries that expired less than
+                `max_stale` seconds ago.
+
+        Returns:
+            tuple: (value, fresh), where value is None on a miss and fresh is
+                False for stale entries.
+
+        Raises:
+            None
+        """
+        encoded_key, key_hash = _encode_key(key)
+        now = time.time()
+        with self._locked():
+            offset, slot = self._find(encoded_key, key_hash)
+            if offset is None:
+                self._count(2)
+                return None, False
+            _, expires_at, _, key_length, value_length = slot
+            fresh = expires_at > now
+            if not fresh:
+                if expires_at + self.max_stale <= now:
+                    self._clear_slot(offset)
+                    self._count(2)
+                    return None, False
+                if not allow_stale:
+                    self._count(2)
+                    return None, False
+            self._count(0 if fresh else 1)
+            _SLOT.pack_into(self._mmap, offset, key_hash, expires_at, now, key_length, value_length)
+            start = offset + _SLOT.size + key_length
+            value = json.loads(self._mmap[start:start + value_length])
+        return value, fresh
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value, evicting the least recently used entry of its bucket if full.
+
+        Values whose serialized form does not fit in a slot are not stored.
+
+        Args:
+            key (hashable): The cache key; must be JSON-serializable.
+            value (object): The value to store; must be JSON-serializable.
+            ttl (float, optional): Overrides the cache's default TTL for this entry.
+
+        Returns:
+            None
+
+        Raises:
+            TypeError: If the key or value cannot be serialized.
+        """
+        encoded_key, key_hash = _encode_key(key)
+        encoded_value = json.dumps(value, separators=(",", ":")).encode()
+        if _SLOT.size + len(encoded_key) + len(encoded_value) > self.slot_size:
+            logging.debug(f"Not caching {key}: {len(encoded_value)} bytes do not fit in a slot.")
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._locked():
+            offset, _ = self._find(encoded_key, key_hash)
+            if offset is None:
+                victim = None
+                for candidate in self._bucket(key_hash):
+                    slot = _SLOT.unpack_from(self._mmap, candidate)
+                    if not slot[3] or slot[1] + self.max_stale <= now:
+                        offset = candidate
+                        break
+                    if victim is None or slot[2] < victim[1]:
+                        victim = (candidate, slot[2])
+                if offset is None:
+                    offset = victim[0]
+                    self._count(3)
+            _SLOT.pack_into(self._mmap, offset, key_hash, expires_at, now, len(encoded_key), len(encoded_value))
+            start = offset + _SLOT.size
+            self._mmap[start:start + len(encoded_key)] = encoded_key
+            start += len(encoded_key)
+            self._mmap[start:start + len(encoded_value)] = encoded_value
+
+    def delete(self, key):
+        """
+        Removes a key from the cache if present.
+
+        Args:
+            key (hashable): The cache key; must be JSON-serializable.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        encoded_key, key_hash = _encode_key(key)
+        with self._locked():
+            offset, _ = self._find(encoded_key, key_hash)
+            if offset is not None:
+                self._clear_slot(offset)
+
+    def clear(self):
+        """
+        Removes every entry and resets the shared counters.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._locked():
+            self._mmap[_COUNTERS_OFFSET:] = bytes(self._size - _COUNTERS_OFFSET)
+
+    def _entries(self):
+        return sum(
+            1 for offset in range(_SLOTS_OFFSET, self._size, self.slot_size)
+            if _SLOT.unpack_from(self._mmap, offset)[3]
+        )
+
+    def stats(self):
+        """
+        Returns the cache's size and the counters shared by every process.
+
+        Returns:
+            dict: A dictionary with size, max_entries, hits, stale_hits, misses and evictions.
+
+        Raises:
+            None
+        """
+        with self._locked():
+            hits, stale_hits, misses, evictions = _COUNTERS.unpack_from(self._mmap, _COUNTERS_OFFSET)
+            return {
+                "size": self._entries(),
+                "max_entries": self.max_entries,
+                "hits": hits,
+                "stale_hits": stale_hits,
+                "misses": misses,
+                "evictions": evictions,
+            }
+
+    def __len__(self):
+        with self._locked():
+            return self._entries()
+
+
+class _FileLock:
+    """Holds a thread lock and an exclusive flock on a file descriptor."""
+
+    def __init__(self, thread_lock, fd):
+        self._thread_lock = thread_lock
+        self._fd = fd
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
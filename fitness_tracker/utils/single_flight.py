@@ -0,0 +1,95 @@
+import threading
+
+
+class _Call:
+    """An in-flight call whose result is shared with every waiting caller."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is still running wait for it and receive the same result (or exception)
+    instead of running the function again. Coalesced calls are counted so the
+    savings can be monitored.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Runs `fn` for a key, or waits for the call already in flight for it.
+
+        Args:
+            key (hashable): Identifies calls that may share a result.
+            fn (callable): A function taking no arguments.
+
+        Returns:
+            object: The value returned by the shared call of `fn`.
+
+        Raises:
+            Exception: Whatever the shared call of `fn` raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """
+        Returns the execution and coalescing counters.
+
+        Returns:
+            dict: A dictionary with in_flight, executions and coalesced counts.
+
+        Raises:
+            None
+        """
+        with self._lock:
+            return {"in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
+
+    def reset_stats(self):
+        """
+        Resets the counters to zero.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        with self._lock:
+            self.executions = 0
+            self.coalesced = 0
@@ -16,12 +16,28 @@ def get_db_connection():
     Raises:
         sqlite3.Error: If there is an error connecting to the database.
     """
-    return sqlite3.connect("DB_PATH")
+    return sqlite3.connect(DB_PATH or "DB_PATH")
 
 def initialize_database():
     """
     Initializes the database with required tables.
 
+    Returns:
+        None
+
+    Raises:
+        FileNotFoundError: If the SQL file is not found.
+        sqlite3.Error: If there is an error executing the SQL script.
+    """
+    execute_sql_script("sql/create_user_table.sql")
+
+def execute_sql_script(script_path):
+    """
+    Executes a SQL script against the database.
+
+    Args:
+        script_path (str): Path to the SQL script to run.
+
     Returns:
         None
 
@@ -30,5 +46,5 @@ def initialize_database():
         sqlite3.Error: If there is an error executing the SQL script.
     """
     with get_db_connection() as conn:
-        with open("sql/create_user_table.sql", "r") as f:
+        with open(script_path, "r") as f:
             conn.executescript(f.read())
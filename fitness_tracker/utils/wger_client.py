@@ -0,0 +1,306 @@
+import os
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fitness_tracker.utils.circuit_breaker import CircuitBreaker
+from fitness_tracker.utils.html_utils import clean_description
+from fitness_tracker.utils.rate_limiter import TokenBucket
+
+
+# Connection pool and timeout settings for outbound wger requests
+WGER_POOL_SIZE = int(os.getenv("WGER_POOL_SIZE", "10"))
+WGER_CONNECT_TIMEOUT = float(os.getenv("WGER_CONNECT_TIMEOUT", "3.05"))
+WGER_READ_TIMEOUT = float(os.getenv("WGER_READ_TIMEOUT", "10"))
+
+# Total time budget for one wger call, including any hedged attempt
+WGER_DEADLINE = float(os.getenv("WGER_DEADLINE", "5"))
+
+# Circuit breaker: fail fast after this many consecutive failures, retry after the reset timeout
+WGER_BREAKER_FAILURES = int(os.getenv("WGER_BREAKER_FAILURES", "5"))
+WGER_BREAKER_RESET = float(os.getenv("WGER_BREAKER_RESET", "30"))
+
+# Hedged requests: send a second attempt if the first is slower than the observed p95
+WGER_HEDGE_ENABLED = os.getenv("WGER_HEDGE", "0") == "1"
+WGER_HEDGE_DELAY = float(os.getenv("WGER_HEDGE_DELAY", "0.5"))
+WGER_HEDGE_MIN_SAMPLES = 20
+
+# Outbound rate limit shared by every wger caller; 0 disables it
+WGER_RATE_LIMIT = float(os.getenv("WGER_RATE_LIMIT", "10"))
+WGER_RATE_BURST = int(os.getenv("WGER_RATE_BURST", "20"))
+
+# Rate limiter lanes: user-facing lookups are served before sync and refresh traffic
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+_session = None
+_session_lock = threading.Lock()
+
+breaker = CircuitBreaker(failure_threshold=WGER_BREAKER_FAILURES, reset_timeout=WGER_BREAKER_RESET)
+limiter = TokenBucket(WGER_RATE_LIMIT, WGER_RATE_BURST, lanes=("interactive", "background"))
+
+# Attempts run on this pool so a call can give up at its deadline while the socket finishes
+_executor = ThreadPoolExecutor(max_workers=WGER_POOL_SIZE * 2, thread_name_prefix="wger")
+
+_latencies = deque(maxlen=200)
+_latency_lock = threading.Lock()
+_hedged_requests = 0
+
+
+class WgerUnavailableError(requests.exceptions.ConnectionError):
+    """Raised without contacting wger while the circuit breaker is open."""
+
+
+class WgerDeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when a wger call does not complete within its deadline."""
+
+
+def create_session(pool_size=WGER_POOL_SIZE):
+    """
+    Creates a requests session backed by a keep-alive connection pool.
+
+    The mounted adapter keeps up to `pool_size` idle connections per host open,
+    so repeated calls to wger reuse an established TCP/TLS connection instead of
+    performing a new handshake. When every connection is busy, callers block
+    until one is returned rather than opening throwaway connections.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host.
+
+    Returns:
+        requests.Session: A session with pooled HTTP and HTTPS adapters.
+
+    Raises:
+        None
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Returns the shared wger session, creating it on first use.
+
+    The session is created lazily under a lock so concurrent first requests
+    from different threads end up sharing a single connection pool.
+
+    Returns:
+        requests.Session: The module-level pooled session.
+
+    Raises:
+        None
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                logging.info(f"Creating wger session with pool size {WGER_POOL_SIZE}.")
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    """
+    Closes the shared wger session and drops all pooled connections.
+
+    A new session is created the next time `get_session` is called.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _send(url, headers, timeout):
+    """Performs one attempt on the shared session and records its latency."""
+    start = time.monotonic()
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    with _latency_lock:
+        _latencies.append(time.monotonic() - start)
+    return response
+
+
+def _hedge_delay():
+    """Returns the observed p95 latency, or WGER_HEDGE_DELAY until enough samples exist."""
+    with _latency_lock:
+        samples = sorted(_latencies)
+    if len(samples) < WGER_HEDGE_MIN_SAMPLES:
+        return WGER_HEDGE_DELAY
+    return samples[int(len(samples) * 0.95) - 1]
+
+
+def _get_within_deadline(url, headers, timeout, deadline, priority=PRIORITY_INTERACTIVE):
+    """
+    Runs the request on the attempt pool and waits at most `deadline` seconds.
+
+    With hedging enabled, a second identical attempt is started when the first
+    has not answered within the p95 latency, and the first response wins. The
+    hedge is skipped if the rate limiter has no token to spare for it.
+    """
+    global _hedged_requests
+    expires_at = time.monotonic() + deadline
+    timeout = tuple(min(value, deadline) for value in timeout)
+    attempts = {_executor.submit(_send, url, headers, timeout)}
+    hedged = not WGER_HEDGE_ENABLED
+    error = None
+    while attempts:
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            break
+        done, attempts = wait(
+            attempts,
+            timeout=remaining if hedged else min(remaining, _hedge_delay()),
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            try:
+                return future.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+        if not done and not hedged:
+            hedged = True
+            if not limiter.try_acquire(priority):
+                logging.info(f"Not hedging wger request to {url}: rate limit reached.")
+                continue
+            with _latency_lock:
+                _hedged_requests += 1
+            logging.info(f"Hedging slow wger request to {url}.")
+            attempts.add(_executor.submit(_send, url, headers, timeout))
+    if not attempts and error is not None:
+        raise error
+    raise WgerDeadlineExceeded(f"wger did not respond within {deadline:.2f}s.")
+
+
+def wger_get(url, headers=None, timeout=None, deadline=None, priority=PRIORITY_INTERACTIVE):
+    """
+    Sends a GET request to wger through the shared pooled session.
+
+    The call is guarded by a circuit breaker: after WGER_BREAKER_FAILURES
+    consecutive failures (errors, timeouts or 5xx responses) it fails fast with
+    WgerUnavailableError until WGER_BREAKER_RESET seconds have passed. The call
+    never takes longer than its deadline, and with WGER_HEDGE enabled a slow
+    first attempt is hedged with a second one.
+
+    Every attempt the breaker lets through takes a token from the shared rate
+    limiter (WGER_RATE_LIMIT requests per second, bursts of WGER_RATE_BURST),
+    so an open breaker still fails fast without queueing for one. Time spent
+    waiting for a token counts against the deadline, and PRIORITY_INTERACTIVE
+    callers are always served before PRIORITY_BACKGROUND ones.
+
+    Args:
+        url (str): The full URL to request.
+        headers (dict, optional): Extra request headers.
+        timeout (tuple, optional): A (connect, read) timeout pair in seconds.
+            Defaults to WGER_CONNECT_TIMEOUT and WGER_READ_TIMEOUT.
+        deadline (float, optional): Total seconds allowed for the call.
+            Defaults to WGER_DEADLINE.
+        priority (int): The rate limiter lane, PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND.
+
+    Returns:
+        requests.Response: The response returned by wger.
+
+    Raises:
+        WgerUnavailableError: If the circuit breaker is open.
+        WgerDeadlineExceeded: If no rate limit token or response arrives before the deadline.
+        requests.exceptions.RequestException: If the request fails.
+    """
+    if timeout is None:
+        timeout = (WGER_CONNECT_TIMEOUT, WGER_READ_TIMEOUT)
+    if deadline is None:
+        deadline = WGER_DEADLINE
+    if not breaker.allow_request():
+        raise WgerUnavailableError("wger circuit breaker is open.")
+    start = time.monotonic()
+    if not limiter.acquire(priority, timeout=deadline):
+        breaker.release()
+        raise WgerDeadlineExceeded(f"No wger rate limit token within {deadline:.2f}s.")
+    deadline -= time.monotonic() - start
+    try:
+        response = _get_within_deadline(url, headers, timeout, deadline, priority)
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def get_client_stats():
+    """
+    Returns resilience counters for the wger client.
+
+    Returns:
+        dict: A dictionary containing:
+            - breaker (dict): The circuit breaker's state and counters.
+            - hedged_requests (int): Number of hedged attempts sent.
+            - hedge_delay_ms (float): The current hedging threshold in milliseconds.
+            - rate_limiter (dict): Token bucket settings and per-lane wait times.
+
+    Raises:
+        None
+    """
+    return {
+        "breaker": breaker.stats(),
+        "hedged_requests": _hedged_requests,
+        "hedge_delay_ms": round(_hedge_delay() * 1000, 3),
+        "rate_limiter": limiter.stats(),
+    }
+
+
+def reset_client_stats():
+    """
+    Closes the circuit breaker, refills the rate limiter and forgets recorded
+    latencies and hedges.
+
+    Returns:
+        None
+
+    Raises:
+        None
+    """
+    global _hedged_requests
+    breaker.reset()
+    limiter.reset()
+    with _latency_lock:
+        _latencies.clear()
+        _hedged_requests = 0
+
+
+def clean_exercise(exercise):
+    """
+    Extracts the fields the app uses from a raw wger exercise payload.
+
+    Args:
+        exercise (dict): An exercise object as returned by the wger API.
+
+    Returns:
+        dict: A dictionary with id, name, description, muscles and equipment,
+            with the HTML description converted to plain text.
+
+    Raises:
+        KeyError: If a required field is missing from the payload.
+    """
+    return {
+        "id": exercise["id"],
+        "name": exercise["name"],
+        "description": clean_description(exercise.get("description")),
+        "muscles": exercise["muscles"],
+        "equipment": exercise["equipment"],
+    }
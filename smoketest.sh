@@ -3,6 +3,9 @@
 # Base URL for the Flask API
 BASE_URL="http://127.0.0.1:5000"
 
+# Credentials for the workout routes, set by update_password
+AUTH="testuser:newpassword123"
+
 # Function to check the health of the service
 check_health() {
   echo "Checking health status..."
@@ -45,7 +48,7 @@ login() {
 # Function to update the user's password
 update_password() {
   echo "Testing password update..."
-  response=$(curl -s -X POST -H "Content-Type: application/json" -d '{"username": "testuser", "new_password": "newpassword123"}' "$BASE_URL/update-password")
+  response=$(curl -s -u "testuser:password123" -X POST -H "Content-Type: application/json" -d '{"new_password": "newpassword123"}' "$BASE_URL/update-password")
   echo "$response" | grep -q '"message": "Password updated successfully."'
   if [ $? -eq 0 ]; then
     echo "Password update passed!"
@@ -59,7 +62,7 @@ update_password() {
 add_workout() {
   workout_id=$1
   echo "Adding workout ID $workout_id..."
-  response=$(curl -s -X POST "$BASE_URL/workouts/$workout_id")
+  response=$(curl -s -u "$AUTH" -X POST "$BASE_URL/workouts/$workout_id")
   echo "$response" | grep -q '"message": "Workout added to memory."'
   if [ $? -eq 0 ]; then
     echo "Add workout passed!"
@@ -72,7 +75,7 @@ add_workout() {
 # Function to list workouts
 list_workouts() {
   echo "Listing all workouts..."
-  response=$(curl -s -X GET "$BASE_URL/workouts")
+  response=$(curl -s -u "$AUTH" -X GET "$BASE_URL/workouts")
   echo "$response" | grep -q '"stored_workouts"'
   if [ $? -eq 0 ]; then
     echo "List workouts passed!"
@@ -86,7 +89,7 @@ list_workouts() {
 update_workout() {
   workout_id=$1
   echo "Updating workout ID $workout_id..."
-  response=$(curl -s -X PUT -H "Content-Type: application/json" -d '{"name": "Updated Workout", "description": "Updated Description"}' "$BASE_URL/workouts/$workout_id")
+  response=$(curl -s -u "$AUTH" -X PUT -H "Content-Type: application/json" -d '{"name": "Updated Workout", "description": "Updated Description"}' "$BASE_URL/workouts/$workout_id")
   echo "$response" | grep -q '"message": "Workout updated."'
   if [ $? -eq 0 ]; then
     echo "Update workout passed!"
@@ -100,7 +103,7 @@ update_workout() {
 delete_workout() {
   workout_id=$1
   echo "Deleting workout ID $workout_id..."
-  response=$(curl -s -X DELETE "$BASE_URL/workouts/$workout_id")
+  response=$(curl -s -u "$AUTH" -X DELETE "$BASE_URL/workouts/$workout_id")
   echo "$response" | grep -q '"message": "Workout deleted and logged."'
   if [ $? -eq 0 ]; then
     echo "Delete workout passed!"
@@ -113,7 +116,7 @@ delete_workout() {
 # Function to list deleted workouts
 list_deleted_workouts() {
   echo "Listing all deleted workouts..."
-  response=$(curl -s -X GET "$BASE_URL/workouts/deleted")
+  response=$(curl -s -u "$AUTH" -X GET "$BASE_URL/workouts/deleted")
   echo "$response" | grep -q '"deleted_workouts"'
   if [ $? -eq 0 ]; then
     echo "List deleted workouts passed!"
@@ -123,6 +126,20 @@ list_deleted_workouts() {
   fi
 }
 
+# Function to restore a deleted workout
+restore_workout() {
+  workout_id=$1
+  echo "Restoring workout ID $workout_id..."
+  response=$(curl -s -u "$AUTH" -X POST "$BASE_URL/workouts/$workout_id/restore")
+  echo "$response" | grep -q '"message": "Workout restored."'
+  if [ $? -eq 0 ]; then
+    echo "Restore workout passed!"
+  else
+    echo "Restore workout failed."
+    exit 1
+  fi
+}
+
 ############################################
 # Execute Smoke Tests
 ############################################
@@ -141,5 +158,6 @@ list_workouts
 update_workout 85
 delete_workout 85
 list_deleted_workouts
+restore_workout 85
 
 echo "All smoke tests passed successfully!"
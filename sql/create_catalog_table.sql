@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS exercise_catalog (
+    id INTEGER NOT NULL,
+    language INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    muscles TEXT NOT NULL,
+    equipment TEXT NOT NULL,
+    last_update TEXT,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (id, language)
+);
+
+CREATE TABLE IF NOT EXISTS catalog_sync_state (
+    language INTEGER PRIMARY KEY,
+    high_water TEXT,
+    synced_at REAL NOT NULL
+);
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS exercise_reference (
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+);
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS exercise_response_cache (
+    workout_id INTEGER NOT NULL,
+    language INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (workout_id, language)
+);
@@ -0,0 +1,86 @@
+CREATE TABLE IF NOT EXISTS workouts (
+    user_id INTEGER NOT NULL,
+    workout_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    muscles TEXT NOT NULL,
+    equipment TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (user_id, workout_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS deleted_workouts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    workout_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    muscles TEXT NOT NULL,
+    equipment TEXT NOT NULL,
+    deleted_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_workouts_user_seq ON deleted_workouts (user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_deleted_workouts_user_workout ON deleted_workouts (user_id, workout_id);
+CREATE INDEX IF NOT EXISTS idx_deleted_workouts_deleted_at ON deleted_workouts (deleted_at);
+
+-- Inverted index of stored workouts by muscle and equipment ID; tag_id -1 stands for an empty list
+CREATE TABLE IF NOT EXISTS workout_tags (
+    user_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    tag_id INTEGER NOT NULL,
+    workout_id INTEGER NOT NULL,
+    PRIMARY KEY (user_id, field, tag_id, workout_id)
+) WITHOUT ROWID;
+
+-- Length of each workout_tags posting list, so a filtered page can scan the shortest one
+CREATE TABLE IF NOT EXISTS workout_tag_counts (
+    user_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    tag_id INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (user_id, field, tag_id)
+) WITHOUT ROWID;
+
+-- Fills the counts once for postings indexed before they existed
+INSERT OR IGNORE INTO workout_tag_counts (user_id, field, tag_id, size)
+SELECT user_id, field, tag_id, COUNT(*) FROM workout_tags
+WHERE NOT EXISTS (SELECT 1 FROM workout_tag_counts)
+GROUP BY user_id, field, tag_id;
+
+CREATE TRIGGER IF NOT EXISTS workout_tags_count_insert AFTER INSERT ON workout_tags
+BEGIN
+    INSERT OR IGNORE INTO workout_tag_counts (user_id, field, tag_id, size)
+    VALUES (NEW.user_id, NEW.field, NEW.tag_id, 0);
+    UPDATE workout_tag_counts SET size = size + 1
+    WHERE user_id = NEW.user_id AND field = NEW.field AND tag_id = NEW.tag_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS workout_tags_count_delete AFTER DELETE ON workout_tags
+BEGIN
+    UPDATE workout_tag_counts SET size = size - 1
+    WHERE user_id = OLD.user_id AND field = OLD.field AND tag_id = OLD.tag_id;
+    DELETE FROM workout_tag_counts
+    WHERE user_id = OLD.user_id AND field = OLD.field AND tag_id = OLD.tag_id AND size = 0;
+END;
+
+-- Fills the index once for workouts stored before it existed
+INSERT OR IGNORE INTO workout_tags (user_id, field, tag_id, workout_id)
+SELECT user_id, field, tag_id, workout_id FROM (
+    SELECT w.user_id, 'muscles' AS field, m.value AS tag_id, w.workout_id FROM workouts w, json_each(w.muscles) m
+    UNION ALL
+    SELECT w.user_id, 'equipment', e.value, w.workout_id FROM workouts w, json_each(w.equipment) e
+    UNION ALL
+    SELECT user_id, 'muscles', -1, workout_id FROM workouts WHERE json_array_length(muscles) = 0
+    UNION ALL
+    SELECT user_id, 'equipment', -1, workout_id FROM workouts WHERE json_array_length(equipment) = 0
+) WHERE NOT EXISTS (SELECT 1 FROM workout_tags);
+
+-- Full-text index of stored workout names and descriptions; rowid is user_id << 32 | workout_id,
+-- so one user's workouts are a rowid range
+CREATE VIRTUAL TABLE IF NOT EXISTS workouts_fts USING fts5(name, description);
+
+-- Fills the full-text index once for workouts stored before it existed
+INSERT INTO workouts_fts (rowid, name, description)
+SELECT (user_id << 32) | workout_id, name, description FROM workouts
+WHERE NOT EXISTS (SELECT 1 FROM workouts_fts);
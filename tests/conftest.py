@@ -0,0 +1,12 @@
+import os
+import shutil
+import tempfile
+
+# Point DB_PATH at a throwaway database before any fitness_tracker module reads it, so the
+# tests never write to, or switch to WAL mode, the database files in the repository
+_db_dir = tempfile.mkdtemp(prefix="fitness-tracker-tests-")
+os.environ["DB_PATH"] = os.path.join(_db_dir, "test.db")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_db_dir, ignore_errors=True)
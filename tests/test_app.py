@@ -0,0 +1,218 @@
+import base64
+import json
+import unittest
+from unittest.mock import patch
+
+from app import app
+from fitness_tracker.models.user_model import create_user, get_authenticated_user_id
+from fitness_tracker.models.workout_model import workout_store
+from fitness_tracker.utils.sql_utils import get_db_connection, initialize_database
+
+
+def basic_auth(username, password):
+    """Returns an Authorization header with HTTP Basic credentials."""
+    token = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+
+ALICE = basic_auth("alice", "alice-password")
+BOB = basic_auth("bob", "bob-password")
+
+
+def fake_exercise(workout_id):
+    """Returns a cleaned wger exercise for workout_id."""
+    return {
+        "id": workout_id,
+        "name": f"Exercise {workout_id}",
+        "description": f"Description {workout_id}",
+        "muscles": [workout_id % 3 + 1],
+        "equipment": [],
+    }
+
+
+class TestAppAuth(unittest.TestCase):
+
+    def setUp(self):
+        """Create two users and clear their workouts."""
+        initialize_database()
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM users")
+            conn.commit()
+        workout_store.clear()
+        create_user("alice", "alice-password")
+        create_user("bob", "bob-password")
+        self.client = app.test_client()
+
+    def test_login_required_missing_credentials(self):
+        """Test that a workout route without credentials returns 401 and a Basic challenge."""
+        response = self.client.get("/workouts")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Basic", response.headers["WWW-Authenticate"])
+
+    def test_login_required_wrong_credentials(self):
+        """Test that a wrong password or unknown user returns 401."""
+        for headers in (basic_auth("alice", "wrong"), basic_auth("nobody", "alice-password")):
+            response = self.client.get("/workouts", headers=headers)
+            self.assertEqual(response.status_code, 401)
+
+    def test_login_required_correct_credentials(self):
+        """Test that correct credentials reach the route."""
+        response = self.client.get("/workouts", headers=ALICE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["stored_workouts"], [])
+
+    @patch("fitness_tracker.models.workout_model.check_workout_in_api", side_effect=fake_exercise)
+    def test_users_cannot_see_or_delete_each_others_workouts(self, mock_get):
+        """Test that one user's workouts are invisible to, and cannot be changed by, another user."""
+        self.assertEqual(self.client.post("/workouts/1", headers=ALICE).status_code, 201)
+
+        response = self.client.get("/workouts", headers=BOB)
+        self.assertEqual(response.get_json()["stored_workouts"], [])
+        response = self.client.get("/workouts/search?q=exercise", headers=BOB)
+        self.assertEqual(response.get_json()["results"], [])
+        self.assertEqual(self.client.delete("/workouts/1", headers=BOB).status_code, 404)
+        response = self.client.put("/workouts/1", json={"name": "Mine", "description": "Now"}, headers=BOB)
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get("/workouts", headers=ALICE)
+        workouts = response.get_json()["stored_workouts"]
+        self.assertEqual([(w["id"], w["name"]) for w in workouts], [(1, "Exercise 1")])
+
+        self.assertEqual(self.client.delete("/workouts/1", headers=ALICE).status_code, 200)
+        response = self.client.get("/workouts/deleted", headers=BOB)
+        self.assertEqual(response.get_json()["deleted_workouts"], [])
+        self.assertEqual(self.client.post("/workouts/1/restore", headers=BOB).status_code, 404)
+        self.assertEqual(self.client.post("/workouts/1/restore", headers=ALICE).status_code, 200)
+
+    def test_update_password_requires_credentials(self):
+        """Test that the password cannot be changed without the current credentials."""
+        payload = {"username": "alice", "new_password": "taken-over"}
+        self.assertEqual(self.client.post("/update-password", json=payload).status_code, 401)
+        response = self.client.post("/update-password", json=payload, headers=basic_auth("alice", "wrong"))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client.get("/workouts", headers=ALICE).status_code, 200)
+
+    def test_update_password_only_own_account(self):
+        """Test that a user cannot change another user's password."""
+        payload = {"username": "alice", "new_password": "taken-over"}
+        self.assertEqual(self.client.post("/update-password", json=payload, headers=BOB).status_code, 403)
+        self.assertEqual(self.client.get("/workouts", headers=ALICE).status_code, 200)
+        self.assertEqual(self.client.get("/workouts", headers=basic_auth("alice", "taken-over")).status_code, 401)
+
+    def test_update_password(self):
+        """Test that a user can change their own password and must then use it."""
+        response = self.client.post("/update-password", json={"new_password": "new-password"}, headers=ALICE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/workouts", headers=ALICE).status_code, 401)
+        self.assertEqual(self.client.get("/workouts", headers=basic_auth("alice", "new-password")).status_code, 200)
+
+
+class TestAppListing(unittest.TestCase):
+
+    def setUp(self):
+        """Create a user with six stored and three deleted workouts."""
+        initialize_database()
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM users")
+            conn.commit()
+        workout_store.clear()
+        create_user("alice", "alice-password")
+        user_id = get_authenticated_user_id("alice", "alice-password")
+        workout_store.add_many(
+            user_id,
+            [dict(fake_exercise(workout_id), equipment=[1] if workout_id % 2 else []) for workout_id in range(1, 10)],
+        )
+        for workout_id in (7, 8, 9):
+            workout_store.delete(user_id, workout_id)
+        self.client = app.test_client()
+
+    def get(self, path, accept=None, **args):
+        headers = dict(ALICE)
+        if accept:
+            headers["Accept"] = accept
+        return self.client.get(path, query_string=args, headers=headers)
+
+    @staticmethod
+    def ndjson(response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def assert_error(self, response):
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["status"], "error")
+
+    def test_accept_header_chooses_format(self):
+        """Test that NDJSON is streamed only when the client prefers it to JSON."""
+        for accept, mimetype in [
+            (None, "application/json"),
+            ("*/*", "application/json"),
+            ("application/json", "application/json"),
+            ("application/x-ndjson", "application/x-ndjson"),
+            ("application/json;q=0.5, application/x-ndjson", "application/x-ndjson"),
+            ("application/json, application/x-ndjson;q=0.5", "application/json"),
+        ]:
+            for path in ("/workouts", "/workouts/deleted"):
+                with self.subTest(accept=accept, path=path):
+                    response = self.get(path, accept=accept)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.mimetype, mimetype)
+
+    def test_ndjson_matches_json_page(self):
+        """Test that the streamed lines are the workouts of the JSON page, whatever the chunk size."""
+        for path, key, args in [
+            ("/workouts", "stored_workouts", {}),
+            ("/workouts", "stored_workouts", {"muscle": "2"}),
+            ("/workouts", "stored_workouts", {"equipment": "none"}),
+            ("/workouts/deleted", "deleted_workouts", {}),
+            ("/workouts/deleted", "deleted_workouts", {"since": "0"}),
+        ]:
+            page = self.get(path, limit=1000, **args).get_json()[key]
+            first = self.get(path, limit=1, **args).get_json()
+            self.assertGreater(len(page), 1)
+            for chunk_size in (1, 64 * 1024):
+                with self.subTest(path=path, args=args, chunk_size=chunk_size):
+                    with patch("app.NDJSON_CHUNK_SIZE", chunk_size):
+                        # limit is ignored when streaming
+                        response = self.get(path, accept="application/x-ndjson", limit=0, **args)
+                        self.assertEqual(response.status_code, 200)
+                        self.assertEqual(self.ndjson(response), page)
+                        response = self.get(path, accept="application/x-ndjson", after=first["next_cursor"], **args)
+                        self.assertEqual(self.ndjson(response), page[1:])
+
+    def test_invalid_limit(self):
+        """Test that a page size that is not an integer from 1 to WORKOUT_PAGE_MAX_SIZE returns 400."""
+        for path, args in [("/workouts", {}), ("/workouts/deleted", {}), ("/workouts/search", {"q": "exercise"})]:
+            for limit in ("0", "-1", "abc", "1.5", "1001"):
+                with self.subTest(path=path, limit=limit):
+                    self.assert_error(self.get(path, limit=limit, **args))
+            self.assertEqual(self.get(path, limit="1000", **args).status_code, 200)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed `after` cursor returns 400 in both formats."""
+        for path in ("/workouts", "/workouts/deleted"):
+            for accept in (None, "application/x-ndjson"):
+                for after in ("abc", "", base64.urlsafe_b64encode(b'{"x": 1}').decode()):
+                    with self.subTest(path=path, accept=accept, after=after):
+                        self.assert_error(self.get(path, accept=accept, after=after))
+
+    def test_invalid_id_filters(self):
+        """Test that a muscle or equipment filter entry other than an ID or "none" returns 400 in both formats."""
+        for accept in (None, "application/x-ndjson"):
+            for name in ("muscle", "equipment"):
+                for value in ("x", "1.5", "-1", "1,,y", str(2 ** 63)):
+                    with self.subTest(accept=accept, name=name, value=value):
+                        self.assert_error(self.get("/workouts", accept=accept, **{name: value}))
+                response = self.get("/workouts", accept=accept, **{name: f"None, 2,{2 ** 63 - 1}"})
+                self.assertEqual(response.status_code, 200)
+
+    def test_invalid_deletion_times(self):
+        """Test that a `since` or `until` that is not a finite number returns 400 in both formats."""
+        for accept in (None, "application/x-ndjson"):
+            for name in ("since", "until"):
+                for value in ("abc", "", "nan", "inf", "-infinity"):
+                    with self.subTest(accept=accept, name=name, value=value):
+                        self.assert_error(self.get("/workouts/deleted", accept=accept, **{name: value}))
+                self.assertEqual(self.get("/workouts/deleted", accept=accept, **{name: "1e3"}).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from fitness_tracker.utils.bloom import BloomFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        """Test that every added item is reported as present."""
+        bloom = BloomFilter.from_items(set(range(0, 2000, 2)))
+        self.assertTrue(all(item in bloom for item in range(0, 2000, 2)))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_false_positive_rate(self):
+        """Test that the false-positive rate stays near the configured target."""
+        bloom = BloomFilter.from_items(set(range(1000)), error_rate=0.01)
+        false_positives = sum(1 for item in range(100000, 110000) if item in bloom)
+        self.assertLess(false_positives / 10000, 0.03)
+
+    def test_empty_filter(self):
+        """Test that an empty filter contains nothing."""
+        self.assertNotIn(85, BloomFilter(100))
+
+
+if __name__ == "__main__":
+    unittest.main()
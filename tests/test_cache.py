@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fitness_tracker.utils.cache import TTLCache, create_cache
+from fitness_tracker.utils.shared_cache import SharedMemoryCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_get_miss_and_hit(self):
+        """Test that misses and hits are counted."""
+        cache = TTLCache(max_entries=2, ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    @patch("fitness_tracker.utils.cache.time.monotonic")
+    def test_ttl_expiry(self, mock_time):
+        """Test that entries expire after their TTL."""
+        mock_time.return_value = 100.0
+        cache = TTLCache(max_entries=2, ttl=10)
+        cache.set("a", 1)
+        mock_time.return_value = 109.0
+        self.assertEqual(cache.get("a"), 1)
+        mock_time.return_value = 110.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    @patch("fitness_tracker.utils.cache.time.monotonic")
+    def test_lookup_stale_window(self, mock_time):
+        """Test that expired entries are served as stale until max_stale passes."""
+        mock_time.return_value = 100.0
+        cache = TTLCache(max_entries=2, ttl=10, max_stale=5)
+        cache.set("a", 1)
+        self.assertEqual(cache.lookup("a"), (1, True))
+        mock_time.return_value = 112.0
+        self.assertEqual(cache.lookup("a"), (1, False))
+        self.assertIsNone(cache.get("a"))
+        mock_time.return_value = 115.0
+        self.assertEqual(cache.lookup("a"), (None, False))
+        self.assertEqual(cache.stats()["stale_hits"], 1)
+
+    def test_clear(self):
+        """Test that clear removes entries and resets counters."""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"size": 0, "max_entries": 2, "hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0})
+
+    def test_create_cache_backends(self):
+        """Test that create_cache builds either backend and rejects unknown ones."""
+        self.assertIsInstance(create_cache("memory", max_entries=2), TTLCache)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = create_cache("shared", path=os.path.join(directory, "test.cache"), max_entries=2)
+            self.assertIsInstance(cache, SharedMemoryCache)
+        with self.assertRaises(ValueError):
+            create_cache("redis")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from fitness_tracker.models.catalog_model import (
+    sync_catalog,
+    get_catalog_exercise,
+    get_catalog_status,
+    clear_catalog,
+    build_catalog_snapshot,
+)
+from fitness_tracker.utils.catalog_snapshot import CatalogSnapshot
+from fitness_tracker.utils.wger_client import PRIORITY_BACKGROUND
+
+BASE_URL = "http://wger.test/api/v2/exercise/"
+
+
+def make_page(exercises, next_url=None):
+    """Build a mocked wger listing response."""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"count": len(exercises), "next": next_url, "results": exercises}
+    return response
+
+
+def make_exercise(exercise_id, last_update, name=None):
+    return {
+        "id": exercise_id,
+        "name": name or f"Exercise {exercise_id}",
+        "description": "<p>Description</p>",
+        "muscles": [4],
+        "equipment": [1],
+        "last_update": last_update,
+    }
+
+
+class TestCatalogModel(unittest.TestCase):
+
+    def setUp(self):
+        """Start every test with an empty catalog."""
+        clear_catalog()
+
+    @patch("fitness_tracker.models.catalog_model.wger_get")
+    def test_full_sync_follows_pages(self, mock_get):
+        """Test that a full sync pages through the listing and stores every exercise."""
+        mock_get.side_effect = [
+            make_page([make_exercise(85, "2024-01-01")], next_url=BASE_URL + "?offset=1"),
+            make_page([make_exercise(86, "2024-02-01")]),
+        ]
+
+        summary = sync_catalog(BASE_URL, 2)
+
+        self.assertEqual(summary["mode"], "full")
+        self.assertEqual(summary["fetched"], 2)
+        self.assertEqual(summary["high_water"], "2024-02-01")
+        self.assertEqual(get_catalog_status(2)["count"], 2)
+        workout = get_catalog_exercise(86, 2)
+        self.assertEqual(workout["description"], "Description")
+        self.assertEqual(workout["equipment"], [1])
+        self.assertEqual(mock_get.call_args.kwargs["priority"], PRIORITY_BACKGROUND)
+
+    @patch("fitness_tracker.models.catalog_model.wger_get")
+    def test_full_sync_removes_missing(self, mock_get):
+        """Test that exercises no longer listed by wger are removed by a full sync."""
+        mock_get.return_value = make_page([make_exercise(85, "2024-01-01"), make_exercise(86, "2024-01-01")])
+        sync_catalog(BASE_URL, 2)
+        mock_get.return_value = make_page([make_exercise(85, "2024-01-01")])
+
+        summary = sync_catalog(BASE_URL, 2)
+
+        self.assertEqual(summary["deleted"], 1)
+        self.assertIsNone(get_catalog_exercise(86, 2))
+
+    @patch("fitness_tracker.models.catalog_model.wger_get")
+    def test_incremental_sync(self, mock_get):
+        """Test that an incremental sync only writes newer exercises and stops early."""
+        mock_get.return_value = make_page([make_exercise(85, "2024-01-01")])
+        sync_catalog(BASE_URL, 2)
+        mock_get.reset_mock()
+        mock_get.side_effect = [
+            make_page(
+                [make_exercise(85, "2024-03-01", name="Renamed"), make_exercise(86, "2024-01-01")],
+                next_url=BASE_URL + "?offset=2",
+            ),
+            make_page([make_exercise(87, "2023-12-01")], next_url=BASE_URL + "?offset=3"),
+        ]
+
+        summary = sync_catalog(BASE_URL, 2, incremental=True)
+
+        self.assertEqual(summary["mode"], "incremental")
+        self.assertEqual(summary["fetched"], 1)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertIn("ordering=-last_update", mock_get.call_args_list[0][0][0])
+        self.assertEqual(get_catalog_exercise(85, 2)["name"], "Renamed")
+        self.assertIsNone(get_catalog_exercise(87, 2))
+
+    @patch("fitness_tracker.models.catalog_model.wger_get")
+    def test_incremental_without_previous_sync(self, mock_get):
+        """Test that an incremental sync falls back to a full sync the first time."""
+        mock_get.return_value = make_page([make_exercise(85, "2024-01-01")])
+        self.assertEqual(sync_catalog(BASE_URL, 2, incremental=True)["mode"], "full")
+
+    def test_get_catalog_exercise_missing(self):
+        """Test that a missing exercise returns None."""
+        self.assertIsNone(get_catalog_exercise(12345, 2))
+
+    @patch("fitness_tracker.models.catalog_model.wger_get")
+    def test_build_catalog_snapshot(self, mock_get):
+        """Test that the mirrored catalog is exported to a readable snapshot."""
+        mock_get.return_value = make_page([make_exercise(85, "2024-01-01"), make_exercise(86, "2024-01-02")])
+        sync_catalog(BASE_URL, 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.snapshot")
+            self.assertEqual(build_catalog_snapshot(path, 2), 2)
+            with CatalogSnapshot(path) as snapshot:
+                self.assertEqual(snapshot.get(86), get_catalog_exercise(86, 2))
+
+if __name__ == "__main__":
+    unittest.main()
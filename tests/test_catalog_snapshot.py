@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from fitness_tracker.utils.catalog_snapshot import CatalogSnapshot, write_snapshot
+
+EXERCISES = [
+    {"id": 91, "name": "Crunches", "description": "Lie on your back.", "muscles": [6], "equipment": [4]},
+    {"id": 85, "name": "Push-Up", "description": "Café-style — unicode ✓", "muscles": [4, 5], "equipment": []},
+    {"id": 200, "name": "Squat", "description": "", "muscles": [10, 8], "equipment": [1]},
+]
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".snapshot")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        """Test that every exercise written can be read back by ID."""
+        self.assertEqual(write_snapshot(self.path, EXERCISES, 2), 3)
+        with CatalogSnapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(snapshot.language, 2)
+            self.assertEqual(snapshot.ids(), [85, 91, 200])
+            for exercise in EXERCISES:
+                self.assertEqual(snapshot.get(exercise["id"]), exercise)
+
+    def test_missing_id(self):
+        """Test that absent IDs are reported as missing."""
+        write_snapshot(self.path, EXERCISES, 2)
+        with CatalogSnapshot(self.path) as snapshot:
+            self.assertIsNone(snapshot.get(86))
+            self.assertNotIn(1, snapshot)
+            self.assertIn(200, snapshot)
+
+    def test_empty_snapshot(self):
+        """Test that an empty catalog produces a valid, empty snapshot."""
+        write_snapshot(self.path, [], 2)
+        with CatalogSnapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertIsNone(snapshot.get(85))
+
+    def test_rejects_other_files(self):
+        """Test that files that are not snapshots are rejected."""
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot at all, just some bytes here")
+        with self.assertRaises(ValueError):
+            CatalogSnapshot(self.path)
+
+    def test_rejects_duplicate_ids(self):
+        """Test that duplicate IDs cannot be written."""
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, EXERCISES + [EXERCISES[0]], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
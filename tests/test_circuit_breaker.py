@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+from fitness_tracker.utils.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold(self):
+        """Test that the breaker opens after consecutive failures."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.stats(), {"state": "open", "failures": 2, "opened": 1, "rejected": 1})
+
+    def test_success_resets_failures(self):
+        """Test that a success clears the consecutive failure count."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+
+    @patch("fitness_tracker.utils.circuit_breaker.time.monotonic")
+    def test_half_open_single_trial(self, mock_time):
+        """Test that only one trial call is allowed after the reset timeout."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        mock_time.return_value = 111.0
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    @patch("fitness_tracker.utils.circuit_breaker.time.monotonic")
+    def test_release_frees_trial(self, mock_time):
+        """Test that releasing an unattempted trial call lets another one through."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        mock_time.return_value = 111.0
+        self.assertTrue(breaker.allow_request())
+        breaker.release()
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, "half_open")
+
+    @patch("fitness_tracker.utils.circuit_breaker.time.monotonic")
+    def test_half_open_failure_reopens(self, mock_time):
+        """Test that a failed trial call re-opens the breaker."""
+        mock_time.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+        for _ in range(3):
+            breaker.record_failure()
+        mock_time.return_value = 111.0
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.state, "open")
+
+
+if __name__ == "__main__":
+    unittest.main()
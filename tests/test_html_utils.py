@@ -0,0 +1,51 @@
+import unittest
+from fitness_tracker.utils.html_utils import clean_description
+
+
+class TestCleanDescription(unittest.TestCase):
+
+    def test_paragraphs(self):
+        """Test that paragraphs become separate lines."""
+        self.assertEqual(clean_description("<p>First.</p>\n<p>Second.</p>"), "First.\nSecond.")
+
+    def test_lists(self):
+        """Test that list items become bulleted lines."""
+        description = "<p>Steps:</p><ul>\n<li>Bend the knees</li>\n<li>Push up</li>\n</ul>"
+        self.assertEqual(clean_description(description), "Steps:\n- Bend the knees\n- Push up")
+
+    def test_line_breaks_and_inline_tags(self):
+        """Test that <br> variants break lines and inline tags are dropped."""
+        description = '<p><strong>Note:</strong> keep<br>your<BR/>back <span style="x">straight</span></p>'
+        self.assertEqual(clean_description(description), "Note: keep\nyour\nback straight")
+
+    def test_entities(self):
+        """Test that named and numeric entities are decoded."""
+        description = "<p>Lift&nbsp;&amp; lower &ndash; don&#39;t swing&#x21;</p>"
+        self.assertEqual(clean_description(description), "Lift & lower – don't swing!")
+
+    def test_comments_and_stray_brackets(self):
+        """Test that comments are removed and a lone '<' is kept as text."""
+        self.assertEqual(clean_description("reps < 10 <!-- note --><p>ok</p>"), "reps < 10\nok")
+
+    def test_text_with_angle_brackets(self):
+        """Test that text between a '<' and a '>' is not mistaken for a tag."""
+        self.assertEqual(clean_description("<p>if a<b and c>d</p>"), "if a<b and c>d")
+
+    def test_quoted_attribute_with_bracket(self):
+        """Test that a '>' inside a quoted attribute value does not end the tag."""
+        description = '<p>Grip<img src="a>b" alt=\'x>y\'> wide</p>'
+        self.assertEqual(clean_description(description), "Grip wide")
+
+    def test_whitespace_collapsed(self):
+        """Test that runs of whitespace and blank lines are collapsed."""
+        self.assertEqual(clean_description("  A \t bodyweight\n\n\n  exercise  "), "A bodyweight\nexercise")
+        self.assertEqual(clean_description("<p>Hold\xa0for  10\u2009s</p>"), "Hold for 10 s")
+
+    def test_empty(self):
+        """Test that missing descriptions become empty strings."""
+        self.assertEqual(clean_description(None), "")
+        self.assertEqual(clean_description("<p><br /></p>"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+
+from fitness_tracker.utils.rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket serves a burst immediately and then paces requests."""
+        bucket = TokenBucket(rate=20, burst=3)
+        start = time.monotonic()
+        for _ in range(4):
+            self.assertTrue(bucket.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        self.assertEqual(bucket.stats()["lanes"]["interactive"]["acquired"], 4)
+
+    def test_try_acquire_empty(self):
+        """Test that try_acquire fails without blocking when no token is left."""
+        bucket = TokenBucket(rate=1, burst=1)
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertEqual(bucket.stats()["lanes"]["interactive"]["rejected"], 1)
+
+    def test_acquire_timeout(self):
+        """Test that acquire gives up once its timeout runs out."""
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.acquire()
+        start = time.monotonic()
+        self.assertFalse(bucket.acquire(timeout=0.05))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_disabled(self):
+        """Test that a rate of zero never blocks."""
+        bucket = TokenBucket(rate=0, burst=1)
+        for _ in range(100):
+            self.assertTrue(bucket.try_acquire())
+
+    def test_interactive_served_before_background(self):
+        """Test that waiting interactive callers get tokens before waiting background callers."""
+        bucket = TokenBucket(rate=20, burst=1)
+        bucket.acquire()
+        order = []
+
+        def take(priority):
+            bucket.acquire(priority)
+            order.append(priority)
+
+        background = [threading.Thread(target=take, args=(1,)) for _ in range(3)]
+        for thread in background:
+            thread.start()
+        time.sleep(0.01)
+        interactive = [threading.Thread(target=take, args=(0,)) for _ in range(3)]
+        for thread in interactive:
+            thread.start()
+        for thread in background + interactive:
+            thread.join(timeout=2)
+
+        self.assertEqual(order[-3:], [1, 1, 1])
+        stats = bucket.stats()["lanes"]
+        self.assertGreater(stats["background"]["wait_max_ms"], stats["interactive"]["wait_max_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+from fitness_tracker.models.reference_model import (
+    sync_reference_tables,
+    get_reference_tables,
+    clear_reference_tables,
+)
+
+BASE_URL = "http://wger.test/api/v2/exercise/"
+
+
+def make_listing(url, headers=None, priority=None):
+    """Answer the mocked muscle and equipment listings."""
+    response = MagicMock(status_code=200)
+    if "/muscle/" in url:
+        results = [
+            {"id": 1, "name": "Biceps brachii", "name_en": "Biceps"},
+            {"id": 3, "name": "Serratus anterior", "name_en": ""},
+        ]
+    else:
+        results = [{"id": 3, "name": "Dumbbell"}]
+    response.json.return_value = {"count": len(results), "next": None, "results": results}
+    return response
+
+
+class TestReferenceModel(unittest.TestCase):
+
+    def setUp(self):
+        """Start every test without reference data."""
+        clear_reference_tables()
+
+    def tearDown(self):
+        clear_reference_tables()
+
+    @patch("fitness_tracker.models.reference_model.wger_get")
+    def test_sync_reference_tables(self, mock_get):
+        """Test that both listings are fetched next to the exercise endpoint and stored."""
+        mock_get.side_effect = make_listing
+
+        self.assertEqual(sync_reference_tables(BASE_URL), {"muscles": 2, "equipment": 1})
+        urls = [call.args[0] for call in mock_get.call_args_list]
+        self.assertEqual(urls, [
+            "http://wger.test/api/v2/muscle/?limit=100",
+            "http://wger.test/api/v2/equipment/?limit=100",
+        ])
+
+        tables = get_reference_tables(BASE_URL, fetch=False)
+        self.assertEqual(tables["muscles"][1], {"id": 1, "name": "Biceps"})
+        self.assertEqual(tables["muscles"][3]["name"], "Serratus anterior")
+        self.assertEqual(tables["equipment"][3]["name"], "Dumbbell")
+
+    @patch("fitness_tracker.models.reference_model.wger_get")
+    def test_get_reference_tables_loaded_once(self, mock_get):
+        """Test that the tables are downloaded on first use and then served from memory."""
+        mock_get.side_effect = make_listing
+
+        first = get_reference_tables(BASE_URL)
+        second = get_reference_tables(BASE_URL)
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("fitness_tracker.models.reference_model.wger_get")
+    def test_get_reference_tables_offline(self, mock_get):
+        """Test that no download is attempted when fetching is not allowed."""
+        tables = get_reference_tables(BASE_URL, fetch=False)
+
+        self.assertEqual(tables, {"muscles": {}, "equipment": {}})
+        mock_get.assert_not_called()
+
+    @patch("fitness_tracker.models.reference_model.wger_get")
+    def test_get_reference_tables_failure_retried(self, mock_get):
+        """Test that a failed download returns empty tables and is retried later."""
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        self.assertEqual(get_reference_tables(BASE_URL)["muscles"], {})
+
+        mock_get.side_effect = make_listing
+        self.assertEqual(get_reference_tables(BASE_URL)["equipment"][3]["name"], "Dumbbell")
+
+
+if __name__ == "__main__":
+    unittest.main()
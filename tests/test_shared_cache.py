@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fitness_tracker.utils.shared_cache import SharedMemoryCache
+
+
+def store_in_child(path):
+    """Runs in a forked worker: store an entry the parent should see."""
+    cache = SharedMemoryCache(path, max_entries=8, ttl=60)
+    cache.set([85, 2], {"id": 85, "name": "Push-Up"})
+
+
+class TestSharedMemoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.cache")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_miss_and_hit(self):
+        """Test that misses and hits are counted and values round-trip."""
+        cache = SharedMemoryCache(self.path, max_entries=8, ttl=60)
+        self.assertIsNone(cache.get((85, 2)))
+        cache.set((85, 2), {"id": 85, "muscles": [4]})
+        self.assertEqual(cache.get((85, 2)), {"id": 85, "muscles": [4]})
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+    def test_lru_eviction_within_bucket(self):
+        """Test that the least recently used entry of a full bucket is evicted."""
+        cache = SharedMemoryCache(self.path, max_entries=2, ttl=60, ways=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    @patch("fitness_tracker.utils.shared_cache.time.time")
+    def test_lookup_stale_window(self, mock_time):
+        """Test that expired entries are served as stale until max_stale passes."""
+        mock_time.return_value = 100.0
+        cache = SharedMemoryCache(self.path, max_entries=8, ttl=10, max_stale=5)
+        cache.set("a", 1)
+        self.assertEqual(cache.lookup("a"), (1, True))
+        mock_time.return_value = 112.0
+        self.assertEqual(cache.lookup("a"), (1, False))
+        self.assertIsNone(cache.get("a"))
+        mock_time.return_value = 115.0
+        self.assertEqual(cache.lookup("a"), (None, False))
+        self.assertEqual(len(cache), 0)
+
+    def test_oversized_value_not_cached(self):
+        """Test that values larger than a slot are skipped."""
+        cache = SharedMemoryCache(self.path, max_entries=8, ttl=60, slot_size=128)
+        cache.set("a", "x" * 200)
+        self.assertIsNone(cache.get("a"))
+
+    def test_delete_and_clear(self):
+        """Test that delete removes one entry and clear resets everything."""
+        cache = SharedMemoryCache(self.path, max_entries=8, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+        cache.clear()
+        self.assertEqual(cache.stats(), {"size": 0, "max_entries": 8, "hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0})
+
+    def test_shared_between_processes(self):
+        """Test that an entry stored by a forked worker is a hit in the parent."""
+        cache = SharedMemoryCache(self.path, max_entries=8, ttl=60)
+        child = multiprocessing.get_context("fork").Process(target=store_in_child, args=(self.path,))
+        child.start()
+        child.join(10)
+        self.assertEqual(child.exitcode, 0)
+        self.assertEqual(cache.get([85, 2]), {"id": 85, "name": "Push-Up"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import time
+import unittest
+from fitness_tracker.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_result(self):
+        """Test that concurrent callers for one key share a single execution."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"id": 85}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do(85, fetch)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do(85, fetch))) for _ in range(4)]
+        for follower in followers:
+            follower.start()
+        deadline = time.monotonic() + 5
+        while flight.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"id": 85}] * 5)
+        self.assertEqual(flight.stats(), {"in_flight": 0, "executions": 1, "coalesced": 4})
+
+    def test_sequential_calls_run_again(self):
+        """Test that a finished call is not reused by later callers."""
+        flight = SingleFlight()
+        self.assertEqual(flight.do("a", lambda: 1), 1)
+        self.assertEqual(flight.do("a", lambda: 2), 2)
+        self.assertEqual(flight.stats()["executions"], 2)
+
+    def test_exception_propagates(self):
+        """Test that an exception is raised to the caller and the key is released."""
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("a", fail)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
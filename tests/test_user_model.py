@@ -1,6 +1,6 @@
 import unittest
 import sqlite3
-from fitness_tracker.models.user_model import create_user, authenticate_user, change_password
+from fitness_tracker.models.user_model import create_user, authenticate_user, change_password, get_authenticated_user_id
 from fitness_tracker.utils.sql_utils import initialize_database, get_db_connection
 
 
@@ -45,6 +45,15 @@ class TestUserModel(unittest.TestCase):
         """Test authenticating a nonexistent user."""
         self.assertFalse(authenticate_user("nonexistentuser", "password123"))
 
+    def test_get_authenticated_user_id(self):
+        """Test that authenticating returns the user's ID, or None on bad credentials."""
+        create_user("testuser", "password123")
+        with get_db_connection() as conn:
+            (user_id,) = conn.execute("SELECT id FROM users WHERE username = ?", ("testuser",)).fetchone()
+        self.assertEqual(get_authenticated_user_id("testuser", "password123"), user_id)
+        self.assertIsNone(get_authenticated_user_id("testuser", "wrongpassword"))
+        self.assertIsNone(get_authenticated_user_id("nonexistent", "password123"))
+
     def test_change_password_success(self):
         """Test changing a user's password successfully."""
         create_user("testuser", "password123")
@@ -0,0 +1,145 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+from fitness_tracker.utils import wger_client
+
+
+class TestWgerClient(unittest.TestCase):
+
+    def setUp(self):
+        """Start every test without a shared session and with a closed breaker."""
+        wger_client.close_session()
+        wger_client.reset_client_stats()
+
+    def tearDown(self):
+        wger_client.close_session()
+
+    def test_get_session_reused(self):
+        """Test that the shared session is created once and reused."""
+        self.assertIs(wger_client.get_session(), wger_client.get_session())
+
+    def test_session_pool_size(self):
+        """Test that the mounted adapter uses the configured pool size."""
+        session = wger_client.create_session(pool_size=4)
+        adapter = session.get_adapter("https://wger.de/")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertTrue(adapter._pool_block)
+
+    def test_close_session_resets(self):
+        """Test that closing the session forces a new one to be created."""
+        first = wger_client.get_session()
+        wger_client.close_session()
+        self.assertIsNot(first, wger_client.get_session())
+
+    @patch("fitness_tracker.utils.wger_client.WGER_DEADLINE", 60)
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_wger_get_default_timeout(self, mock_get):
+        """Test that requests are sent with the configured connect/read timeouts."""
+        mock_get.return_value.status_code = 200
+        wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+        mock_get.assert_called_once_with(
+            "https://wger.de/api/v2/exercise/85/",
+            headers=None,
+            timeout=(wger_client.WGER_CONNECT_TIMEOUT, wger_client.WGER_READ_TIMEOUT),
+        )
+
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_wger_get_deadline_exceeded(self, mock_get):
+        """Test that a slow upstream is abandoned at the call's deadline."""
+        mock_get.side_effect = lambda *args, **kwargs: time.sleep(0.5)
+
+        start = time.monotonic()
+        with self.assertRaises(wger_client.WgerDeadlineExceeded):
+            wger_client.wger_get("https://wger.de/api/v2/exercise/85/", deadline=0.05)
+        self.assertLess(time.monotonic() - start, 0.3)
+        _, kwargs = mock_get.call_args
+        # The deadline also covers the (here negligible) wait for a rate limit token
+        self.assertAlmostEqual(kwargs["timeout"][0], 0.05, places=2)
+        self.assertEqual(kwargs["timeout"][0], kwargs["timeout"][1])
+
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_circuit_breaker_fails_fast(self, mock_get):
+        """Test that repeated failures open the breaker and later calls skip wger."""
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        for _ in range(wger_client.WGER_BREAKER_FAILURES):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+
+        with self.assertRaises(wger_client.WgerUnavailableError):
+            wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+        self.assertEqual(mock_get.call_count, wger_client.WGER_BREAKER_FAILURES)
+        self.assertEqual(wger_client.get_client_stats()["breaker"]["state"], "open")
+
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_server_errors_count_as_failures(self, mock_get):
+        """Test that 5xx responses count towards opening the breaker but 404s do not."""
+        mock_get.return_value.status_code = 503
+        wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+        self.assertEqual(wger_client.breaker.failures, 1)
+        mock_get.return_value.status_code = 404
+        wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+        self.assertEqual(wger_client.breaker.failures, 0)
+
+    @patch("fitness_tracker.utils.wger_client.WGER_HEDGE_DELAY", 0.05)
+    @patch("fitness_tracker.utils.wger_client.WGER_HEDGE_ENABLED", True)
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_hedged_request_wins(self, mock_get):
+        """Test that a slow first attempt is hedged and the faster response is returned."""
+        fast = MagicMock(status_code=200)
+        calls = []
+
+        def get(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return MagicMock(status_code=200)
+            return fast
+
+        mock_get.side_effect = get
+        start = time.monotonic()
+        response = wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+
+        self.assertIs(response, fast)
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(wger_client.get_client_stats()["hedged_requests"], 1)
+
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_rate_limit_counts_against_deadline(self, mock_get):
+        """Test that a call waiting too long for a rate limit token fails without reaching wger."""
+        with patch.object(wger_client.limiter, "rate", 1), patch.object(wger_client.limiter, "burst", 1):
+            wger_client.limiter.reset()
+            mock_get.return_value.status_code = 200
+            wger_client.wger_get("https://wger.de/api/v2/exercise/85/")
+            with self.assertRaises(wger_client.WgerDeadlineExceeded):
+                wger_client.wger_get("https://wger.de/api/v2/exercise/85/", deadline=0.05)
+            lanes = wger_client.get_client_stats()["rate_limiter"]["lanes"]
+        wger_client.limiter.reset()
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(lanes["interactive"]["acquired"], 1)
+        self.assertEqual(lanes["interactive"]["rejected"], 1)
+
+    @patch("fitness_tracker.utils.wger_client.requests.Session.get")
+    def test_open_breaker_skips_rate_limiter(self, mock_get):
+        """Test that an open breaker fails fast instead of waiting for a rate limit token."""
+        for _ in range(wger_client.WGER_BREAKER_FAILURES):
+            wger_client.breaker.record_failure()
+        with patch.object(wger_client.limiter, "rate", 1), patch.object(wger_client.limiter, "burst", 1):
+            wger_client.limiter.reset()
+            start = time.monotonic()
+            for _ in range(3):
+                with self.assertRaises(wger_client.WgerUnavailableError):
+                    wger_client.wger_get("https://wger.de/api/v2/exercise/85/", deadline=2)
+            elapsed = time.monotonic() - start
+            lanes = wger_client.get_client_stats()["rate_limiter"]["lanes"]
+        wger_client.limiter.reset()
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(lanes["interactive"]["acquired"], 0)
+        mock_get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
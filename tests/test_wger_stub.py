@@ -0,0 +1,58 @@
+import unittest
+
+import requests
+from benchmarks.wger_stub import WgerStubServer, parse_latency, parse_ranges
+
+
+class TestWgerStub(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = WgerStubServer(catalog_size=30, missing="10-12").start()
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def test_serves_fixture_exercise(self):
+        """Test that fixture exercises are served by ID with an ETag."""
+        response = requests.get(self.stub.exercise_url + "85/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], 85)
+        self.assertIn("ETag", response.headers)
+
+    def test_conditional_request(self):
+        """Test that a matching If-None-Match returns 304."""
+        etag = requests.get(self.stub.exercise_url + "1/").headers["ETag"]
+        response = requests.get(self.stub.exercise_url + "1/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_ranges(self):
+        """Test that configured ranges and IDs beyond the catalog return 404."""
+        self.assertEqual(requests.get(self.stub.exercise_url + "11/").status_code, 404)
+        self.assertEqual(requests.get(self.stub.exercise_url + "31/").status_code, 404)
+        self.assertEqual(self.stub.stats()[404], 2)
+
+    def test_listing_pages(self):
+        """Test that the listing follows `next` links across every exercise."""
+        url, ids = self.stub.exercise_url + "?limit=8", []
+        while url:
+            page = requests.get(url).json()
+            ids.extend(exercise["id"] for exercise in page["results"])
+            url = page["next"]
+        self.assertEqual(len(ids), 27 + 24)  # synthesized IDs plus the fixture corpus
+        self.assertNotIn(10, ids)
+
+    def test_error_rate(self):
+        """Test that an error rate of 1 fails every request with 503."""
+        self.stub.error_rate = 1.0
+        self.assertEqual(requests.get(self.stub.exercise_url + "1/").status_code, 503)
+
+    def test_parse_helpers(self):
+        """Test latency and range spec parsing."""
+        self.assertEqual(parse_latency("fixed:20")(None), 0.02)
+        self.assertEqual(parse_ranges("1-3,7"), [(1, 3), (7, 7)])
+        with self.assertRaises(ValueError):
+            parse_latency("pareto:1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from fitness_tracker.models.workout import Workout, pack_ids, unpack_ids
+
+WORKOUT = {"id": 85, "name": "Push-Up", "description": "Café-style — unicode ✓", "muscles": [4, 5], "equipment": []}
+
+
+class TestWorkout(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Test that a workout dict survives conversion to a record and back."""
+        self.assertEqual(Workout.from_dict(WORKOUT).to_dict(), WORKOUT)
+
+    def test_ids_come_back_sorted_and_unique(self):
+        """Test that the ID bitmasks list IDs in ascending order without duplicates."""
+        self.assertEqual(pack_ids([10, 8, 10]), (1 << 8) | (1 << 10))
+        self.assertEqual(unpack_ids(pack_ids([10, 8, 10, 0, 300])), [0, 8, 10, 300])
+        self.assertEqual(unpack_ids(0), [])
+
+    def test_negative_id(self):
+        """Test that negative IDs are rejected."""
+        with self.assertRaises(ValueError):
+            pack_ids([-1])
+
+    def test_replace(self):
+        """Test that replace returns a new record and leaves the original unchanged."""
+        workout = Workout.from_dict(WORKOUT)
+        renamed = workout.replace("Wide Push-Up", "Hands wide.")
+        self.assertEqual(renamed.to_dict(), dict(WORKOUT, name="Wide Push-Up", description="Hands wide."))
+        self.assertEqual(workout, Workout.from_dict(WORKOUT))
+        self.assertNotEqual(workout, renamed)
+
+    def test_no_instance_dict(self):
+        """Test that records carry no per-instance dict."""
+        with self.assertRaises(AttributeError):
+            Workout.from_dict(WORKOUT).extra = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,25 +1,58 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
 import pytest
-from unittest.mock import patch
+import requests
+from unittest.mock import MagicMock, patch
+from fitness_tracker.models.catalog_model import clear_catalog
+from fitness_tracker.models.response_cache_model import (
+    clear_response_cache,
+    get_cached_response,
+    save_cached_response,
+)
+from fitness_tracker.utils.cache import TTLCache
+from fitness_tracker.utils.catalog_snapshot import write_snapshot
+from fitness_tracker.utils.wger_client import PRIORITY_BACKGROUND
 from fitness_tracker.models.workout_model import (
     check_workout_in_api,
     add_workout_to_memory,
+    add_workouts_to_memory,
+    decode_workout_cursor,
+    encode_workout_cursor,
     get_workouts,
+    iter_workouts,
+    search_workouts,
     update_workout,
     delete_workout,
     get_deleted_workouts,
-    stored_workouts,  
-    deleted_workouts,  
+    iter_deleted_workouts,
+    restore_workout,
+    workout_store,
+    exercise_cache,
+    exercise_flight,
+    missing_exercise_cache,
+    reset_exercise_bloom_filters,
+    reset_catalog_snapshot,
 )
 
+USER_ID = 1
+
+
 class TestWorkoutModel(unittest.TestCase):
 
     def setUp(self):
         """Clear stored and deleted workouts before each test."""
-        stored_workouts.clear()
-        deleted_workouts.clear()
+        workout_store.clear()
+        exercise_cache.clear()
+        exercise_flight.reset_stats()
+        missing_exercise_cache.clear()
+        reset_exercise_bloom_filters()
+        clear_response_cache()
+        clear_catalog()
 
-    @patch("fitness_tracker.models.workout_model.requests.get")
+    @patch("fitness_tracker.models.workout_model.wger_get")
     def test_check_workout_in_api_success(self, mock_get):
         """Test if a valid workout is fetched and cleaned successfully."""
         mock_response = {
@@ -30,6 +63,7 @@ class TestWorkoutModel(unittest.TestCase):
             "equipment": [],
         }
         mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
         mock_get.return_value.json.return_value = mock_response
 
         workout = check_workout_in_api(1)
@@ -40,7 +74,7 @@ class TestWorkoutModel(unittest.TestCase):
         self.assertEqual(workout["muscles"], [4])
         self.assertEqual(workout["equipment"], [])
 
-    @patch("fitness_tracker.models.workout_model.requests.get")
+    @patch("fitness_tracker.models.workout_model.wger_get")
     def test_check_workout_in_api_not_found(self, mock_get):
         """Test if an invalid workout ID returns None."""
         mock_get.return_value.status_code = 404
@@ -48,6 +82,187 @@ class TestWorkoutModel(unittest.TestCase):
         workout = check_workout_in_api(999)
         self.assertIsNone(workout)
 
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_cache_hit(self, mock_get):
+        """Test that a repeated lookup is served from the cache without a request."""
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
+        mock_get.return_value.json.return_value = {
+            "id": 85,
+            "name": "Push-Up",
+            "description": "<p>A bodyweight exercise</p>",
+            "muscles": [4],
+            "equipment": [],
+        }
+
+        first = check_workout_in_api(85)
+        first["name"] = "Mutated"
+        second = check_workout_in_api(85)
+
+        mock_get.assert_called_once()
+        self.assertEqual(second["name"], "Push-Up")
+        self.assertEqual(exercise_cache.stats()["hits"], 1)
+
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_not_found_negative_cached(self, mock_get):
+        """Test that a missing workout is remembered and not requested again."""
+        mock_get.return_value.status_code = 404
+
+        self.assertIsNone(check_workout_in_api(999))
+        self.assertIsNone(check_workout_in_api(999))
+        mock_get.assert_called_once()
+        self.assertEqual(len(exercise_cache), 0)
+
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_server_error_not_cached(self, mock_get):
+        """Test that upstream errors are not treated as missing workouts."""
+        mock_get.return_value.status_code = 500
+
+        check_workout_in_api(999)
+        check_workout_in_api(999)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("fitness_tracker.models.workout_model.WGER_BLOOM_FILTER_ENABLED", True)
+    @patch("fitness_tracker.models.workout_model.get_catalog_ids")
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_bloom_filter_rejects(self, mock_get, mock_ids):
+        """Test that IDs absent from the catalog's Bloom filter are rejected without a request."""
+        mock_ids.return_value = set(range(1, 1000))
+
+        self.assertIsNone(check_workout_in_api(50000))
+        mock_get.assert_not_called()
+
+    @patch("fitness_tracker.models.workout_model.WGER_BLOOM_FILTER_ENABLED", True)
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_bloom_filter_empty_catalog(self, mock_get):
+        """Test that an empty catalog does not reject any ID."""
+        mock_get.return_value.status_code = 404
+
+        check_workout_in_api(50000)
+        mock_get.assert_called_once()
+
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_disk_cache_stores_validators(self, mock_get):
+        """Test that a fetched workout is persisted with its ETag and Last-Modified."""
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        mock_get.return_value.json.return_value = {
+            "id": 85,
+            "name": "Push-Up",
+            "description": "<p>A bodyweight exercise</p>",
+            "muscles": [4],
+            "equipment": [],
+        }
+
+        check_workout_in_api(85)
+        cached = get_cached_response(85, 2)
+        self.assertEqual(cached["workout"]["name"], "Push-Up")
+        self.assertEqual(cached["etag"], '"abc"')
+        self.assertEqual(cached["last_modified"], "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_disk_cache_fresh(self, mock_get):
+        """Test that a fresh disk cache entry is served without a request."""
+        workout = {"id": 85, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        save_cached_response(85, 2, workout, etag='"abc"')
+
+        self.assertEqual(check_workout_in_api(85), workout)
+        mock_get.assert_not_called()
+
+    @patch("fitness_tracker.models.workout_model.WGER_DISK_CACHE_TTL", 0)
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_disk_cache_revalidate(self, mock_get):
+        """Test that a stale disk cache entry is revalidated and a 304 reuses it."""
+        workout = {"id": 85, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        save_cached_response(85, 2, workout, etag='"abc"')
+        before = time.time()
+        mock_get.return_value.status_code = 304
+
+        self.assertEqual(check_workout_in_api(85), workout)
+        _, kwargs = mock_get.call_args
+        self.assertEqual(kwargs["headers"], {"If-None-Match": '"abc"'})
+        self.assertGreaterEqual(get_cached_response(85, 2)["fetched_at"], before)
+
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_coalesces_concurrent_misses(self, mock_get):
+        """Test that concurrent lookups of one exercise send a single request."""
+        def slow_get(url, headers=None, priority=None):
+            time.sleep(0.1)
+            response = MagicMock(status_code=200, headers={})
+            response.json.return_value = {
+                "id": 85, "name": "Push-Up", "description": "", "muscles": [4], "equipment": [],
+            }
+            return response
+
+        mock_get.side_effect = slow_get
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(check_workout_in_api(85))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        mock_get.assert_called_once()
+        self.assertEqual([workout["name"] for workout in results], ["Push-Up"] * 5)
+        self.assertEqual(exercise_flight.stats()["coalesced"], 4)
+
+    @patch("fitness_tracker.models.workout_model.exercise_cache", TTLCache(max_entries=10, ttl=60, max_stale=600))
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_stale_while_revalidate(self, mock_get):
+        """Test that an expired entry is served immediately and refreshed in the background."""
+        from fitness_tracker.models.workout_model import exercise_cache as swr_cache
+        stale = {"id": 85, "name": "Old Push-Up", "description": "", "muscles": [4], "equipment": []}
+        swr_cache.set((85, 2), stale, ttl=-1)
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
+        mock_get.return_value.json.return_value = {
+            "id": 85, "name": "Push-Up", "description": "", "muscles": [4], "equipment": [],
+        }
+
+        self.assertEqual(check_workout_in_api(85)["name"], "Old Push-Up")
+
+        deadline = time.monotonic() + 5
+        while swr_cache.get((85, 2)) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(swr_cache.get((85, 2))["name"], "Push-Up")
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args.kwargs["priority"], PRIORITY_BACKGROUND)
+
+    @patch("fitness_tracker.models.workout_model.get_catalog_exercise")
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_catalog_hit(self, mock_get, mock_catalog):
+        """Test that a mirrored exercise is resolved without a request."""
+        workout = {"id": 85, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        mock_catalog.return_value = workout
+
+        self.assertEqual(check_workout_in_api(85), workout)
+        mock_get.assert_not_called()
+
+    @patch("fitness_tracker.models.workout_model.get_catalog_exercise")
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_snapshot_hit(self, mock_get, mock_catalog):
+        """Test that an exercise in the catalog snapshot is resolved without SQLite or a request."""
+        workout = {"id": 85, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.snapshot")
+            write_snapshot(path, [workout], 2)
+            with patch("fitness_tracker.models.workout_model.CATALOG_SNAPSHOT_PATH", path):
+                reset_catalog_snapshot()
+                try:
+                    self.assertEqual(check_workout_in_api(85), workout)
+                finally:
+                    reset_catalog_snapshot()
+
+        mock_catalog.assert_not_called()
+        mock_get.assert_not_called()
+
+    @patch("fitness_tracker.models.workout_model.WGER_OFFLINE", True)
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_check_workout_in_api_offline(self, mock_get):
+        """Test that offline mode never calls wger for unknown exercises."""
+        self.assertIsNone(check_workout_in_api(85))
+        mock_get.assert_not_called()
+
     @patch("fitness_tracker.models.workout_model.check_workout_in_api")
     def test_add_workout_to_memory(self, mock_get):
         """Test adding a workout to memory."""
@@ -60,10 +275,10 @@ class TestWorkoutModel(unittest.TestCase):
         }
         mock_get.return_value = mock_workout
 
-        add_workout_to_memory(1)
+        add_workout_to_memory(USER_ID, 1)
 
-        self.assertIn(1, stored_workouts)
-        self.assertEqual(stored_workouts[1], mock_workout)
+        self.assertTrue(workout_store.has(USER_ID, 1))
+        self.assertEqual(workout_store.get(USER_ID, 1), mock_workout)
 
     @patch("fitness_tracker.models.workout_model.check_workout_in_api")
     def test_add_workout_to_memory_dupe(self, mock_get):
@@ -77,13 +292,50 @@ class TestWorkoutModel(unittest.TestCase):
         }
         mock_get.return_value = mock_workout
 
-        add_workout_to_memory(1)
+        add_workout_to_memory(USER_ID, 1)
 
-        self.assertIn(1, stored_workouts)
-        self.assertEqual(stored_workouts[1], mock_workout)
+        self.assertTrue(workout_store.has(USER_ID, 1))
+        self.assertEqual(workout_store.get(USER_ID, 1), mock_workout)
 
         with self.assertRaises(ValueError):
-            add_workout_to_memory(1)
+            add_workout_to_memory(USER_ID, 1)
+
+    @patch("fitness_tracker.models.workout_model.check_workout_in_api")
+    def test_add_workouts_to_memory(self, mock_get):
+        """Test adding several workouts at once with a result per ID."""
+        existing = {"id": 1, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        workout_store.add(USER_ID, existing)
+        catalog = {
+            85: {"id": 85, "name": "Squat", "description": "", "muscles": [8], "equipment": []},
+            86: {"id": 86, "name": "Lunge", "description": "", "muscles": [8], "equipment": []},
+        }
+        mock_get.side_effect = lambda workout_id: catalog.get(workout_id)
+
+        result = add_workouts_to_memory(USER_ID, [85, 1, 999, 86, 85])
+
+        self.assertEqual(result["added"], 2)
+        self.assertEqual([r["workout_id"] for r in result["results"]], [85, 1, 999, 86])
+        self.assertEqual([r["status"] for r in result["results"]], ["success", "error", "error", "success"])
+        self.assertEqual(result["results"][2]["message"], "Workout not found in API.")
+        self.assertEqual(workout_store.get(USER_ID, 86), catalog[86])
+        self.assertEqual(workout_store.get(USER_ID, 1), existing)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("fitness_tracker.models.workout_model.check_workout_in_api")
+    def test_add_workouts_to_memory_lookup_error(self, mock_get):
+        """Test that a failed lookup is reported without aborting the batch."""
+        workout = {"id": 85, "name": "Squat", "description": "", "muscles": [8], "equipment": []}
+
+        def lookup(workout_id):
+            if workout_id == 85:
+                return workout
+            raise requests.exceptions.ConnectionError("wger unreachable")
+
+        mock_get.side_effect = lookup
+        result = add_workouts_to_memory(USER_ID, [85, 86])
+
+        self.assertEqual(result["added"], 1)
+        self.assertEqual(result["results"][1]["message"], "Workout lookup failed.")
 
     def test_get_workouts(self):
         """Test retrieving all stored workouts."""
@@ -94,14 +346,122 @@ class TestWorkoutModel(unittest.TestCase):
             "muscles": [4],
             "equipment": [],
         }
-        stored_workouts[1] = workout
-        workouts = get_workouts()
+        workout_store.add(USER_ID, workout)
+        workouts = get_workouts(USER_ID)
         self.assertEqual(len(workouts["stored_workouts"]), 1)
         self.assertEqual(workouts["stored_workouts"][0], workout)
 
+    def test_get_workouts_pages(self):
+        """Test walking the stored workouts page by page with cursors."""
+        for workout_id in range(1, 6):
+            workout_store.add(USER_ID, {"id": workout_id, "name": "", "description": "", "muscles": [], "equipment": []})
+
+        pages = []
+        cursor = None
+        while True:
+            page = get_workouts(USER_ID, limit=2, after=cursor)
+            pages.append([workout["id"] for workout in page["stored_workouts"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, [[1, 2], [3, 4], [5]])
+        self.assertIsNone(get_workouts(USER_ID)["next_cursor"])
+
+    def test_get_workouts_filtered_pages(self):
+        """Test that muscle and equipment filters combine with cursor pagination."""
+        for workout_id in range(1, 8):
+            workout_store.add(USER_ID, {
+                "id": workout_id,
+                "name": "",
+                "description": "",
+                "muscles": [4] if workout_id % 2 else [10],
+                "equipment": [] if workout_id < 6 else [1],
+            })
+
+        first = get_workouts(USER_ID, limit=2, muscles=[4], equipment=[None])
+        self.assertEqual([workout["id"] for workout in first["stored_workouts"]], [1, 3])
+        second = get_workouts(USER_ID, limit=2, after=first["next_cursor"], muscles=[4], equipment=[None])
+        self.assertEqual([workout["id"] for workout in second["stored_workouts"]], [5])
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual([workout["id"] for workout in get_workouts(USER_ID, equipment=[1])["stored_workouts"]], [6, 7])
+
+    def test_search_workouts(self):
+        """Test that search returns the user's ranked matches and rejects queries without words."""
+        workout_store.add(USER_ID, {"id": 1, "name": "Push-Up", "description": "Chest.", "muscles": [], "equipment": []})
+        workout_store.add(USER_ID + 1, {"id": 2, "name": "Push-Up", "description": "", "muscles": [], "equipment": []})
+
+        [result] = search_workouts(USER_ID, "push-up!")["results"]
+        self.assertEqual(result["id"], 1)
+        self.assertEqual(result["snippet"], "[Push]-[Up]")
+        with self.assertRaises(ValueError):
+            search_workouts(USER_ID, " -- ")
+
+    @patch("fitness_tracker.models.workout_model.WORKOUT_STREAM_BATCH_SIZE", 2)
+    def test_iter_workouts(self):
+        """Test that streaming reads every workout across batches and checks arguments up front."""
+        for workout_id in range(1, 7):
+            workout_store.add(USER_ID, {
+                "id": workout_id,
+                "name": "",
+                "description": "",
+                "muscles": [4] if workout_id % 2 else [],
+                "equipment": [],
+            })
+        cursor = get_workouts(USER_ID, limit=2)["next_cursor"]
+
+        self.assertEqual([workout["id"] for workout in iter_workouts(USER_ID)], [1, 2, 3, 4, 5, 6])
+        self.assertEqual([workout["id"] for workout in iter_workouts(USER_ID, after=cursor)], [3, 4, 5, 6])
+        self.assertEqual([workout["id"] for workout in iter_workouts(USER_ID, muscles=[4])], [1, 3, 5])
+        with self.assertRaises(ValueError):
+            iter_workouts(USER_ID, after="garbage")
+        with self.assertRaises(ValueError):
+            iter_workouts(USER_ID, expand=["name"])
+
+    def test_out_of_range_workout_ids(self):
+        """Test that IDs the stores cannot hold are reported as not found instead of reaching them."""
+        too_large = 2 ** 64
+        self.assertEqual(add_workout_to_memory(USER_ID, too_large)["status"], "error")
+        self.assertEqual(add_workouts_to_memory(USER_ID, [too_large, -1])["added"], 0)
+        self.assertEqual(update_workout(USER_ID, too_large, "Name", "Description")["status"], "error")
+        self.assertEqual(delete_workout(USER_ID, too_large)["status"], "error")
+        self.assertEqual(restore_workout(USER_ID, too_large)["status"], "error")
+
+    def test_workout_cursor(self):
+        """Test that cursors round-trip and malformed ones are rejected."""
+        self.assertEqual(decode_workout_cursor(encode_workout_cursor(85)), 85)
+        for cursor in ("", "not a cursor", encode_workout_cursor("85"), "e30", encode_workout_cursor(2 ** 64)):
+            with self.assertRaises(ValueError):
+                decode_workout_cursor(cursor)
+        with self.assertRaises(ValueError):
+            get_workouts(USER_ID, limit=2, after="garbage")
+
+    @patch("fitness_tracker.models.workout_model.get_reference_tables")
+    def test_get_workouts_expand(self, mock_tables):
+        """Test that expanded fields inline names from the lookup tables."""
+        mock_tables.return_value = {
+            "muscles": {4: {"id": 4, "name": "Chest"}},
+            "equipment": {1: {"id": 1, "name": "Barbell"}},
+        }
+        workout = {"id": 1, "name": "Push-Up", "description": "", "muscles": [4, 99], "equipment": [1]}
+        workout_store.add(USER_ID, workout)
+
+        expanded = get_workouts(USER_ID, ["muscles"])["stored_workouts"][0]
+
+        self.assertEqual(expanded["muscles"], [{"id": 4, "name": "Chest"}, {"id": 99, "name": None}])
+        self.assertEqual(expanded["equipment"], [1])
+        self.assertEqual(workout_store.get(USER_ID, 1)["muscles"], [4, 99])
+
+    @patch("fitness_tracker.models.workout_model.get_reference_tables")
+    def test_get_workouts_expand_invalid(self, mock_tables):
+        """Test that expanding an unknown field raises a ValueError."""
+        with self.assertRaises(ValueError):
+            get_workouts(USER_ID, ["muscles", "bogus"])
+        mock_tables.assert_not_called()
+
     def test_get_workouts_empty(self):
         """Test retrieving all stored workouts on empty dict."""
-        workouts = get_workouts()
+        workouts = get_workouts(USER_ID)
         self.assertEqual(len(workouts["stored_workouts"]), 0)
 
     def test_get_workouts_multi(self):
@@ -120,10 +480,10 @@ class TestWorkoutModel(unittest.TestCase):
             "muscles": [2],
             "equipment": [1]
         }
-        stored_workouts[1] = workout
-        stored_workouts[2] = workout2
+        workout_store.add(USER_ID, workout)
+        workout_store.add(USER_ID, workout2)
         
-        workouts = get_workouts()
+        workouts = get_workouts(USER_ID)
 
         self.assertEqual(len(workouts["stored_workouts"]), 2)
         self.assertEqual(workouts["stored_workouts"][0], workout)
@@ -138,15 +498,15 @@ class TestWorkoutModel(unittest.TestCase):
             "muscles": [4],
             "equipment": [],
         }
-        stored_workouts[1] = workout
-        result = update_workout(1, "Updated Push-Up", "Updated description")
+        workout_store.add(USER_ID, workout)
+        result = update_workout(USER_ID, 1, "Updated Push-Up", "Updated description")
         self.assertEqual(result["status"], "success")
-        self.assertEqual(stored_workouts[1]["name"], "Updated Push-Up")
-        self.assertEqual(stored_workouts[1]["description"], "Updated description")
+        self.assertEqual(workout_store.get(USER_ID, 1)["name"], "Updated Push-Up")
+        self.assertEqual(workout_store.get(USER_ID, 1)["description"], "Updated description")
 
     def test_update_workout_fail(self):
         """Test updating a workout's name and description when workout is not in dict."""
-        result = update_workout(1000, "Updated Push-Up", "Updated description")
+        result = update_workout(USER_ID, 1000, "Updated Push-Up", "Updated description")
         self.assertEqual(result["status"], "error")
 
     def test_delete_workout(self):
@@ -158,18 +518,29 @@ class TestWorkoutModel(unittest.TestCase):
             "muscles": [4],
             "equipment": [],
         }
-        stored_workouts[1] = workout
-        result = delete_workout(1)
+        workout_store.add(USER_ID, workout)
+        result = delete_workout(USER_ID, 1)
         self.assertEqual(result["status"], "success")
-        self.assertNotIn(1, stored_workouts)
-        self.assertIn(workout, deleted_workouts)
+        self.assertFalse(workout_store.has(USER_ID, 1))
+        self.assertEqual([deleted["id"] for _, deleted in workout_store.list_deleted(USER_ID)], [1])
 
     def test_delete_workout_fail(self):
         """Test deleting a workout that is not in the stored workouts."""
-        result = delete_workout(1000)
+        result = delete_workout(USER_ID, 1000)
         self.assertEqual(result["status"], "error")
-        self.assertNotIn(1000, stored_workouts)
-        self.assertNotIn(1000, deleted_workouts)
+        self.assertFalse(workout_store.has(USER_ID, 1000))
+        self.assertEqual(workout_store.list_deleted(USER_ID), [])
+
+    def test_workouts_are_scoped_to_user(self):
+        """Test that a user cannot list, update or delete another user's workouts."""
+        workout = {"id": 1, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        workout_store.add(USER_ID, workout)
+        other_user = USER_ID + 1
+
+        self.assertEqual(get_workouts(other_user)["stored_workouts"], [])
+        self.assertEqual(update_workout(other_user, 1, "Mine", "Now")["status"], "error")
+        self.assertEqual(delete_workout(other_user, 1)["status"], "error")
+        self.assertEqual(workout_store.get(USER_ID, 1), workout)
 
     def test_get_deleted_workouts(self):
         """Test retrieving all deleted workouts."""
@@ -180,10 +551,76 @@ class TestWorkoutModel(unittest.TestCase):
             "muscles": [4],
             "equipment": [],
         }
-        deleted_workouts.append(workout)
-        workouts = get_deleted_workouts()
+        workout_store.add(USER_ID, workout)
+        delete_workout(USER_ID, 1)
+        workouts = get_deleted_workouts(USER_ID)
         self.assertEqual(len(workouts["deleted_workouts"]), 1)
-        self.assertEqual(workouts["deleted_workouts"][0], workout)
+        deleted = dict(workouts["deleted_workouts"][0])
+        self.assertIsInstance(deleted.pop("deleted_at"), float)
+        self.assertEqual(deleted, workout)
+        self.assertIsNone(workouts["next_cursor"])
+
+    @patch("fitness_tracker.models.workout_model.wger_get")
+    def test_restore_workout(self, mock_get):
+        """Test restoring a deleted workout without a Wger lookup."""
+        workout = {"id": 1, "name": "Push-Up", "description": "", "muscles": [4], "equipment": []}
+        workout_store.add(USER_ID, workout)
+        delete_workout(USER_ID, 1)
+
+        result = restore_workout(USER_ID, 1)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["workout"], workout)
+        self.assertEqual(workout_store.get(USER_ID, 1), workout)
+        self.assertEqual(get_deleted_workouts(USER_ID)["deleted_workouts"], [])
+        with self.assertRaises(ValueError):
+            restore_workout(USER_ID, 1)
+        mock_get.assert_not_called()
+
+    def test_restore_workout_fail(self):
+        """Test restoring a workout that was never deleted."""
+        result = restore_workout(USER_ID, 1000)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["message"], "Workout not found in deleted workouts.")
+
+    def test_get_deleted_workouts_pages(self):
+        """Test walking the deletion log page by page and filtering by deletion time."""
+        for workout_id in range(1, 4):
+            workout_store.add(USER_ID, {"id": workout_id, "name": "", "description": "", "muscles": [], "equipment": []})
+            delete_workout(USER_ID, workout_id)
+
+        first = get_deleted_workouts(USER_ID, limit=2)
+        second = get_deleted_workouts(USER_ID, limit=2, after=first["next_cursor"])
+
+        self.assertEqual([workout["id"] for workout in first["deleted_workouts"]], [1, 2])
+        self.assertEqual([workout["id"] for workout in second["deleted_workouts"]], [3])
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual(get_deleted_workouts(USER_ID, since=time.time() + 60)["deleted_workouts"], [])
+
+    @patch("fitness_tracker.models.workout_model.WORKOUT_STREAM_BATCH_SIZE", 2)
+    def test_iter_deleted_workouts(self):
+        """Test that streaming the deletion log reads it across batches."""
+        for workout_id in range(1, 6):
+            workout_store.add(USER_ID, {"id": workout_id, "name": "", "description": "", "muscles": [], "equipment": []})
+            delete_workout(USER_ID, workout_id)
+        cursor = get_deleted_workouts(USER_ID, limit=1)["next_cursor"]
+
+        self.assertEqual([workout["id"] for workout in iter_deleted_workouts(USER_ID)], [1, 2, 3, 4, 5])
+        self.assertEqual([workout["id"] for workout in iter_deleted_workouts(USER_ID, after=cursor)], [2, 3, 4, 5])
+        self.assertEqual(list(iter_deleted_workouts(USER_ID, since=time.time() + 60)), [])
+        with self.assertRaises(ValueError):
+            iter_deleted_workouts(USER_ID, after="garbage")
+
+    @patch("fitness_tracker.models.workout_model.DELETED_WORKOUTS_COMPACT_INTERVAL", 3600)
+    @patch("fitness_tracker.models.workout_model._compaction_executor")
+    def test_delete_workout_schedules_compaction(self, mock_executor):
+        """Test that deletes trigger at most one background compaction per interval."""
+        with patch("fitness_tracker.models.workout_model._next_compaction", 0.0), \
+                patch("fitness_tracker.models.workout_model._compaction_pending", False):
+            for workout_id in (1, 2):
+                workout_store.add(USER_ID, {"id": workout_id, "name": "", "description": "", "muscles": [], "equipment": []})
+                delete_workout(USER_ID, workout_id)
+        mock_executor.submit.assert_called_once()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,446 @@
+import multiprocessing
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from fitness_tracker.models.workout_store import (
+    SqliteWorkoutStore,
+    create_workout_store,
+    search_terms,
+)
+
+
+def make_workout(workout_id, name="Push-Up"):
+    return {"id": workout_id, "name": name, "description": "", "muscles": [4], "equipment": []}
+
+
+def deleted_ids(entries):
+    return [workout["id"] for _, workout in entries]
+
+
+def add_in_child(workout_id, results):
+    """Runs in a separate process: try to store a workout another process may store too."""
+    results.put(SqliteWorkoutStore().add(1, make_workout(workout_id)))
+
+
+class WorkoutStoreTests:
+    """Behaviour shared by every workout store backend."""
+
+    def make_store(self, **retention):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.store.clear()
+
+    def tearDown(self):
+        self.store.clear()
+
+    def test_add_and_get(self):
+        """Test that an added workout can be read back and is not added twice."""
+        self.assertTrue(self.store.add(1, make_workout(85)))
+        self.assertFalse(self.store.add(1, make_workout(85, "Other")))
+        self.assertEqual(self.store.get(1, 85), make_workout(85))
+        self.assertTrue(self.store.has(1, 85))
+        self.assertIsNone(self.store.get(1, 86))
+        self.assertEqual(len(self.store), 1)
+
+    def test_add_many(self):
+        """Test that add_many reports only the IDs it stored."""
+        self.store.add(1, make_workout(86))
+        added = self.store.add_many(1, [make_workout(87), make_workout(86), make_workout(85)])
+        self.assertEqual(added, {85, 87})
+        self.assertEqual([workout["id"] for workout in self.store.list(1)], [85, 86, 87])
+
+    def test_list_pages(self):
+        """Test that list returns keyset pages in ID order."""
+        self.store.add_many(1, [make_workout(workout_id) for workout_id in (90, 85, 87, 86, 88)])
+        self.store.add(2, make_workout(84))
+        self.store.delete(1, 87)
+        self.assertEqual([workout["id"] for workout in self.store.list(1, limit=2)], [85, 86])
+        self.assertEqual([workout["id"] for workout in self.store.list(1, limit=2, after=86)], [88, 90])
+        self.assertEqual([workout["id"] for workout in self.store.list(1, after=87)], [88, 90])
+        self.assertEqual(self.store.list(1, limit=2, after=90), [])
+
+    def test_list_filters(self):
+        """Test that list filters by muscle and equipment and the index follows deletes and restores."""
+        workouts = [
+            {"id": 85, "name": "Push-Up", "description": "", "muscles": [4, 5], "equipment": []},
+            {"id": 86, "name": "Bench Press", "description": "", "muscles": [4], "equipment": [1, 8]},
+            {"id": 87, "name": "Squat", "description": "", "muscles": [10], "equipment": [1]},
+            {"id": 88, "name": "Dip", "description": "", "muscles": [4, 5], "equipment": []},
+        ]
+        self.store.add_many(1, workouts)
+        self.store.add(2, workouts[2])
+
+        def listed(**filters):
+            return [workout["id"] for workout in self.store.list(1, **filters)]
+
+        self.assertEqual(listed(muscles=[4]), [85, 86, 88])
+        self.assertEqual(listed(muscles=[4, 5]), [85, 88])
+        self.assertEqual(listed(muscles=[4], equipment=[1]), [86])
+        self.assertEqual(listed(muscles=[4], equipment=[None]), [85, 88])
+        self.assertEqual(listed(muscles=[4], limit=2, after=85), [86, 88])
+        self.assertEqual(listed(muscles=[99]), [])
+        self.assertEqual([workout["id"] for workout in self.store.list(2, equipment=[1])], [87])
+
+        self.store.update(1, 85, "Wide Push-Up", "")
+        self.store.delete(1, 88)
+        self.assertEqual(listed(muscles=[5]), [85])
+        self.store.restore(1, 88)
+        self.assertEqual(listed(muscles=[5], equipment=[None]), [85, 88])
+        self.assertEqual(self.store.list(1, muscles=[5], limit=1)[0]["name"], "Wide Push-Up")
+
+    def test_list_filters_any_posting_size(self):
+        """Test that filtered pages are right whichever filter has the fewest workouts past the cursor."""
+        self.store.add_many(1, [
+            {
+                "id": workout_id,
+                "name": f"Exercise {workout_id}",
+                "description": "",
+                "muscles": [4],
+                "equipment": [1] if workout_id in (3, 18) else [2] if workout_id > 15 else [],
+            }
+            for workout_id in range(1, 21)
+        ])
+
+        def listed(**filters):
+            return [workout["id"] for workout in self.store.list(1, **filters)]
+
+        self.assertEqual(listed(muscles=[4], equipment=[1]), [3, 18])
+        self.assertEqual(listed(equipment=[1], muscles=[4], limit=1), [3])
+        self.assertEqual(listed(muscles=[4], equipment=[1], after=3), [18])
+        self.assertEqual(listed(muscles=[4], equipment=[None], after=10, limit=3), [11, 12, 13])
+        self.assertEqual(listed(muscles=[4], equipment=[2], after=17), [19, 20])
+        self.assertEqual(listed(muscles=[4], equipment=[1], after=18), [])
+        self.assertEqual(listed(muscles=[4, 99], equipment=[1]), [])
+
+    def test_search(self):
+        """Test that search ranks name matches first and follows updates, deletes and restores."""
+        self.store.add_many(1, [
+            {"id": 85, "name": "Push-Up", "description": "Lower your chest to the floor.", "muscles": [4], "equipment": []},
+            {"id": 86, "name": "Bench Press", "description": "Push the bar up.", "muscles": [4], "equipment": [1]},
+            {"id": 87, "name": "Squat", "description": "Keep your chest up.", "muscles": [10], "equipment": [1]},
+        ])
+        self.store.add(2, {"id": 88, "name": "Push Press", "description": "", "muscles": [2], "equipment": [1]})
+
+        def searched(query, user_id=1, **kwargs):
+            return [workout["id"] for workout in self.store.search(user_id, search_terms(query), **kwargs)]
+
+        self.assertEqual(searched("push"), [85, 86])
+        self.assertEqual(searched("push", limit=1), [85])
+        self.assertEqual(searched("CHEST floor"), [85])
+        self.assertEqual(searched("lunge"), [])
+        [result] = self.store.search(1, search_terms("floor"))
+        self.assertEqual(result["snippet"], "Lower your chest to the [floor].")
+        self.assertEqual(result["muscles"], [4])
+
+        self.store.update(1, 87, "Front Squat", "Bar on the shoulders.")
+        self.assertEqual(searched("chest"), [85])
+        self.assertEqual(searched("shoulders"), [87])
+        self.store.delete(1, 85)
+        self.assertEqual(searched("push"), [86])
+        self.store.restore(1, 85)
+        self.assertEqual(searched("push"), [85, 86])
+        self.assertEqual(searched("push", user_id=2), [88])
+
+    def test_search_ignores_accents(self):
+        """Test that words differing only in accents match, score and get snippets alike."""
+        self.store.add_many(1, [
+            {"id": 85, "name": "Développé couché", "description": "Barre au sternum.", "muscles": [4], "equipment": [1]},
+            {"id": 86, "name": "Squat", "description": "Puis le développé.", "muscles": [10], "equipment": [1]},
+        ])
+        self.assertEqual(search_terms("DÉVELOPPÉ couche"), ["developpe", "couche"])
+
+        results = self.store.search(1, search_terms("developpe"))
+        self.assertEqual([workout["id"] for workout in results], [85, 86])
+        self.assertEqual(results[0]["snippet"], "[Développé] couché")
+        self.assertEqual(results[1]["snippet"], "Puis le [développé].")
+        [result] = self.store.search(1, search_terms("Couché sternum"))
+        self.assertEqual(result["snippet"], "Barre au [sternum].")
+
+    def test_update(self):
+        """Test that update changes name and description only for stored workouts."""
+        self.store.add(1, make_workout(85))
+        self.assertTrue(self.store.update(1, 85, "Wide Push-Up", "Hands wide."))
+        self.assertFalse(self.store.update(1, 86, "Nope", ""))
+        self.assertEqual(self.store.get(1, 85)["name"], "Wide Push-Up")
+        self.assertEqual(self.store.get(1, 85)["description"], "Hands wide.")
+
+    def test_delete(self):
+        """Test that delete moves a workout into the deletion log once."""
+        self.store.add(1, make_workout(85))
+        self.assertTrue(self.store.delete(1, 85))
+        self.assertFalse(self.store.delete(1, 85))
+        self.assertFalse(self.store.has(1, 85))
+        [(_, deleted)] = self.store.list_deleted(1)
+        self.assertAlmostEqual(deleted.pop("deleted_at"), time.time(), delta=5)
+        self.assertEqual(deleted, make_workout(85))
+
+    def test_restore(self):
+        """Test that restore moves the latest tombstone back into the stored workouts once."""
+        self.store.add(1, make_workout(85))
+        self.store.update(1, 85, "Renamed", "Changed.")
+        self.store.delete(1, 85)
+        self.store.add(1, make_workout(86))
+        self.store.delete(1, 86)
+
+        restored = self.store.restore(1, 85)
+
+        self.assertEqual(restored["name"], "Renamed")
+        self.assertNotIn("deleted_at", restored)
+        self.assertEqual(self.store.get(1, 85), restored)
+        self.assertEqual(deleted_ids(self.store.list_deleted(1)), [86])
+        self.assertIsNone(self.store.restore(1, 85))
+        self.assertIsNone(self.store.restore(2, 86))
+
+    def test_restore_keeps_tombstone_of_stored_workout(self):
+        """Test that restore refuses to overwrite a workout that was stored again."""
+        self.store.add(1, make_workout(85))
+        self.store.delete(1, 85)
+        self.store.add(1, make_workout(85, "New"))
+        self.assertIsNone(self.store.restore(1, 85))
+        self.assertEqual(self.store.get(1, 85)["name"], "New")
+        self.assertEqual(deleted_ids(self.store.list_deleted(1)), [85])
+
+    def test_delete_replaces_tombstone(self):
+        """Test that deleting a workout again keeps only its latest tombstone."""
+        for name in ("First", "Second"):
+            self.store.add(1, make_workout(85, name))
+            self.store.delete(1, 85)
+        self.assertEqual([workout["name"] for _, workout in self.store.list_deleted(1)], ["Second"])
+        self.store.compact()
+        self.assertEqual(self.store.restore(1, 85)["name"], "Second")
+        self.assertEqual(self.store.list_deleted(1), [])
+
+    def test_list_deleted_pages_and_times(self):
+        """Test that the deletion log reads in pages and filters by deletion time."""
+        for workout_id, deleted_at in ((85, 100.0), (86, 200.0), (87, 300.0)):
+            self.store.add(1, make_workout(workout_id))
+            with patch("time.time", return_value=deleted_at):
+                self.store.delete(1, workout_id)
+
+        first = self.store.list_deleted(1, limit=2)
+        self.assertEqual(deleted_ids(first), [85, 86])
+        self.assertEqual(deleted_ids(self.store.list_deleted(1, limit=2, after=first[-1][0])), [87])
+        self.assertEqual(deleted_ids(self.store.list_deleted(1, since=200.0)), [86, 87])
+        self.assertEqual(deleted_ids(self.store.list_deleted(1, since=150.0, until=300.0)), [86])
+        self.assertEqual([workout["deleted_at"] for _, workout in first], [100.0, 200.0])
+
+    def test_deleted_retention(self):
+        """Test that the deletion log keeps its newest deleted_max_count entries and compaction drops expired ones."""
+        store = self.make_store(deleted_max_count=2, deleted_max_age=60)
+        now = time.time()
+        for workout_id, deleted_at in ((85, now - 120), (86, now - 3), (87, now - 2), (88, now - 1)):
+            store.add(1, make_workout(workout_id))
+            with patch("time.time", return_value=deleted_at):
+                store.delete(1, workout_id)
+        store.add(2, make_workout(85))
+        with patch("time.time", return_value=now - 120):
+            store.delete(2, 85)
+
+        self.assertEqual(deleted_ids(store.list_deleted(2)), [])
+        store.compact()
+        self.assertEqual(deleted_ids(store.list_deleted(1)), [87, 88])
+        self.assertEqual(store.compact(), 0)
+        self.assertEqual(deleted_ids(store.list_deleted(2, since=0)), [])
+
+    def test_restore_skips_expired_tombstone(self):
+        """Test that a tombstone past deleted_max_age cannot be restored before compaction drops it."""
+        store = self.make_store(deleted_max_age=60)
+        store.add(1, make_workout(85))
+        with patch("time.time", return_value=time.time() - 120):
+            store.delete(1, 85)
+        store.add(1, make_workout(86))
+        store.delete(1, 86)
+
+        self.assertIsNone(store.restore(1, 85))
+        self.assertFalse(store.has(1, 85))
+        self.assertEqual(store.restore(1, 86), make_workout(86))
+
+    def test_deleted_count_limit_without_compaction(self):
+        """Test that the deletion log never holds more than deleted_max_count entries, even before compaction."""
+        store = self.make_store(deleted_max_count=2)
+        for workout_id in range(85, 92):
+            store.add(1, make_workout(workout_id))
+            store.delete(1, workout_id)
+        store.add(2, make_workout(85))
+        store.delete(2, 85)
+
+        first = store.list_deleted(1, limit=1)
+        self.assertEqual(deleted_ids(first), [90])
+        self.assertEqual(deleted_ids(store.list_deleted(1, after=first[0][0])), [91])
+        self.assertIsNone(store.restore(1, 89))
+        self.assertEqual(deleted_ids(store.list_deleted(2)), [85])
+
+    def test_count_limit_ignores_restored_tombstones(self):
+        """Test that restored and replaced log entries do not take up deleted_max_count slots."""
+        store = self.make_store(deleted_max_count=2)
+        store.add_many(1, [make_workout(workout_id) for workout_id in (1, 2, 3)])
+        store.delete(1, 2)
+        store.delete(1, 1)
+        store.restore(1, 1)
+        store.delete(1, 3)
+        self.assertEqual(deleted_ids(store.list_deleted(1)), [2, 3])
+
+        store.add(1, make_workout(4))
+        store.delete(1, 4)
+        store.add(1, make_workout(4))
+        store.delete(1, 4)
+        self.assertEqual(deleted_ids(store.list_deleted(1)), [3, 4])
+        self.assertEqual(store.restore(1, 3), make_workout(3))
+
+    def test_users_are_isolated(self):
+        """Test that each user only sees and changes their own workouts."""
+        self.assertTrue(self.store.add(1, make_workout(85)))
+        self.assertTrue(self.store.add(2, make_workout(85, "Other")))
+        self.assertEqual(self.store.get(2, 85)["name"], "Other")
+        self.assertEqual(self.store.list(3), [])
+
+        self.assertTrue(self.store.update(2, 85, "Renamed", ""))
+        self.assertEqual(self.store.get(1, 85), make_workout(85))
+
+        self.assertTrue(self.store.delete(2, 85))
+        self.assertTrue(self.store.has(1, 85))
+        self.assertEqual(self.store.list_deleted(1), [])
+        self.assertEqual([workout["name"] for _, workout in self.store.list_deleted(2)], ["Renamed"])
+        self.assertEqual(len(self.store), 1)
+
+
+class TestInMemoryWorkoutStore(WorkoutStoreTests, unittest.TestCase):
+
+    def make_store(self, **retention):
+        return create_workout_store("memory", **retention)
+
+
+    def test_concurrent_threads(self):
+        """Test that concurrent updates and deletes from many threads are never lost."""
+        store = create_workout_store("memory", shards=4)
+        store.add_many(1, [make_workout(workout_id) for workout_id in range(1, 401)])
+        deleted = []
+
+        def work(thread_index):
+            for workout_id in range(thread_index + 1, 401, 8):
+                store.update(1, workout_id, f"Updated {workout_id}", "")
+                if workout_id % 2 and store.delete(1, workout_id):
+                    deleted.append(workout_id)
+                store.add(thread_index + 2, make_workout(workout_id))
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(deleted), list(range(1, 401, 2)))
+        self.assertEqual(sorted(deleted_ids(store.list_deleted(1))), list(range(1, 401, 2)))
+        self.assertEqual([workout["name"] for workout in store.list(1)], [f"Updated {i}" for i in range(2, 401, 2)])
+        self.assertEqual(len(store), 200 + 400)
+
+
+class TestSqliteWorkoutStore(WorkoutStoreTests, unittest.TestCase):
+
+    def make_store(self, **retention):
+        return create_workout_store("sqlite", **retention)
+
+    def test_shared_between_instances(self):
+        """Test that workouts survive in the database for a new store instance."""
+        self.store.add(1, make_workout(85))
+        self.assertEqual(SqliteWorkoutStore().get(1, 85), make_workout(85))
+
+    def test_concurrent_processes_add_once(self):
+        """Test that only one of several processes adding the same workout succeeds."""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [context.Process(target=add_in_child, args=(85, results)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get(timeout=10) for _ in processes]
+        for process in processes:
+            process.join(10)
+        self.assertEqual(sorted(outcomes), [False, False, False, True])
+
+    def test_user_queries_use_composite_index(self):
+        """Test that per-user reads and writes seek the (user_id, workout_id) key instead of scanning."""
+        from fitness_tracker.utils.sql_utils import get_db_connection
+        with get_db_connection() as conn:
+            for query in (
+                "SELECT * FROM workouts WHERE user_id = 1 ORDER BY workout_id",
+                "SELECT * FROM workouts WHERE user_id = 1 AND workout_id = 85",
+                "SELECT * FROM deleted_workouts WHERE user_id = 1 ORDER BY seq",
+                "SELECT * FROM deleted_workouts WHERE user_id = 1 AND workout_id = 85 ORDER BY seq DESC LIMIT 1",
+                "SELECT workout_id FROM workout_tags WHERE user_id = 1 AND field = 'muscles' AND tag_id = 4 "
+                "AND workout_id > 85 ORDER BY workout_id",
+            ):
+                plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}"))
+                self.assertIn("SEARCH", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_count_limit_applies_before_compaction(self):
+        """Test that a log left longer than deleted_max_count is trimmed on reads and restores."""
+        for workout_id in (85, 86, 87):
+            self.store.add(1, make_workout(workout_id))
+            self.store.delete(1, workout_id)
+        store = SqliteWorkoutStore(deleted_max_count=2)
+        self.assertEqual(deleted_ids(store.list_deleted(1)), [86, 87])
+        self.assertIsNone(store.restore(1, 85))
+        self.assertEqual(store.restore(1, 86), make_workout(86))
+
+    def test_tag_index_backfilled(self):
+        """Test that workouts stored before the tag index existed are indexed on startup."""
+        from fitness_tracker.utils.sql_utils import get_db_connection
+        self.store.add(1, make_workout(85))
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM workout_tags")
+        store = SqliteWorkoutStore()
+        self.assertEqual([workout["id"] for workout in store.list(1, muscles=[4], equipment=[None])], [85])
+
+    def test_tag_counts_follow_index(self):
+        """Test that the posting list lengths follow adds, deletes, restores and the backfill."""
+        from fitness_tracker.utils.sql_utils import get_db_connection
+
+        def counts():
+            with get_db_connection() as conn:
+                kept = conn.execute("SELECT * FROM workout_tag_counts ORDER BY 1, 2, 3").fetchall()
+                actual = conn.execute(
+                    "SELECT user_id, field, tag_id, COUNT(*) FROM workout_tags GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+                ).fetchall()
+            self.assertEqual(kept, actual)
+            return kept
+
+        self.store.add_many(1, [make_workout(85), make_workout(86)])
+        self.assertIn((1, "muscles", 4, 2), counts())
+        self.store.delete(1, 85)
+        self.assertIn((1, "muscles", 4, 1), counts())
+        self.store.delete(1, 86)
+        self.assertEqual(counts(), [])
+        self.store.restore(1, 85)
+        self.assertIn((1, "muscles", 4, 1), counts())
+        with get_db_connection() as conn:
+            conn.execute("DROP TABLE workout_tag_counts")
+        SqliteWorkoutStore()
+        self.assertIn((1, "muscles", 4, 1), counts())
+
+    def test_search_index_backfilled(self):
+        """Test that workouts stored before the full-text index existed are indexed on startup."""
+        from fitness_tracker.utils.sql_utils import get_db_connection
+        self.store.add(1, make_workout(85))
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM workouts_fts")
+        self.assertEqual([workout["id"] for workout in SqliteWorkoutStore().search(1, ["push"])], [85])
+
+    def test_search_quotes_fts_syntax(self):
+        """Test that FTS5 operators in a query are searched for as words."""
+        self.store.add(1, {"id": 85, "name": "Push AND Pull", "description": "", "muscles": [], "equipment": []})
+        self.assertEqual(len(self.store.search(1, search_terms('pull" OR NEAR(push*'))), 0)
+        self.assertEqual(len(self.store.search(1, search_terms("and pull"))), 1)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with self.assertRaises(ValueError):
+            create_workout_store("redis")
+
+
+if __name__ == "__main__":
+    unittest.main()